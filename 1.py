@@ -1,197 +1,154 @@
-import firebase_admin
-from firebase_admin import credentials
-from firebase_admin import firestore
+import argparse
 import os
-import datetime
+from concurrent.futures import ThreadPoolExecutor
+import admin_session
+from content_hash import stamp_hashes
+from seed_worksheets import MAX_PARALLEL_COMMITS, WORKSHEETS_COLLECTION, prepare_definitions
+from worksheet_content import (CONTENT_DIR, SECTION_UPDATES_DIR, apply_section_update_files, find_content_files,
+                               load_section_updates, load_worksheet_library, merge_sections)
+from worksheet_index import INDEX_COLLECTION, index_entry
 
 # --- Configuration ---
-# OPTION 1: Use environment variable (recommended)
-# Ensure GOOGLE_APPLICATION_CREDENTIALS environment variable is set to the path of your service account key JSON file.
-
-# OPTION 2: Explicitly point to your service account key file (replace with your actual path)
-SERVICE_ACCOUNT_KEY_PATH = os.getenv("GOOGLE_APPLICATION_CREDENTIALS", "C:/Users/Dan Mill/Downloads/mgscompscihub2PK.json") # Fallback if env var not set
-
+# Credentials are resolved by admin_session.py (GOOGLE_APPLICATION_CREDENTIALS or its fallback key path).
 TARGET_WORKSHEET_ID = "j277-sysarch-lesson1-cpu-von-neumann"
 
-# --- Firebase Initialization ---
-try:
-    if SERVICE_ACCOUNT_KEY_PATH and os.path.exists(SERVICE_ACCOUNT_KEY_PATH) and not firebase_admin._apps:
-        cred = credentials.Certificate(SERVICE_ACCOUNT_KEY_PATH)
-        firebase_admin.initialize_app(cred)
-        print(f"Firebase Admin SDK initialized using key: {SERVICE_ACCOUNT_KEY_PATH}")
-    elif not firebase_admin._apps: 
-        firebase_admin.initialize_app()
-        print("Firebase Admin SDK initialized using GOOGLE_APPLICATION_CREDENTIALS environment variable.")
+# --- Section Definitions ---
+# Section content lives in content/section_updates/; the file also lists the worksheets it targets.
+SECTION_UPDATES_PATH = os.path.join(SECTION_UPDATES_DIR, "cpu-lesson1-interactives.json")
+
+
+def in_updates_dir(path):
+    """Whether the content library already applies this update file on load."""
+    if not os.path.isdir(SECTION_UPDATES_DIR):
+        return False
+    return os.path.abspath(path) in {os.path.abspath(p) for p in find_content_files(SECTION_UPDATES_DIR)}
+
+
+def prepared_documents(library, worksheet_ids):
+    """{doc_id: stamped worksheet} for the valid targets, prepared exactly as seed_worksheets.py writes them."""
+    entries = {entry["doc_id"]: entry for entry in library if not entry["errors"]}
+    definitions = [(doc_id, entries[doc_id]["data"]) for doc_id in worksheet_ids if doc_id in entries]
+    prepared, _ = prepare_definitions(definitions, skip_invalid=True, verbose=False)
+    return {doc_id: stamp_hashes(worksheet_data) for doc_id, worksheet_data in prepared}
+
+
+def updated_definitions(worksheet_ids, sections_path, content_dir=CONTENT_DIR):
+    """
+    Returns ({doc_id: (base, updated)}, missing_ids). updated is the target worksheet from the content library
+    with every section update applied, i.e. exactly the document a seed run writes; base is the same worksheet
+    without sections_path, i.e. what Firestore holds if it was seeded before this update.
+    """
+    library = load_worksheet_library(content_dir, updates_dir=None)
+    other_updates = [path for path in find_content_files(SECTION_UPDATES_DIR)
+                     if os.path.abspath(path) != os.path.abspath(sections_path)] if os.path.isdir(SECTION_UPDATES_DIR) else []
+    apply_section_update_files(library, other_updates)
+    base = prepared_documents(library, worksheet_ids)
+    apply_section_update_files(library, [sections_path])
+    updated = prepared_documents(library, worksheet_ids)
+    definitions = {doc_id: (base[doc_id], updated[doc_id]) for doc_id in worksheet_ids if doc_id in base and doc_id in updated}
+    return definitions, [doc_id for doc_id in worksheet_ids if doc_id not in definitions]
+
+
+def apply_section_update(transaction, worksheet_ref, index_ref, base, updated, section_ids):
+    """
+    Merges the updated versions of section_ids into one worksheet inside a transaction (retried automatically on
+    contention). Only contentHash and sectionHashes are read; sections is read, also field-masked, only when a
+    target section differs, and only the section fields are written. Returns (result, changed_section_ids) where
+    result is "missing", "unchanged" or "updated".
+    """
+    firestore = admin_session.firestore_module()
+    snapshot = worksheet_ref.get(field_paths=["contentHash", "sectionHashes"], transaction=transaction)
+    if not snapshot.exists:
+        return "missing", []
+    stored = snapshot.to_dict() or {}
+    stored_section_hashes = stored.get("sectionHashes") or {}
+    target_hashes = {section_id: updated["sectionHashes"][section_id] for section_id in section_ids}
+    if all(stored_section_hashes.get(section_id) == h for section_id, h in target_hashes.items()):
+        return "unchanged", []
+
+    current = worksheet_ref.get(field_paths=["sections"], transaction=transaction).to_dict() or {}
+    sections_map = {section["id"]: section for section in updated["sections"] if section["id"] in target_hashes}
+    sections, changed_ids = merge_sections(current.get("sections") or [], sections_map)
+    update = {
+        # Firestore can't address array elements by path, so the merged array is written as one field.
+        "sections": sections,
+        "sectionHashes": {**stored_section_hashes, **target_hashes},
+        "lastScriptUpdate": firestore.SERVER_TIMESTAMP,
+    }
+    if stored.get("contentHash") == base["contentHash"]:
+        # The document was exactly the library worksheet, so merging yields exactly the updated one.
+        update["contentHash"] = updated["contentHash"]
+        transaction.set(index_ref, {**index_entry(updated), "updatedAt": firestore.SERVER_TIMESTAMP})
     else:
-        print("Firebase Admin SDK already initialized.")
-except Exception as e:
-    print(f"Error initializing Firebase Admin SDK: {e}")
-    print("Please ensure you have set up your Firebase Admin credentials correctly.")
-    exit()
-
-db = firestore.client()
-
-# --- Section Definitions (including MatchingPairs) ---
-
-quiz_section_data = {
-    "id": "cpu_lesson1_quiz1",
-    "title": "CPU & Von Neumann Quiz",
-    "type": "Quiz",
-    "questions": [
-        {
-            "id": "q_mcq_registers_pc",
-            "type": "MultipleChoiceQuestion",
-            "prompt": "Which register holds the <strong>address</strong> of the next instruction to be fetched from memory?",
-            "options": [
-                {"id": "opt_pc", "text": "Program Counter (PC)"},
-                {"id": "opt_mar", "text": "Memory Address Register (MAR)"},
-                {"id": "opt_mdr", "text": "Memory Data Register (MDR)"},
-                {"id": "opt_cir", "text": "Current Instruction Register (CIR)"}
-            ],
-            "correctAnswerId": "opt_pc",
-            "feedback": {
-                "correct": "Spot on! The PC always points to the memory location of the next instruction.",
-                "opt_mar": "The MAR holds an address, but specifically the one being accessed now, not necessarily the 'next' instruction's address.",
-                "opt_mdr": "The MDR holds data or instructions being moved to/from memory, not addresses of next instructions.",
-                "opt_cir": "The CIR holds the current instruction being decoded/executed."
-            }
-        },
-        {
-            "id": "q_mcq_alu_role",
-            "type": "MultipleChoiceQuestion",
-            "prompt": "What is the primary role of the Arithmetic Logic Unit (ALU)?",
-            "options": [
-                {"id": "opt_alu_control", "text": "Controlling the overall operation of the CPU."},
-                {"id": "opt_alu_calc", "text": "Performing arithmetic calculations and logical comparisons."},
-                {"id": "opt_alu_fetch", "text": "Fetching instructions from memory."}
-            ],
-            "correctAnswerId": "opt_alu_calc",
-            "feedback": {"correct": "Correct! The ALU is the calculator and decision-maker of the CPU."}
-        }
-    ]
-}
-
-order_sequence_data = {
-    "id": "cpu_lesson1_fde_order",
-    "title": "The Fetch-Decode-Execute Cycle Steps",
-    "type": "OrderSequenceInteractive",
-    "orderItems": [ 
-        {"id": "fde_decode", "content": "<strong>Decode:</strong> The Control Unit interprets the instruction in the CIR."},
-        {"id": "fde_execute", "content": "<strong>Execute:</strong> The instruction is carried out. This might involve the ALU for calculations, or moving data."},
-        {"id": "fde_fetch_pc_to_mar", "content": "<strong>Fetch (1):</strong> The address held in the Program Counter (PC) is copied to the Memory Address Register (MAR)."},
-        {"id": "fde_increment_pc", "content": "<strong>Fetch (2):</strong> The Program Counter (PC) is incremented to point to the next instruction."},
-        {"id": "fde_fetch_instruction_to_mdr_cir", "content": "<strong>Fetch (3):</strong> The instruction at the address in MAR is fetched from memory, travels along the data bus to the Memory Data Register (MDR), and is then copied into the Current Instruction Register (CIR)."}
-    ]
-}
-
-fill_blanks_data = {
-    "id": "cpu_lesson1_von_neumann_fill",
-    "title": "Key Von Neumann Architecture Concepts",
-    "type": "FillInTheBlanksInteractive",
-    "segments": [
-        "The Von Neumann architecture is notable because it stores both program ",
-        {"id": "vn_b1", "placeholder": "plural noun", "size": 15}, 
-        " and the ",
-        {"id": "vn_b2", "placeholder": "plural noun", "size": 8}, 
-        " it operates on in the same ",
-        {"id": "vn_b3", "placeholder": "singular noun", "size": 10}, 
-        " unit. Instructions and data are fetched using a common ",
-        {"id": "vn_b4", "placeholder": "singular noun", "size": 6}, 
-        " system, which can lead to a bottleneck."
-    ]
-}
-
-diagram_label_data = {
-    "id": "cpu_lesson1_basic_cpu_diagram",
-    "title": "Basic CPU Components Identification",
-    "type": "DiagramLabelInteractive",
-    "diagramImageUrl": "/assets/images/worksheets/j277/sysarch/lesson1/simple_cpu_diagram.png", 
-    "diagramAltText": "Simplified diagram of CPU components: Control Unit, ALU, Registers, and Buses",
-    "hotspots": [
-        {"id": "hs_cu", "x": 30, "y": 30, "label": "Control Unit (CU)", "termKey": "control-unit"},
-        {"id": "hs_alu", "x": 30, "y": 70, "label": "Arithmetic Logic Unit (ALU)", "termKey": "alu"},
-        {"id": "hs_regs", "x": 70, "y": 30, "label": "Registers", "termKey": "registers"},
-        {"id": "hs_buses", "x": 50, "y": 50, "label": "Buses", "termKey": "bus"}
-    ]
-}
-
-# New: Example MatchingPairsInteractive Section
-matching_pairs_data = {
-    "id": "cpu_lesson1_registers_match",
-    "title": "Match Registers to Their Descriptions",
-    "type": "MatchingPairsInteractive",
-    "matchSetA": [ # Terms
-        {"id": "match_a_pc", "content": "Program Counter (PC)"},
-        {"id": "match_a_mar", "content": "Memory Address Register (MAR)"},
-        {"id": "match_a_mdr", "content": "Memory Data Register (MDR)"},
-        {"id": "match_a_cir", "content": "Current Instruction Register (CIR)"},
-        {"id": "match_a_acc", "content": "Accumulator (ACC)"}
-    ],
-    "matchSetB": [ # Descriptions (can be in a different order for the student)
-        {"id": "match_b_holds_next_addr", "content": "Holds the memory address of the next instruction to be fetched."},
-        {"id": "match_b_holds_current_addr", "content": "Holds the memory address of the data or instruction currently being accessed (read from or written to)."},
-        {"id": "match_b_temp_data_storage", "content": "Temporarily stores data that has just been read from memory or is about to be written to memory."},
-        {"id": "match_b_holds_current_instruction", "content": "Holds the current instruction while it is being decoded and executed."},
-        {"id": "match_b_results_of_alu", "content": "Stores the results of calculations performed by the ALU."}
-    ]
-    # For your marking logic, you'd need a separate mapping of correct pairs, e.g.:
-    # correctPairs: [{itemAId: "match_a_pc", itemBId: "match_b_holds_next_addr"}, ...]
-}
-
-
-new_sections_map = {
-    quiz_section_data["id"]: quiz_section_data,
-    order_sequence_data["id"]: order_sequence_data,
-    fill_blanks_data["id"]: fill_blanks_data,
-    diagram_label_data["id"]: diagram_label_data,
-    matching_pairs_data["id"]: matching_pairs_data # Added matching pairs
-}
-
-# --- Main update logic ---
-def update_worksheet_sections(worksheet_id):
-    worksheet_ref = db.collection("worksheets").document(worksheet_id)
-    
+        # The document had drifted from the library; the next seed run rewrites it and its index entry.
+        update["contentHash"] = firestore.DELETE_FIELD
+    transaction.update(worksheet_ref, update)
+    return "updated", changed_ids
+
+
+def update_worksheet_sections(db_client, doc_id, base, updated, section_ids):
+    """Runs apply_section_update for one worksheet in its own transaction. Returns its result, or "failed"."""
+    firestore = admin_session.firestore_module()
+    worksheet_ref = db_client.collection(WORKSHEETS_COLLECTION).document(doc_id)
+    index_ref = db_client.collection(INDEX_COLLECTION).document(doc_id)
     try:
-        doc = worksheet_ref.get()
-        if not doc.exists:
-            print(f"Error: Worksheet with ID '{worksheet_id}' not found.")
-            return
-
-        print(f"Updating worksheet: {worksheet_id}")
-        worksheet_data = doc.to_dict()
-        current_sections = worksheet_data.get("sections", [])
-        
-        existing_sections_map = {section["id"]: section for section in current_sections}
-        updated_sections_list = []
-        processed_new_section_ids = set()
-
-        for existing_section in current_sections:
-            section_id = existing_section["id"]
-            if section_id in new_sections_map:
-                print(f"  Updating existing section: {section_id} ({new_sections_map[section_id]['type']})")
-                updated_sections_list.append(new_sections_map[section_id])
-                processed_new_section_ids.add(section_id)
-            else:
-                updated_sections_list.append(existing_section)
-        
-        for section_id, section_data in new_sections_map.items():
-            if section_id not in processed_new_section_ids:
-                print(f"  Adding new section: {section_id} ({section_data['type']})")
-                updated_sections_list.append(section_data)
-
-        worksheet_ref.update({
-            "sections": updated_sections_list,
-            "lastScriptUpdate": firestore.SERVER_TIMESTAMP
-        })
-        print(f"Successfully updated sections for worksheet: {worksheet_id}")
+        result, changed_ids = firestore.transactional(apply_section_update)(
+            db_client.transaction(), worksheet_ref, index_ref, base, updated, section_ids)
+    except Exception as e:
+        print(f"An error occurred while updating worksheet {doc_id}: {e}")
+        return "failed"
+    if result == "missing":
+        print(f"Error: Worksheet with ID '{doc_id}' not found; seed it first ('python admin.py seed').")
+    elif result == "unchanged":
+        print(f"No section changes for worksheet: {doc_id}. Skipping write.")
+    else:
+        for section_id in changed_ids:
+            print(f"  {doc_id}: updated section {section_id}")
+        print(f"Successfully updated sections for worksheet: {doc_id}")
+    return result
+
+
+def update_many_worksheets(db_client, definitions, section_ids, max_workers=MAX_PARALLEL_COMMITS):
+    """Updates several worksheets concurrently, one transaction each. Returns {doc_id: result}."""
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        futures = {doc_id: executor.submit(update_worksheet_sections, db_client, doc_id, base, updated, section_ids)
+                   for doc_id, (base, updated) in definitions.items()}
+    return {doc_id: future.result() for doc_id, future in futures.items()}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Apply section updates to one or more worksheets.")
+    parser.add_argument("worksheet_ids", nargs="*",
+                        help="Worksheet document IDs to update (default: the worksheetIds listed in the update file)")
+    parser.add_argument("--sections", default=SECTION_UPDATES_PATH,
+                        help=f"Section update file (default: {SECTION_UPDATES_PATH})")
+    parser.add_argument("--content-dir", default=CONTENT_DIR)
+    parser.add_argument("--workers", type=int, default=MAX_PARALLEL_COMMITS,
+                        help="Maximum number of worksheets updated concurrently")
+    args = parser.parse_args(argv)
+
+    target_ids, sections_map = load_section_updates(args.sections)
+    worksheet_ids = args.worksheet_ids or target_ids or [TARGET_WORKSHEET_ID]
+    definitions, missing_ids = updated_definitions(worksheet_ids, args.sections, args.content_dir)
+    if missing_ids:
+        # Updates are applied on top of the content library, so the next seed run can't undo them.
+        print(f"Error: not in the content library ({args.content_dir}) or invalid: {', '.join(missing_ids)}")
+        return 1
+    if not in_updates_dir(args.sections):
+        print(f"Warning: {args.sections} is not under {SECTION_UPDATES_DIR}/, so the next seed run will not "
+              f"include it. Move it there to keep these sections.")
 
+    try:
+        db = admin_session.get_firestore()
     except Exception as e:
-        print(f"An error occurred while updating worksheet {worksheet_id}: {e}")
+        print(f"Error initializing Firebase Admin SDK: {e}")
+        print("Please ensure you have set up your Firebase Admin credentials correctly.")
+        return 1
 
-if __name__ == "__main__":
-    if not firebase_admin._apps:
-        print("Firebase Admin SDK not initialized. Exiting.")
-    else:
-        print(f"Targeting worksheet ID: {TARGET_WORKSHEET_ID} for section updates.")
-        update_worksheet_sections(TARGET_WORKSHEET_ID)
+    print(f"Targeting {len(worksheet_ids)} worksheet(s) for section updates: {', '.join(worksheet_ids)}")
+    results = update_many_worksheets(db, definitions, list(sections_map), max_workers=args.workers)
+    return 1 if any(result in ("missing", "failed") for result in results.values()) else 0
 
+
+if __name__ == "__main__":
+    raise SystemExit(main())
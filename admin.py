@@ -0,0 +1,144 @@
+import argparse
+import importlib
+import os
+import shlex
+import sys
+import time
+
+# --- Configuration ---
+# Every task runs from the project root, resolved once, regardless of where admin.py is invoked from.
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Content tasks. Modules are imported only when their command runs, so firebase_admin is never loaded
+# for offline tasks; "firebase" marks the commands that will open an admin session.
+CONTENT_COMMANDS = {
+    "compile": {"module": "worksheet_content", "takes_args": True, "firebase": False,
+                "help": "Parse and cache the worksheet content library"},
+    "validate": {"module": "worksheet_validator", "takes_args": True, "firebase": False,
+                 "help": "Validate every worksheet in the content library"},
+    "autolink": {"module": "keyword_linker", "takes_args": True, "firebase": False,
+                 "help": "Link glossary terms to keyword tooltips and report term coverage"},
+    "images": {"module": "image_pipeline", "takes_args": True, "firebase": False,
+               "help": "Build responsive image variants and blur placeholders"},
+    "export": {"module": "static_export", "takes_args": True, "firebase": False,
+               "help": "Export worksheets as immutable static JSON bundles under public/"},
+    "plan-indexes": {"module": "index_planner", "takes_args": True, "firebase": False,
+                     "help": "Derive firestore.indexes.json from the queries in src/ and functions/"},
+    "seed": {"module": "seed_worksheets", "takes_args": True, "firebase": True,
+             "help": "Seed changed worksheets into Firestore"},
+    "verify": {"module": "seed_worksheets", "takes_args": True, "firebase": True, "fixed_args": ["--verify"],
+               "help": "Check Firestore matches the content library"},
+    "rebuild-index": {"module": "seed_worksheets", "takes_args": True, "firebase": True,
+                      "fixed_args": ["--rebuild-index"],
+                      "help": "Rebuild the worksheetIndex summaries from Firestore"},
+    "patch-sections": {"module": "1", "takes_args": True, "firebase": True,
+                       "help": "Apply a section update file to worksheets (1.py)"},
+    "add-lesson1": {"module": "add_lesson1_cpu_data", "takes_args": False, "firebase": True,
+                    "help": "Seed the Lesson 1 CPU worksheet"},
+    "add-sample": {"module": "add_sample_worksheet", "takes_args": False, "firebase": True,
+                   "help": "Seed the sample images worksheet"},
+    "username-pool": {"module": "username_pool", "takes_args": True, "firebase": True,
+                      "help": "Backfill username reservations and publish the free-name pool"},
+    "migrate-progress": {"module": "migrate_student_progress", "takes_args": True, "firebase": True,
+                         "help": "Move studentProgress documents to per-student ids"},
+    "backfill-inbox": {"module": "backfill_assignment_inbox", "takes_args": True, "firebase": True,
+                       "help": "Fan existing assignments out to student assignment inboxes"},
+    "backfill-teachers": {"module": "backfill_teacher_ids", "takes_args": True, "firebase": True,
+                          "help": "Set each student profile's teacherIds from the class rosters"},
+    "user-claims": {"module": "user_claims", "takes_args": True, "firebase": True,
+                    "help": "Sync Auth custom claims and provision teachers"},
+    "mark": {"module": "auto_marking", "takes_args": True, "firebase": True,
+             "help": "Re-mark saved student answers against the current answer keys"},
+}
+
+# The create_*/update_* scaffolding scripts are deliberately not commands: their templates predate the
+# current sources, so running one would overwrite later work with the original generated file.
+COMMANDS = dict(CONTENT_COMMANDS)
+
+
+def run_command(name, argv):
+    """Imports and runs one command in this process. Returns its exit code (0 on success)."""
+    spec = COMMANDS.get(name)
+    if spec is None:
+        print(f"Error: unknown command '{name}'. Run 'python admin.py list' to see the available commands.")
+        return 2
+    if argv and not spec["takes_args"]:
+        print(f"Error: '{name}' does not take arguments (got: {' '.join(argv)}).")
+        return 2
+
+    module = importlib.import_module(spec["module"])
+    try:
+        if spec["takes_args"]:
+            result = module.main(spec.get("fixed_args", []) + list(argv))
+        else:
+            result = module.main()
+    except SystemExit as e:
+        result = e.code
+    return result if isinstance(result, int) else (0 if result is None else 1)
+
+
+def run_pipeline(steps, show_timings=False):
+    """
+    Runs each step ("command arg1 arg2 ...") in order in this process, stopping at the first failure.
+    Later steps reuse the modules and Firebase session loaded by earlier ones.
+    """
+    for step in steps:
+        parts = shlex.split(step)
+        if not parts:
+            continue
+        print(f"\n=== {step} ===")
+        start = time.perf_counter()
+        code = run_command(parts[0], parts[1:])
+        if show_timings:
+            print(f"[{parts[0]} finished in {(time.perf_counter() - start) * 1000:.0f} ms]")
+        if code:
+            print(f"Pipeline stopped: '{step}' failed with exit code {code}.")
+            return code
+    return 0
+
+
+def print_commands():
+    """Lists every available command."""
+    print("Commands:")
+    for name, spec in COMMANDS.items():
+        marker = " [firebase]" if spec["firebase"] else ""
+        print(f"  {name:<36} {spec['help']}{marker}")
+    print(f"  {'pipeline STEP [STEP ...]':<36} Run several commands in one process, e.g. "
+          "pipeline validate \"seed --force\" verify")
+
+
+def main(argv=None):
+    start = time.perf_counter()
+    parser = argparse.ArgumentParser(
+        description="Single entry point for the worksheet/admin scripts.",
+        epilog="Run 'python admin.py list' to see every command.")
+    parser.add_argument("--emulator", metavar="HOST:PORT", help="Point Firestore commands at the emulator")
+    parser.add_argument("--timings", action="store_true", help="Print per-task and startup timings")
+    parser.add_argument("command", help="Command to run, 'pipeline' or 'list'")
+    parser.add_argument("args", nargs=argparse.REMAINDER, help="Arguments for the command")
+    args = parser.parse_args(argv)
+
+    os.chdir(PROJECT_ROOT)
+    if PROJECT_ROOT not in sys.path:
+        sys.path.insert(0, PROJECT_ROOT)
+    if args.emulator:
+        import admin_session
+        admin_session.use_emulator(args.emulator)
+
+    if args.command == "list":
+        print_commands()
+        code = 0
+    elif args.command == "pipeline":
+        code = run_pipeline(args.args, show_timings=args.timings)
+    else:
+        code = run_command(args.command, args.args)
+
+    if args.timings:
+        print(f"\nTotal: {(time.perf_counter() - start) * 1000:.0f} ms")
+        if "admin_session" in sys.modules:
+            sys.modules["admin_session"].print_startup_report()
+    return code
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,131 @@
+import importlib
+import os
+import threading
+import time
+
+# --- Configuration ---
+# OPTION 1: Use environment variable (recommended)
+# Ensure GOOGLE_APPLICATION_CREDENTIALS environment variable is set to the path of your service account key JSON file.
+# OPTION 2: Fall back to the key file path used by the original admin scripts.
+SERVICE_ACCOUNT_KEY_PATH = os.getenv("GOOGLE_APPLICATION_CREDENTIALS", "C:/Users/Dan Mill/Downloads/mgscompscihub2PK.json")
+
+# Project ID used when talking to the Firestore emulator (no credentials are needed there).
+EMULATOR_PROJECT_ID = os.getenv("GCLOUD_PROJECT", "mgscompscihub2")
+
+# --- Session state ---
+# firebase_admin is only imported the first time a client is requested, and every client is built once
+# per process so chained admin tasks share the same app, credentials and gRPC channel.
+_lock = threading.RLock()
+_app = None
+_firestore_module = None
+_firestore_client = None
+_auth_module = None
+_startup_timings = {}
+
+
+def _timed(step, func):
+    """Runs func() and records how long it took under _startup_timings[step]."""
+    start = time.perf_counter()
+    result = func()
+    _startup_timings[step] = _startup_timings.get(step, 0.0) + (time.perf_counter() - start)
+    return result
+
+
+def use_emulator(host, project_id=None):
+    """Points every client created afterwards at a local Firestore emulator (e.g. "localhost:8080")."""
+    global EMULATOR_PROJECT_ID
+    os.environ["FIRESTORE_EMULATOR_HOST"] = host
+    if project_id:
+        EMULATOR_PROJECT_ID = project_id
+
+
+def emulator_host():
+    """Returns the Firestore emulator host if one is configured, otherwise None."""
+    return os.getenv("FIRESTORE_EMULATOR_HOST")
+
+
+def firestore_module():
+    """Returns the firebase_admin.firestore module (SERVER_TIMESTAMP, transactional, ...), importing it on first use."""
+    global _firestore_module
+    with _lock:
+        if _firestore_module is None:
+            def load():
+                from firebase_admin import firestore
+                return firestore
+            _firestore_module = _timed("import_firestore", load)
+        return _firestore_module
+
+
+def get_app():
+    """Initialises the default Firebase Admin app once and returns it."""
+    global _app
+    with _lock:
+        if _app is not None:
+            return _app
+        firebase_admin = _timed("import_firebase_admin", lambda: importlib.import_module("firebase_admin"))
+        if firebase_admin._apps:
+            _app = firebase_admin.get_app()
+            return _app
+
+        def initialize():
+            from firebase_admin import credentials
+            if SERVICE_ACCOUNT_KEY_PATH and os.path.exists(SERVICE_ACCOUNT_KEY_PATH):
+                app = firebase_admin.initialize_app(credentials.Certificate(SERVICE_ACCOUNT_KEY_PATH))
+                print(f"Firebase Admin SDK initialized using key: {SERVICE_ACCOUNT_KEY_PATH}")
+            else:
+                app = firebase_admin.initialize_app()
+                print("Firebase Admin SDK initialized using application default credentials.")
+            return app
+        _app = _timed("initialize_app", initialize)
+        return _app
+
+
+def get_firestore():
+    """
+    Returns the process-wide Firestore client, creating it on first use.
+    When FIRESTORE_EMULATOR_HOST is set the client talks to the emulator with anonymous credentials.
+    """
+    global _firestore_client
+    with _lock:
+        if _firestore_client is not None:
+            return _firestore_client
+
+        if emulator_host():
+            def connect_emulator():
+                from google.cloud import firestore as gcloud_firestore
+                return gcloud_firestore.Client(project=EMULATOR_PROJECT_ID)
+            firestore_module()
+            _firestore_client = _timed("create_client", connect_emulator)
+            print(f"Using Firestore emulator at {emulator_host()} (project: {EMULATOR_PROJECT_ID})")
+        else:
+            firestore = firestore_module()
+            get_app()
+            _firestore_client = _timed("create_client", firestore.client)
+        return _firestore_client
+
+
+def get_auth():
+    """Returns the firebase_admin.auth module bound to the shared app."""
+    global _auth_module
+    with _lock:
+        if _auth_module is None:
+            def load():
+                from firebase_admin import auth
+                return auth
+            _auth_module = _timed("import_auth", load)
+            get_app()
+        return _auth_module
+
+
+def startup_report():
+    """Returns {step: seconds} for every import/initialisation step this process has paid for so far."""
+    report = dict(_startup_timings)
+    report["total"] = sum(_startup_timings.values())
+    return report
+
+
+def print_startup_report():
+    """Prints the startup cost breakdown."""
+    report = startup_report()
+    steps = ", ".join(f"{step} {seconds * 1000:.0f} ms" for step, seconds in report.items() if step != "total")
+    print(f"Admin session startup: {report['total'] * 1000:.0f} ms ({steps or 'nothing initialised'})")
@@ -0,0 +1,336 @@
+import argparse
+import json
+import random
+import sys
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import admin_session
+from migrate_student_progress import STUDENT_PROGRESS_COLLECTION
+from seed_worksheets import (HASH_LOOKUP_CHUNK_SIZE, MAX_PARALLEL_COMMITS, MAX_RETRIES, RETRY_BASE_DELAY_SECONDS,
+                             WORKSHEETS_COLLECTION)
+
+try:
+    import numpy as np  # Optional: vectorises cohort marking (pip install numpy)
+except ImportError:
+    np = None
+
+# --- Configuration ---
+# Marks objective questions with the same rules as functions/src/marking.ts (the markStudentProgress trigger
+# marks each save; this re-marks whole cohorts, e.g. after an answer key is fixed). Keep the two in step.
+#   Quiz / Questionnaire         one point per MultipleChoiceQuestion: answers[questionId] == correctAnswerId
+#   FillInTheBlanksInteractive   one point per blank with correctAnswer/acceptedAnswers (case and spacing ignored)
+#   OrderSequenceInteractive     one point per position of correctOrderIds the student has right
+#   MatchingPairsInteractive     one point per matchSetA item paired as in correctPairs
+# Interactive answers are JSON strings under the section id (src/components/worksheets/sectionAnswers.ts).
+
+# Each re-marked document is one update; keep each WriteBatch well below Firestore's 500-write limit.
+MAX_SCORES_PER_BATCH = 400
+
+# Response code for a point the student hasn't answered; never equal to an accepted answer's code.
+NO_RESPONSE = -1
+
+
+def normalise_text(value):
+    """Matches normaliseText() in marking.ts: trimmed, inner whitespace collapsed, lower case."""
+    return " ".join(value.split()).lower()
+
+
+def pair_map(pairs):
+    """correctPairs (and student pairs) may be a {leftId: rightId} map or a list of {itemAId, itemBId} objects."""
+    if isinstance(pairs, list):
+        return {p["itemAId"]: p.get("itemBId") for p in pairs if isinstance(p, dict) and isinstance(p.get("itemAId"), str)}
+    return pairs if isinstance(pairs, dict) else {}
+
+
+def marking_points(worksheet_data):
+    """Flattens a worksheet's answer key into marking points, one mark each, in section order."""
+    points = []
+    for section in worksheet_data.get("sections") or []:
+        section_type = section.get("type")
+        section_id = section.get("id")
+        if section_type in ("Quiz", "Questionnaire"):
+            for question in section.get("questions") or []:
+                if question.get("type") == "MultipleChoiceQuestion" and question.get("correctAnswerId"):
+                    points.append({"sectionId": section_id, "answerId": question["id"], "kind": "choice",
+                                   "part": None, "accepted": [question["correctAnswerId"]]})
+        elif section_type == "FillInTheBlanksInteractive":
+            for segment in section.get("segments") or []:
+                if not isinstance(segment, dict):
+                    continue
+                accepted = [normalise_text(answer)
+                            for answer in [segment.get("correctAnswer")] + list(segment.get("acceptedAnswers") or [])
+                            if isinstance(answer, str)]
+                if accepted:
+                    points.append({"sectionId": section_id, "answerId": section_id, "kind": "blank",
+                                   "part": segment.get("id"), "accepted": accepted})
+        elif section_type == "OrderSequenceInteractive":
+            for position, item_id in enumerate(section.get("correctOrderIds") or []):
+                points.append({"sectionId": section_id, "answerId": section_id, "kind": "order",
+                               "part": position, "accepted": [item_id]})
+        elif section_type == "MatchingPairsInteractive":
+            for left_id, right_id in pair_map(section.get("correctPairs")).items():
+                points.append({"sectionId": section_id, "answerId": section_id, "kind": "match",
+                               "part": left_id, "accepted": [right_id]})
+    return points
+
+
+def parse_section_answer(stored):
+    if not isinstance(stored, str) or not stored:
+        return None
+    try:
+        return json.loads(stored)
+    except ValueError:
+        return None
+
+
+def point_response(point, answers, parsed):
+    """The student's response to one point (normalised for blanks), or None if they haven't given one."""
+    if point["kind"] == "choice":
+        response = answers.get(point["answerId"])
+        return response if isinstance(response, str) else None
+    if point["answerId"] not in parsed:
+        parsed[point["answerId"]] = parse_section_answer(answers.get(point["answerId"]))
+    answer = parsed[point["answerId"]]
+    response = None
+    if point["kind"] == "blank" and isinstance(answer, dict):
+        text = answer.get(point["part"])
+        response = normalise_text(text) if isinstance(text, str) else None
+    elif point["kind"] == "order" and isinstance(answer, list) and point["part"] < len(answer):
+        response = answer[point["part"]]
+    elif point["kind"] == "match":
+        response = pair_map(answer).get(point["part"])
+    return response if isinstance(response, str) else None
+
+
+def encode_responses(points, answer_maps):
+    """
+    Interns every response and accepted answer as an integer code, so marking is integer comparison.
+    Returns (rows, accepted_codes): one row of codes per student and a list of accepted codes per point.
+    """
+    codes = {}
+
+    def code(value):
+        return codes.setdefault(value, len(codes))
+
+    accepted_codes = [[code(answer) for answer in point["accepted"]] for point in points]
+    rows = []
+    for answers in answer_maps:
+        parsed = {}
+        row = []
+        for point in points:
+            response = point_response(point, answers or {}, parsed)
+            row.append(NO_RESPONSE if response is None else code(response))
+        rows.append(row)
+    return rows, accepted_codes
+
+
+def section_layout(points):
+    """(section_ids, section_index): each point's section as an index into section_ids, in first-seen order."""
+    section_ids = []
+    positions = {}
+    section_index = []
+    for point in points:
+        if point["sectionId"] not in positions:
+            positions[point["sectionId"]] = len(section_ids)
+            section_ids.append(point["sectionId"])
+        section_index.append(positions[point["sectionId"]])
+    return section_ids, section_index
+
+
+def mark_cohort(points, answer_maps):
+    """
+    Scores every answers map in answer_maps against one worksheet's marking points.
+    With NumPy the cohort is a (students x points) code matrix compared against the key in one pass and
+    summed per section with one matrix product; without it the same comparison runs row by row.
+    Returns a list of {"marks", "available", "sections": {sectionId: {"marks", "available"}}}.
+    """
+    rows, accepted_codes = encode_responses(points, answer_maps)
+    section_ids, section_index = section_layout(points)
+    if np is not None and rows and points:
+        responses = np.asarray(rows, dtype=np.int64)
+        correct = np.zeros(responses.shape, dtype=bool)
+        single = [j for j, accepted in enumerate(accepted_codes) if len(accepted) == 1]
+        correct[:, single] = responses[:, single] == np.asarray([accepted_codes[j][0] for j in single], dtype=np.int64)
+        for j, accepted in enumerate(accepted_codes):
+            if len(accepted) > 1:
+                correct[:, j] = np.isin(responses[:, j], accepted)
+        membership = np.zeros((len(points), len(section_ids)), dtype=np.int64)
+        membership[np.arange(len(points)), section_index] = 1
+        section_marks = (correct.astype(np.int64) @ membership).tolist()
+        available = membership.sum(axis=0).tolist()
+    else:
+        available = [0] * len(section_ids)
+        for index in section_index:
+            available[index] += 1
+        section_marks = []
+        for row in rows:
+            marks = [0] * len(section_ids)
+            for j, response in enumerate(row):
+                if response != NO_RESPONSE and response in accepted_codes[j]:
+                    marks[section_index[j]] += 1
+            section_marks.append(marks)
+    return [
+        {
+            "marks": sum(marks),
+            "available": sum(available),
+            "sections": {section_id: {"marks": marks[k], "available": available[k]}
+                         for k, section_id in enumerate(section_ids)},
+        }
+        for marks in section_marks
+    ]
+
+
+def same_score(stored, score):
+    """Whether a stored score already matches score (markedAt aside). Matches sameScore() in marking.ts."""
+    if not isinstance(stored, dict):
+        return False
+    return (stored.get("marks") == score["marks"] and stored.get("available") == score["available"]
+            and (stored.get("sections") or {}) == score["sections"])
+
+
+def load_progress(db_client, collection_name, worksheet_id=None, assignment_id=None):
+    """Returns {worksheetId: [(doc_id, answers, stored_score)]} for the progress documents to mark."""
+    field_filter = admin_session.firestore_module().FieldFilter
+    query = db_client.collection(collection_name)
+    if worksheet_id:
+        query = query.where(filter=field_filter("worksheetId", "==", worksheet_id))
+    if assignment_id:
+        query = query.where(filter=field_filter("assignmentId", "==", assignment_id))
+    cohorts = defaultdict(list)
+    for snapshot in query.select(["worksheetId", "answers", "score"]).stream():
+        data = snapshot.to_dict() or {}
+        if data.get("worksheetId"):
+            cohorts[data["worksheetId"]].append((snapshot.id, data.get("answers") or {}, data.get("score")))
+    return cohorts
+
+
+def load_answer_keys(db_client, worksheet_ids):
+    """Returns {worksheetId: marking points} for the worksheets that exist."""
+    collection_ref = db_client.collection(WORKSHEETS_COLLECTION)
+    keys = {}
+    for start in range(0, len(worksheet_ids), HASH_LOOKUP_CHUNK_SIZE):
+        refs = [collection_ref.document(doc_id) for doc_id in worksheet_ids[start:start + HASH_LOOKUP_CHUNK_SIZE]]
+        for snapshot in db_client.get_all(refs, field_paths=["sections"]):
+            if snapshot.exists:
+                keys[snapshot.id] = marking_points(snapshot.to_dict() or {})
+    return keys
+
+
+def commit_score_batch(db_client, collection_name, updates, max_retries=MAX_RETRIES):
+    """Writes one batch of {doc_id: score} updates, retrying with exponential backoff. Returns the retry count."""
+    collection_ref = db_client.collection(collection_name)
+    server_timestamp = admin_session.firestore_module().SERVER_TIMESTAMP
+    attempt = 0
+    while True:
+        batch = db_client.batch()
+        for doc_id, score in updates:
+            batch.update(collection_ref.document(doc_id), {"score": dict(score, markedAt=server_timestamp)})
+        try:
+            batch.commit()
+            return attempt
+        except Exception as e:
+            if attempt >= max_retries:
+                raise
+            delay = RETRY_BASE_DELAY_SECONDS * (2 ** attempt) + random.uniform(0, RETRY_BASE_DELAY_SECONDS)
+            attempt += 1
+            print(f"  Batch starting at '{updates[0][0]}' failed ({e}); retry {attempt}/{max_retries} in {delay:.2f}s")
+            time.sleep(delay)
+
+
+def mark_progress(db_client, collection_name=STUDENT_PROGRESS_COLLECTION, worksheet_id=None, assignment_id=None,
+                  dry_run=False, max_workers=MAX_PARALLEL_COMMITS):
+    """Re-marks every matching progress document and writes the scores that changed. Returns a report dict."""
+    start = time.perf_counter()
+    cohorts = load_progress(db_client, collection_name, worksheet_id, assignment_id)
+    answer_keys = load_answer_keys(db_client, sorted(cohorts))
+
+    report = {
+        "documents": sum(len(cohort) for cohort in cohorts.values()),
+        "worksheets": len(cohorts),
+        "missing_worksheets": sorted(set(cohorts) - set(answer_keys)),
+        "vectorised": np is not None,
+        "changed": 0,
+        "written": 0,
+        "retries": 0,
+        "failed": [],
+    }
+    updates = []
+    mark_start = time.perf_counter()
+    for cohort_worksheet_id, cohort in cohorts.items():
+        points = answer_keys.get(cohort_worksheet_id)
+        if not points:
+            continue
+        scores = mark_cohort(points, [answers for _, answers, _ in cohort])
+        updates.extend((doc_id, score) for (doc_id, _, stored), score in zip(cohort, scores)
+                       if not same_score(stored, score))
+    report["marking_seconds"] = time.perf_counter() - mark_start
+    report["changed"] = len(updates)
+
+    if not dry_run:
+        batches = [updates[i:i + MAX_SCORES_PER_BATCH] for i in range(0, len(updates), MAX_SCORES_PER_BATCH)]
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            futures = {executor.submit(commit_score_batch, db_client, collection_name, batch): batch for batch in batches}
+            for future in as_completed(futures):
+                batch = futures[future]
+                try:
+                    report["retries"] += future.result()
+                    report["written"] += len(batch)
+                except Exception as e:
+                    print(f"Error writing batch of {len(batch)} scores: {e}")
+                    report["failed"].extend(doc_id for doc_id, _ in batch)
+    report["elapsed_seconds"] = time.perf_counter() - start
+    return report
+
+
+def print_report(report, dry_run=False):
+    """Prints a human-readable marking summary."""
+    print("\n--- Auto-marking ---")
+    print(f"Progress documents: {report['documents']} across {report['worksheets']} worksheet(s)")
+    print(f"Marked in {report['marking_seconds'] * 1000:.1f} ms "
+          f"({'NumPy' if report['vectorised'] else 'pure Python; pip install numpy to vectorise'})")
+    if dry_run:
+        print(f"Dry run: {report['changed']} score(s) would change; nothing was written.")
+    else:
+        print(f"Scores changed: {report['changed']}, written: {report['written']} (retries: {report['retries']})")
+    print(f"Elapsed: {report['elapsed_seconds']:.3f}s")
+    if report["missing_worksheets"]:
+        print(f"Skipped (worksheet not found): {', '.join(report['missing_worksheets'])}")
+    if report["failed"]:
+        print(f"Failed ({len(report['failed'])}): {', '.join(report['failed'])}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Re-mark saved studentProgress answers against the current worksheet answer keys.")
+    parser.add_argument("--worksheet", metavar="ID", help="Only mark progress on this worksheet")
+    parser.add_argument("--assignment", metavar="ID", help="Only mark progress for this assignment")
+    parser.add_argument("--collection", default=STUDENT_PROGRESS_COLLECTION)
+    parser.add_argument("--workers", type=int, default=MAX_PARALLEL_COMMITS,
+                        help="Maximum number of batches committed concurrently")
+    parser.add_argument("--dry-run", action="store_true", help="Report which scores would change; write nothing")
+    parser.add_argument("--emulator", metavar="HOST:PORT", help="Use the Firestore emulator")
+    parser.add_argument("--project", help="Project ID to use with the emulator")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON instead of text")
+    args = parser.parse_args(argv)
+
+    if args.emulator:
+        admin_session.use_emulator(args.emulator, args.project)
+    try:
+        db = admin_session.get_firestore()
+    except Exception as e:
+        print(f"Error initializing Firebase Admin SDK: {e}")
+        return 1
+
+    report = mark_progress(db, args.collection, worksheet_id=args.worksheet, assignment_id=args.assignment,
+                           dry_run=args.dry_run, max_workers=args.workers)
+    if args.json:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    else:
+        print_report(report, dry_run=args.dry_run)
+    return 1 if report["failed"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
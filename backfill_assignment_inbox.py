@@ -0,0 +1,150 @@
+import argparse
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import admin_session
+from seed_worksheets import HASH_LOOKUP_CHUNK_SIZE, MAX_BATCH_DOCS, MAX_PARALLEL_COMMITS, MAX_RETRIES, RETRY_BASE_DELAY_SECONDS
+
+# --- Configuration ---
+ASSIGNMENTS_COLLECTION = "assignments"
+CLASSES_COLLECTION = "classes"
+USERS_COLLECTION = "users"
+# users/{uid}/assignmentInbox/{assignmentId}; matches ASSIGNMENT_INBOX_COLLECTION in functions/src/index.ts.
+INBOX_COLLECTION = "assignmentInbox"
+
+# Assignment fields copied into each inbox entry (inboxEntry() in functions/src/index.ts).
+INBOX_FIELDS = ("worksheetId", "worksheetTitle", "classId", "className", "teacherId", "assignedAt")
+
+
+def inbox_entry(assignment_id, assignment_data):
+    """The inbox document written for one student and one assignment."""
+    entry = {field: assignment_data.get(field) for field in INBOX_FIELDS}
+    entry["assignmentId"] = assignment_id
+    return entry
+
+
+def fetch_assignments(db_client):
+    """Returns [(assignment_id, data)] for every assignment."""
+    return [(snapshot.id, snapshot.to_dict() or {}) for snapshot in db_client.collection(ASSIGNMENTS_COLLECTION).stream()]
+
+
+def fetch_class_rosters(db_client, class_ids):
+    """Returns {class_id: [student_uid]} reading only each class's studentIds."""
+    collection_ref = db_client.collection(CLASSES_COLLECTION)
+    rosters = {}
+    for start in range(0, len(class_ids), HASH_LOOKUP_CHUNK_SIZE):
+        refs = [collection_ref.document(class_id) for class_id in class_ids[start:start + HASH_LOOKUP_CHUNK_SIZE]]
+        for snapshot in db_client.get_all(refs, field_paths=["studentIds"]):
+            if snapshot.exists:
+                rosters[snapshot.id] = (snapshot.to_dict() or {}).get("studentIds") or []
+    return rosters
+
+
+def plan_entries(assignments, rosters):
+    """Returns [(student_uid, assignment_id, entry)] for every enrolled student of every assignment's class."""
+    plan = []
+    for assignment_id, data in assignments:
+        entry = inbox_entry(assignment_id, data)
+        for student_uid in rosters.get(data.get("classId"), []):
+            plan.append((student_uid, assignment_id, entry))
+    return plan
+
+
+def commit_entry_batch(db_client, entries, max_retries=MAX_RETRIES):
+    """
+    Writes one WriteBatch of inbox entries, retrying the whole batch with exponential backoff.
+    set() is idempotent, so entries that already exist are simply rewritten. Returns the retry count.
+    """
+    users_ref = db_client.collection(USERS_COLLECTION)
+    attempt = 0
+    while True:
+        batch = db_client.batch()
+        for student_uid, assignment_id, entry in entries:
+            batch.set(users_ref.document(student_uid).collection(INBOX_COLLECTION).document(assignment_id), entry)
+        try:
+            batch.commit()
+            return attempt
+        except Exception as e:
+            if attempt >= max_retries:
+                raise
+            delay = RETRY_BASE_DELAY_SECONDS * (2 ** attempt) + random.uniform(0, RETRY_BASE_DELAY_SECONDS)
+            attempt += 1
+            print(f"  Batch starting at '{entries[0][0]}/{entries[0][1]}' failed ({e}); "
+                  f"retry {attempt}/{max_retries} in {delay:.2f}s")
+            time.sleep(delay)
+
+
+def backfill_assignment_inbox(db_client, dry_run=False, max_workers=MAX_PARALLEL_COMMITS):
+    """Writes an inbox entry for every enrolled student of every existing assignment. Returns a report dict."""
+    start = time.perf_counter()
+    assignments = fetch_assignments(db_client)
+    class_ids = sorted({data.get("classId") for _, data in assignments if data.get("classId")})
+    rosters = fetch_class_rosters(db_client, class_ids)
+    plan = plan_entries(assignments, rosters)
+
+    report = {
+        "assignments": len(assignments),
+        "classes": len(class_ids),
+        "missingClasses": sorted(set(class_ids) - set(rosters)),
+        "entries": len(plan),
+        "written": 0,
+        "retries": 0,
+        "failed": 0,
+    }
+    if not dry_run:
+        batches = [plan[i:i + MAX_BATCH_DOCS] for i in range(0, len(plan), MAX_BATCH_DOCS)]
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            futures = {executor.submit(commit_entry_batch, db_client, batch): batch for batch in batches}
+            for future in as_completed(futures):
+                batch = futures[future]
+                try:
+                    report["retries"] += future.result()
+                    report["written"] += len(batch)
+                except Exception as e:
+                    print(f"Error writing batch of {len(batch)} inbox entries: {e}")
+                    report["failed"] += len(batch)
+    report["elapsed_seconds"] = time.perf_counter() - start
+    return report
+
+
+def print_report(report, dry_run=False):
+    """Prints a human-readable backfill summary."""
+    print("\n--- Assignment inbox backfill ---")
+    print(f"Assignments: {report['assignments']} across {report['classes']} class(es)")
+    print(f"Inbox entries: {report['entries']}")
+    if dry_run:
+        print("Dry run: nothing was written.")
+    else:
+        print(f"Written: {report['written']} (retries: {report['retries']})")
+    print(f"Elapsed: {report['elapsed_seconds']:.3f}s")
+    if report["missingClasses"]:
+        print(f"Skipped assignments of deleted classes: {', '.join(report['missingClasses'])}")
+    if report["failed"]:
+        print(f"Failed entries: {report['failed']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Fan existing assignments out to users/{uid}/assignmentInbox for every enrolled student.")
+    parser.add_argument("--workers", type=int, default=MAX_PARALLEL_COMMITS,
+                        help="Maximum number of batches committed concurrently")
+    parser.add_argument("--dry-run", action="store_true", help="Report what would be written; write nothing")
+    parser.add_argument("--emulator", metavar="HOST:PORT", help="Use the Firestore emulator")
+    parser.add_argument("--project", help="Project ID to use with the emulator")
+    args = parser.parse_args(argv)
+
+    if args.emulator:
+        admin_session.use_emulator(args.emulator, args.project)
+    try:
+        db = admin_session.get_firestore()
+    except Exception as e:
+        print(f"Error initializing Firebase Admin SDK: {e}")
+        return 1
+
+    report = backfill_assignment_inbox(db, dry_run=args.dry_run, max_workers=args.workers)
+    print_report(report, dry_run=args.dry_run)
+    return 1 if report["failed"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,133 @@
+import argparse
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import admin_session
+from seed_worksheets import MAX_BATCH_DOCS, MAX_PARALLEL_COMMITS, MAX_RETRIES, RETRY_BASE_DELAY_SECONDS
+
+# --- Configuration ---
+CLASSES_COLLECTION = "classes"
+USERS_COLLECTION = "users"
+
+# The firestore.rules users read rule only lets a teacher read a student's profile when the teacher's UID is in
+# its teacherIds. The functions keep the field up to date (syncTeacherIds() in functions/src/index.ts); run this
+# once before deploying that rule, and whenever classes were edited outside the functions.
+TEACHER_IDS_FIELD = "teacherIds"
+
+
+def fetch_class_teachers(db_client):
+    """Returns {student_uid: sorted teacher UIDs} from every class's teacherId and studentIds."""
+    teachers = {}
+    query = db_client.collection(CLASSES_COLLECTION).select(["teacherId", "studentIds"])
+    for snapshot in query.stream():
+        data = snapshot.to_dict() or {}
+        if not data.get("teacherId"):
+            continue
+        for student_uid in data.get("studentIds") or []:
+            teachers.setdefault(student_uid, set()).add(data["teacherId"])
+    return {student_uid: sorted(teacher_ids) for student_uid, teacher_ids in teachers.items()}
+
+
+def plan_updates(db_client, class_teachers):
+    """Returns [(student_uid, teacher_ids)] for every student profile whose teacherIds is out of date."""
+    updates = []
+    query = db_client.collection(USERS_COLLECTION).select(["role", TEACHER_IDS_FIELD])
+    for snapshot in query.stream():
+        data = snapshot.to_dict() or {}
+        if data.get("role") != "student":
+            continue
+        expected = class_teachers.get(snapshot.id, [])
+        if sorted(data.get(TEACHER_IDS_FIELD) or []) != expected or TEACHER_IDS_FIELD not in data:
+            updates.append((snapshot.id, expected))
+    return updates
+
+
+def commit_update_batch(db_client, updates, max_retries=MAX_RETRIES):
+    """Writes one WriteBatch of teacherIds updates, retrying with exponential backoff. Returns the retry count."""
+    users_ref = db_client.collection(USERS_COLLECTION)
+    attempt = 0
+    while True:
+        batch = db_client.batch()
+        for student_uid, teacher_ids in updates:
+            batch.update(users_ref.document(student_uid), {TEACHER_IDS_FIELD: teacher_ids})
+        try:
+            batch.commit()
+            return attempt
+        except Exception as e:
+            if attempt >= max_retries:
+                raise
+            delay = RETRY_BASE_DELAY_SECONDS * (2 ** attempt) + random.uniform(0, RETRY_BASE_DELAY_SECONDS)
+            attempt += 1
+            print(f"  Batch starting at '{updates[0][0]}' failed ({e}); retry {attempt}/{max_retries} in {delay:.2f}s")
+            time.sleep(delay)
+
+
+def backfill_teacher_ids(db_client, dry_run=False, max_workers=MAX_PARALLEL_COMMITS):
+    """Sets teacherIds on every student profile from the class rosters. Returns a report dict."""
+    start = time.perf_counter()
+    class_teachers = fetch_class_teachers(db_client)
+    updates = plan_updates(db_client, class_teachers)
+
+    report = {
+        "enrolledStudents": len(class_teachers),
+        "updates": len(updates),
+        "unenrolled": sum(1 for _, teacher_ids in updates if not teacher_ids),
+        "written": 0,
+        "retries": 0,
+        "failed": 0,
+    }
+    if not dry_run:
+        batches = [updates[i:i + MAX_BATCH_DOCS] for i in range(0, len(updates), MAX_BATCH_DOCS)]
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            futures = {executor.submit(commit_update_batch, db_client, batch): batch for batch in batches}
+            for future in as_completed(futures):
+                batch = futures[future]
+                try:
+                    report["retries"] += future.result()
+                    report["written"] += len(batch)
+                except Exception as e:
+                    print(f"Error writing batch of {len(batch)} profile updates: {e}")
+                    report["failed"] += len(batch)
+    report["elapsed_seconds"] = time.perf_counter() - start
+    return report
+
+
+def print_report(report, dry_run=False):
+    """Prints a human-readable backfill summary."""
+    print("\n--- Student teacherIds backfill ---")
+    print(f"Enrolled students: {report['enrolledStudents']}")
+    print(f"Profiles to update: {report['updates']} ({report['unenrolled']} in no class)")
+    if dry_run:
+        print("Dry run: nothing was written.")
+    else:
+        print(f"Written: {report['written']} (retries: {report['retries']})")
+    print(f"Elapsed: {report['elapsed_seconds']:.3f}s")
+    if report["failed"]:
+        print(f"Failed updates: {report['failed']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Set teacherIds on every student profile from the class rosters (needed by the users read rule).")
+    parser.add_argument("--workers", type=int, default=MAX_PARALLEL_COMMITS,
+                        help="Maximum number of batches committed concurrently")
+    parser.add_argument("--dry-run", action="store_true", help="Report what would be written; write nothing")
+    parser.add_argument("--emulator", metavar="HOST:PORT", help="Use the Firestore emulator")
+    parser.add_argument("--project", help="Project ID to use with the emulator")
+    args = parser.parse_args(argv)
+
+    if args.emulator:
+        admin_session.use_emulator(args.emulator, args.project)
+    try:
+        db = admin_session.get_firestore()
+    except Exception as e:
+        print(f"Error initializing Firebase Admin SDK: {e}")
+        return 1
+
+    report = backfill_teacher_ids(db, dry_run=args.dry_run, max_workers=args.workers)
+    print_report(report, dry_run=args.dry_run)
+    return 1 if report["failed"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,47 @@
+import hashlib
+import json
+
+# --- Configuration ---
+# Fields that change on every write (or are derived from the content itself) and must not affect the hash.
+VOLATILE_FIELDS = {"createdAt", "lastScriptUpdate", "contentHash", "sectionHashes"}
+
+
+def canonical_json(value):
+    """
+    Serialises a value to a stable JSON string: sorted keys, no whitespace, UTF-8 kept as-is.
+    Anything JSON can't represent (datetimes, Firestore sentinels) is stringified.
+    """
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def hash_content(value):
+    """Returns the SHA-256 hex digest of a value's canonical JSON form."""
+    return hashlib.sha256(canonical_json(value).encode("utf-8")).hexdigest()
+
+
+def section_hash(section):
+    """Hash of a single section dict."""
+    return hash_content(section)
+
+
+def worksheet_hashes(worksheet_data):
+    """
+    Returns (content_hash, section_hashes) for a worksheet dict.
+    section_hashes maps each section id to its hash; content_hash covers every non-volatile field.
+    """
+    stable_data = {key: value for key, value in worksheet_data.items() if key not in VOLATILE_FIELDS}
+    section_hashes = {
+        section["id"]: section_hash(section)
+        for section in stable_data.get("sections", [])
+        if "id" in section
+    }
+    return hash_content(stable_data), section_hashes
+
+
+def stamp_hashes(worksheet_data):
+    """Returns a copy of worksheet_data with contentHash and sectionHashes fields set."""
+    content_hash, section_hashes = worksheet_hashes(worksheet_data)
+    stamped = dict(worksheet_data)
+    stamped["contentHash"] = content_hash
+    stamped["sectionHashes"] = section_hashes
+    return stamped
@@ -0,0 +1,116 @@
+import json
+import os
+from worksheet_content import find_content_files, parse_content_bytes
+from worksheet_index import index_entry, unit_number_slug
+
+# --- Configuration ---
+# One file per course: title, resources and the specification's components and units, in display order.
+COURSES_DIR = "content/courses"
+# Read at build time (and on revalidation) by src/lib/courseTree.ts; written by static_export.py.
+TREE_PATH = "public/content/course-tree.json"
+
+TREE_VERSION = 1
+
+# Worksheets whose unit isn't in their course's catalogue are listed under this component.
+OTHER_COMPONENT = {"id": "other", "title": "Other Worksheets"}
+
+# Summary fields each unit page lists per worksheet.
+WORKSHEET_FIELDS = ("title", "specReference", "learningObjectives", "sectionCount")
+
+
+def load_course_catalogues(courses_dir=COURSES_DIR):
+    """Returns every course catalogue under courses_dir, in file order."""
+    if not os.path.isdir(courses_dir):
+        return []
+    catalogues = []
+    for file_path in find_content_files(courses_dir):
+        with open(file_path, "rb") as f:
+            catalogues.append(parse_content_bytes(file_path, f.read()))
+    return catalogues
+
+
+def catalogue_course(catalogue):
+    """An empty tree course for a catalogue: its components and units, with no worksheets yet."""
+    components = []
+    for component in catalogue.get("components") or []:
+        units = []
+        for unit in component.get("units") or []:
+            number = str(unit["number"])
+            units.append({
+                "slug": unit.get("slug") or unit_number_slug(number),
+                "number": number,
+                "title": unit["title"],
+                "worksheets": [],
+            })
+        components.append({"id": component["id"], "title": component["title"], "units": units})
+    return {
+        "slug": catalogue["slug"],
+        "title": catalogue.get("title") or catalogue["slug"].upper(),
+        "board": catalogue.get("board"),
+        "resources": catalogue.get("resources") or [],
+        "components": components,
+    }
+
+
+def find_unit(course, entry):
+    """The catalogue unit a worksheet belongs to, matched by unit slug first and then by unit number."""
+    units = [unit for component in course["components"] for unit in component["units"]]
+    for unit in units:
+        if entry["unitSlug"] and unit["slug"] == entry["unitSlug"]:
+            return unit
+    for unit in units:
+        if entry["unitNumber"] and unit["number"] == entry["unitNumber"]:
+            return unit
+    return None
+
+
+def other_unit(course, entry):
+    """The catch-all unit (created on demand) for a worksheet that matches no catalogue unit."""
+    component = next((c for c in course["components"] if c["id"] == OTHER_COMPONENT["id"]), None)
+    if component is None:
+        component = dict(OTHER_COMPONENT, units=[])
+        course["components"].append(component)
+    slug = entry["unitSlug"] or "other"
+    unit = next((u for u in component["units"] if u["slug"] == slug), None)
+    if unit is None:
+        unit = {"slug": slug, "number": entry["unitNumber"], "title": entry["unit"] or "Other", "worksheets": []}
+        component["units"].append(unit)
+    return unit
+
+
+def build_course_tree(catalogues, definitions):
+    """
+    Places every (doc_id, worksheet_data) under its course and unit. Courses come from the catalogues;
+    a worksheet whose course has no catalogue gets a course of its own. Worksheets are sorted by title.
+    """
+    courses = {}
+    for catalogue in catalogues:
+        course = catalogue_course(catalogue)
+        courses[course["slug"]] = course
+
+    for doc_id, worksheet_data in definitions:
+        entry = index_entry(worksheet_data)
+        if not entry["courseSlug"]:
+            continue
+        course = courses.get(entry["courseSlug"])
+        if course is None:
+            course = catalogue_course({"slug": entry["courseSlug"], "title": entry["course"]})
+            courses[course["slug"]] = course
+        unit = find_unit(course, entry) or other_unit(course, entry)
+        unit["worksheets"].append(dict({field: entry[field] for field in WORKSHEET_FIELDS}, id=doc_id))
+
+    for course in courses.values():
+        for component in course["components"]:
+            for unit in component["units"]:
+                unit["worksheets"].sort(key=lambda w: (w["title"].lower(), w["id"]))
+    return {"version": TREE_VERSION, "courses": list(courses.values())}
+
+
+def write_course_tree(tree, tree_path=TREE_PATH):
+    """Writes the tree atomically, so a page regenerating mid-export never reads half a file."""
+    os.makedirs(os.path.dirname(tree_path) or ".", exist_ok=True)
+    temp_path = f"{tree_path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(tree, f, indent=2, ensure_ascii=False)
+        f.write("\n")
+    os.replace(temp_path, tree_path)
@@ -1,5 +1,6 @@
 import * as functions from "firebase-functions/v1";
 import * as admin from "firebase-admin";
+import { MarkingPoint, markAnswers, markingPoints, sameScore } from "./marking";
 
 if (admin.apps.length === 0) {
   admin.initializeApp();
@@ -11,6 +12,21 @@ const auth = admin.auth();
 // --- Configuration ---
 const TEMPORARY_DEFAULT_STUDENT_PASSWORD = "changeme123"; // CHOOSE A SECURE DEFAULT OR MAKE IT AN ENV VAR
 const STUDENT_EMAIL_DOMAIN = "mgsstudent.system"; // Define a fixed domain for student system emails
+const MAX_STUDENTS_PER_CALL = 300; // Enough for a full year group in one call
+const AUTH_CREATE_CONCURRENCY = 10; // Parallel Auth createUser calls per invocation
+const USERNAMES_COLLECTION = "usernames"; // usernames/{username} reservations, one per student
+const USERNAME_POOL_COLLECTION = "usernamePool"; // Shards of known-free names, see username_pool.py
+// A reservation still without a uid this long after it was made belongs to a call that died mid-way;
+// sweepUsernameReservations releases it (or links it, if the profile was written after all).
+const RESERVATION_TTL_MS = 60 * 60 * 1000;
+const ASSIGNMENT_INBOX_COLLECTION = "assignmentInbox"; // users/{uid}/assignmentInbox/{assignmentId}, one per student
+// Custom claims must stay under 1000 bytes; students in more classes than this get classIdsOverflow instead
+// and the client reads classIds from their profile. Mirrors MAX_CLAIM_CLASS_IDS in user_claims.py.
+const MAX_CLAIM_CLASS_IDS = 25;
+const STUDENT_PROGRESS_COLLECTION = "studentProgress"; // studentProgress/{assignmentId}_{studentId}
+// Answer keys are cached per instance so autosaves don't re-read the worksheet each time; a fixed key
+// reaches the trigger within this window (auto_marking.py re-marks existing progress straight away).
+const ANSWER_KEY_CACHE_MS = 5 * 60 * 1000;
 
 // --- Helper functions for username generation ---
 const ADJECTIVES = [
@@ -47,23 +63,171 @@ function generateUsername(): string {
   return `${adj.toLowerCase()}-${noun.toLowerCase()}${num}`;
 }
 
-async function isUsernameUnique(username: string): Promise<boolean> {
-  const usersRef = db.collection("users");
-  const snapshot = await usersRef.where("username", "==", username).limit(1).get();
-  return snapshot.empty;
+// Takes up to `count` pre-generated free names from a random usernamePool shard (published by
+// username_pool.py). Returns an empty list when no pool has been published.
+async function drawPooledUsernames(count: number): Promise<string[]> {
+  const shards = await db.collection(USERNAME_POOL_COLLECTION).where("remaining", ">", 0).select().get();
+  if (shards.empty) {
+    return [];
+  }
+  const shardRef = shards.docs[Math.floor(Math.random() * shards.size)].ref;
+  return db.runTransaction(async (transaction) => {
+    const shard = await transaction.get(shardRef);
+    const names: string[] = shard.get("names") || [];
+    const drawn = names.slice(0, count);
+    transaction.update(shardRef, { names: names.slice(drawn.length), remaining: names.length - drawn.length });
+    return drawn;
+  });
+}
+
+// Claims usernames/{username} with create(), which fails if the document already exists, so each name
+// is reserved by exactly one caller with a single keyed write. Returns the names that were claimed.
+async function reserveUsernames(candidates: string[]): Promise<string[]> {
+  const writer = db.bulkWriter();
+  const claims = candidates.map((username) =>
+    writer
+      .create(db.collection(USERNAMES_COLLECTION).doc(username), {
+        uid: null,
+        reservedAt: admin.firestore.FieldValue.serverTimestamp(),
+      })
+      .then(() => username, () => null)
+  );
+  await writer.close();
+  const claimed = await Promise.all(claims);
+  return claimed.filter((username): username is string => username !== null);
+}
+
+// Best-effort removal of a reservation whose account was never created.
+async function releaseUsername(username: string): Promise<void> {
+  try {
+    await db.collection(USERNAMES_COLLECTION).doc(username).delete();
+  } catch (error: unknown) {
+    functions.logger.warn(`Could not release username reservation ${username}:`, error);
+  }
 }
 
-async function generateUniqueUsername(): Promise<string> {
-  let username = generateUsername();
-  let attempts = 0;
-  while (!(await isUsernameUnique(username)) && attempts < 10) {
-    username = generateUsername();
-    attempts++;
+// Reserves `count` distinct usernames, preferring names from the pre-generated pool and topping up
+// with random ones. A stale pool entry or random collision just fails its create() and is replaced.
+async function generateUniqueUsernames(count: number): Promise<string[]> {
+  const accepted = new Set<string>();
+  let pooled = await drawPooledUsernames(count);
+  for (let round = 0; round < 10 && accepted.size < count; round++) {
+    const candidates = new Set(pooled.filter((candidate) => !accepted.has(candidate)));
+    pooled = [];
+    while (candidates.size < count - accepted.size) {
+      const candidate = generateUsername();
+      if (!accepted.has(candidate)) {
+        candidates.add(candidate);
+      }
+    }
+    (await reserveUsernames([...candidates])).forEach((username) => accepted.add(username));
   }
-  if (attempts >= 10) {
-    return `${username}${Date.now().toString().slice(-4)}`;
+  if (accepted.size < count) {
+    throw new functions.https.HttpsError("resource-exhausted", "Could not generate enough unique usernames. Please try again.");
+  }
+  return [...accepted];
+}
+
+// Runs `worker` over `items` with at most `limit` calls in flight, preserving result order.
+async function mapWithConcurrency<T, R>(items: T[], limit: number, worker: (item: T) => Promise<R>): Promise<R[]> {
+  const results: R[] = new Array(items.length);
+  let nextIndex = 0;
+  const runners = Array.from({ length: Math.min(limit, items.length) }, async () => {
+    while (nextIndex < items.length) {
+      const index = nextIndex++;
+      results[index] = await worker(items[index]);
+    }
+  });
+  await Promise.all(runners);
+  return results;
+}
+
+// Fields copied from an assignment into each student's inbox entry; enough to list it without reading the assignment.
+function inboxEntry(assignmentId: string, assignment: admin.firestore.DocumentData): admin.firestore.DocumentData {
+  return {
+    assignmentId: assignmentId,
+    worksheetId: assignment.worksheetId,
+    worksheetTitle: assignment.worksheetTitle,
+    classId: assignment.classId,
+    className: assignment.className,
+    teacherId: assignment.teacherId,
+    assignedAt: assignment.assignedAt,
+  };
+}
+
+// Writes an inbox entry for every (student, assignment) pair through one BulkWriter. set() is idempotent,
+// so re-running for the same assignments only repairs entries that are missing. Returns the failed writes.
+async function fanOutToInboxes(
+  assignments: Array<{ id: string; data: admin.firestore.DocumentData }>,
+  studentUids: string[]
+): Promise<number> {
+  const writer = db.bulkWriter();
+  let failed = 0;
+  const writes: Promise<unknown>[] = [];
+  studentUids.forEach((uid) => {
+    const inboxRef = db.collection("users").doc(uid).collection(ASSIGNMENT_INBOX_COLLECTION);
+    assignments.forEach((assignment) => {
+      writes.push(writer.set(inboxRef.doc(assignment.id), inboxEntry(assignment.id, assignment.data)).catch((error: unknown) => {
+        failed++;
+        functions.logger.warn(`Could not write inbox entry ${assignment.id} for student ${uid}:`, error);
+      }));
+    });
+  });
+  await writer.close();
+  await Promise.all(writes);
+  return failed;
+}
+
+// Custom claims derived from a users/{uid} profile: the ID token carries role, class membership and the
+// password-reset flag, so AuthProvider and the security rules don't need to read the profile.
+// Keep in step with claims_from_profile() in user_claims.py.
+function claimsFromProfile(profile: admin.firestore.DocumentData | undefined): Record<string, unknown> {
+  const claims: Record<string, unknown> = {
+    role: profile?.role ?? null,
+    passwordNeedsReset: profile?.passwordNeedsReset === true,
+  };
+  if (profile?.role === "student") {
+    const classIds: string[] = profile.classIds || [];
+    if (classIds.length > MAX_CLAIM_CLASS_IDS) {
+      claims.classIdsOverflow = true;
+    } else {
+      claims.classIds = classIds;
+    }
   }
-  return username;
+  return claims;
+}
+
+// Re-derives a user's claims from their (already updated) profile. New claims reach the client on its next
+// token refresh; see src/services/authClaims.ts.
+async function syncClaimsFromProfile(uid: string): Promise<void> {
+  const profile = await db.collection("users").doc(uid).get();
+  await auth.setCustomUserClaims(uid, claimsFromProfile(profile.data()));
+}
+
+// Re-derives a student's teacherIds (the owners of the classes in their profile's classIds). The users read
+// rule checks it, so a teacher can only load the profiles of their own students. Mirrors backfill_teacher_ids.py.
+async function syncTeacherIds(uid: string): Promise<void> {
+  const userRef = db.collection("users").doc(uid);
+  const classIds: string[] = (await userRef.get()).data()?.classIds || [];
+  const classDocs = classIds.length > 0 ?
+    await db.getAll(...classIds.map((classId) => db.collection("classes").doc(classId)), { fieldMask: ["teacherId"] }) :
+    [];
+  const teacherIds = new Set(classDocs.map((docSnap) => docSnap.get("teacherId")).filter((id): id is string => typeof id === "string"));
+  await userRef.update({ teacherIds: Array.from(teacherIds).sort() });
+}
+
+const answerKeyCache = new Map<string, { points: MarkingPoint[] | null; loadedAt: number }>();
+
+// The marking points for a worksheet (see marking.ts), or null if the worksheet doesn't exist.
+async function answerKey(worksheetId: string): Promise<MarkingPoint[] | null> {
+  const cached = answerKeyCache.get(worksheetId);
+  if (cached && Date.now() - cached.loadedAt < ANSWER_KEY_CACHE_MS) {
+    return cached.points;
+  }
+  const worksheetDoc = await db.collection("worksheets").doc(worksheetId).get();
+  const points = worksheetDoc.exists ? markingPoints(worksheetDoc.data() || {}) : null;
+  answerKeyCache.set(worksheetId, { points, loadedAt: Date.now() });
+  return points;
 }
 
 function generatePassword(length: number = 10): string {
@@ -81,8 +245,74 @@ interface BulkCreateStudentsPayload {
   count: number;
 }
 
+interface CreatedStudentInfo {
+  uid: string;
+  username: string;
+  email?: string; // The system email created for Firebase Auth
+}
+
+// Creates one student's Auth account under an already reserved username. A legacy account can still
+// own the matching system email, in which case we reserve a fresh name and try again. Any other
+// failure releases the reservation.
+async function createStudentAuthAccount(initialUsername: string): Promise<CreatedStudentInfo | null> {
+  let username = initialUsername;
+  for (let attempt = 0; attempt < 3; attempt++) {
+    const placeholderEmail = `${username}@${STUDENT_EMAIL_DOMAIN}`;
+    try {
+      const userRecord = await auth.createUser({
+        email: placeholderEmail,
+        emailVerified: false,
+        password: TEMPORARY_DEFAULT_STUDENT_PASSWORD,
+        displayName: username,
+        disabled: false,
+      });
+      return { uid: userRecord.uid, username: username, email: placeholderEmail };
+    } catch (error: unknown) {
+      let errorCode = "UNKNOWN_ERROR";
+      let errorMessage = "An unknown error occurred during student creation.";
+      if (error instanceof Error) {
+        errorMessage = error.message;
+        if (typeof error === "object" && error !== null && "code" in error) {
+          errorCode = String((error as { code: string }).code);
+        }
+      }
+      if (errorCode === "auth/email-already-exists") {
+        // Keep the reservation: the name really is taken.
+        try {
+          [username] = await generateUniqueUsernames(1);
+        } catch (reserveError: unknown) {
+          // No new name was reserved, so there is nothing of ours left to release.
+          functions.logger.error(`Failed to reserve a replacement for taken username ${username}:`, reserveError);
+          return null;
+        }
+        continue;
+      }
+      functions.logger.error(`Failed to create student (intended username ${username}, email: ${placeholderEmail}):`, errorCode, errorMessage, error);
+      await releaseUsername(username);
+      return null;
+    }
+  }
+  functions.logger.error(`Failed to create student after repeated username collisions (last tried ${username}).`);
+  await releaseUsername(username);
+  return null;
+}
+
+// Removes an account whose profile couldn't be saved (Auth user, any partial profile and the username
+// reservation), so no Auth user is left without a profile. Best effort: failures are logged.
+async function discardStudentAccount(student: CreatedStudentInfo): Promise<void> {
+  try {
+    await auth.deleteUser(student.uid);
+    await db.collection("users").doc(student.uid).delete();
+  } catch (error: unknown) {
+    functions.logger.error(`Could not remove the unsaved account of student ${student.username} (${student.uid}):`, error);
+    return;
+  }
+  await releaseUsername(student.username);
+}
+
 export const bulkCreateStudents = functions
   .region("europe-west1")
+  .runWith({ timeoutSeconds: 540, memory: "512MB" })
   .https.onCall(async (data: BulkCreateStudentsPayload, context: functions.https.CallableContext) => {
     if (!context.auth) {
       functions.logger.error("Authentication Error: User not authenticated.");
@@ -96,14 +326,14 @@ export const bulkCreateStudents = functions
       functions.logger.error("Invalid Argument Error: Missing or invalid classId or count.", data);
       throw new functions.https.HttpsError("invalid-argument", "Missing or invalid classId or count.");
     }
-    if (count > 50) {
-      functions.logger.warn(`Attempt to create ${count} students, exceeding limit of 50.`, { teacherUid, classId });
-      throw new functions.https.HttpsError("invalid-argument", "Cannot create more than 50 students at a time.");
+    if (count > MAX_STUDENTS_PER_CALL) {
+      functions.logger.warn(`Attempt to create ${count} students, exceeding limit of ${MAX_STUDENTS_PER_CALL}.`, { teacherUid, classId });
+      throw new functions.https.HttpsError("invalid-argument", `Cannot create more than ${MAX_STUDENTS_PER_CALL} students at a time.`);
     }
 
     // Class ownership verification logic (remains the same)
+    const classRef = db.collection("classes").doc(classId);
     try {
-      const classRef = db.collection("classes").doc(classId);
       const classDoc = await classRef.get();
       if (!classDoc.exists) {
         throw new functions.https.HttpsError("not-found", "Class not found.");
@@ -120,75 +350,79 @@ export const bulkCreateStudents = functions
       throw new functions.https.HttpsError("internal", message);
     }
 
-    const createdStudentsInfo: Array<{
-      uid: string;
-      username: string;
-      email?: string; // The system email created for Firebase Auth
-    }> = [];
-    const studentCreationPromises = [];
-
-    for (let i = 0; i < count; i++) {
-      const username = await generateUniqueUsername();
-      const password = TEMPORARY_DEFAULT_STUDENT_PASSWORD;
-      // Simplified placeholder email using the username and a fixed domain
-      const placeholderEmail = `${username}@${STUDENT_EMAIL_DOMAIN}`;
-
-      studentCreationPromises.push(
-        auth.createUser({
-          email: placeholderEmail, // Use the simplified email
-          emailVerified: false,
-          password: password,
-          displayName: username,
-          disabled: false,
-        })
-          .then(async (userRecord) => {
-            await db.collection("users").doc(userRecord.uid).set({
-              username: username,
-              role: "student",
-              classIds: admin.firestore.FieldValue.arrayUnion(classId),
-              createdAt: admin.firestore.FieldValue.serverTimestamp(),
-              passwordNeedsReset: true,
-              systemEmail: placeholderEmail, // Store the system email for reference if needed
-            });
-            await db.collection("classes").doc(classId).update({
-              studentIds: admin.firestore.FieldValue.arrayUnion(userRecord.uid),
-            });
-            createdStudentsInfo.push({
-              uid: userRecord.uid,
-              username: username,
-              email: placeholderEmail, // Return the system email created
-            });
-            functions.logger.info(`Successfully created student: ${username} (UID: ${userRecord.uid}) with email ${placeholderEmail} and temporary password, added to class: ${classId}`);
-            return userRecord.uid;
-          })
-          .catch((error: unknown) => {
-            let errorCode = "UNKNOWN_ERROR";
-            let errorMessage = "An unknown error occurred during student creation.";
-            if (error instanceof Error) {
-              errorMessage = error.message;
-              if (typeof error === "object" && error !== null && "code" in error) {
-                errorCode = String((error as { code: string }).code);
-              }
-            }
-            functions.logger.error(`Failed to create student (intended username ${username}, email: ${placeholderEmail}):`, errorCode, errorMessage, error);
-            return null;
-          })
-      );
+    // 1. Reserve every username up front; each reservation is a single create() with no query.
+    const usernames = await generateUniqueUsernames(count);
+
+    // 2. Create Auth accounts concurrently, bounded so we stay inside Auth's rate limits.
+    const results = await mapWithConcurrency(usernames, AUTH_CREATE_CONCURRENCY, createStudentAuthAccount);
+    const createdStudentsInfo = results.filter((result): result is CreatedStudentInfo => result !== null);
+
+    if (createdStudentsInfo.length === 0) {
+      throw new functions.https.HttpsError("internal", "No students were created. All attempts failed.");
     }
 
-    await Promise.all(studentCreationPromises);
-    
-    if (createdStudentsInfo.length > 0) {
-      return {
-        success: true,
-        message: `${createdStudentsInfo.length} of ${count} students generated successfully. They must reset their password on first login using the temporary default password: "${TEMPORARY_DEFAULT_STUDENT_PASSWORD}".`,
-        createdStudents: createdStudentsInfo,
+    // 3. Write every user profile through one BulkWriter. close() doesn't reject when single writes fail,
+    // so each write reports its own failure; a student whose profile wasn't saved is rolled back.
+    const writer = db.bulkWriter();
+    const unsavedUids = new Set<string>();
+    const writes: Promise<unknown>[] = [];
+    createdStudentsInfo.forEach((student) => {
+      const markUnsaved = (error: unknown) => {
+        unsavedUids.add(student.uid);
+        functions.logger.error(`Could not save the profile of student ${student.username} (${student.uid}):`, error);
       };
-    } else if (count > 0 && createdStudentsInfo.length === 0) {
-      throw new functions.https.HttpsError("internal", "No students were created. All attempts failed.");
-    } else {
-      throw new functions.https.HttpsError("invalid-argument", "No student data was provided or count was zero.");
+      writes.push(writer.set(db.collection("users").doc(student.uid), {
+        username: student.username,
+        role: "student",
+        classIds: [classId],
+        teacherIds: [teacherUid],
+        createdAt: admin.firestore.FieldValue.serverTimestamp(),
+        passwordNeedsReset: true,
+        systemEmail: student.email, // Store the system email for reference if needed
+      }).catch(markUnsaved));
+      writes.push(writer.set(db.collection(USERNAMES_COLLECTION).doc(student.username), { uid: student.uid }, { merge: true }).catch(markUnsaved));
+    });
+    await writer.close();
+    await Promise.all(writes);
+    const savedStudents = createdStudentsInfo.filter((student) => !unsavedUids.has(student.uid));
+    const failedStudents = createdStudentsInfo.filter((student) => unsavedUids.has(student.uid));
+    await mapWithConcurrency(failedStudents, AUTH_CREATE_CONCURRENCY, discardStudentAccount);
+
+    if (savedStudents.length === 0) {
+      throw new functions.https.HttpsError("internal", "Student accounts were created but none of their profiles could be saved.");
     }
+
+    // 4. Update the class roster with a single write.
+    try {
+      await classRef.update({
+        studentIds: admin.firestore.FieldValue.arrayUnion(...savedStudents.map((student) => student.uid)),
+      });
+      // 5. Put role, class and reset flag in each new account's ID token.
+      await mapWithConcurrency(savedStudents, AUTH_CREATE_CONCURRENCY, (student) =>
+        auth.setCustomUserClaims(student.uid, claimsFromProfile({ role: "student", classIds: [classId], passwordNeedsReset: true }))
+      );
+      // 6. Give the new students the class's existing assignments.
+      const classAssignments = await db.collection("assignments").where("classId", "==", classId).get();
+      if (!classAssignments.empty) {
+        await fanOutToInboxes(
+          classAssignments.docs.map((docSnap) => ({ id: docSnap.id, data: docSnap.data() })),
+          savedStudents.map((student) => student.uid)
+        );
+      }
+    } catch (error: unknown) {
+      functions.logger.error(`Saved ${savedStudents.length} student profiles but failed to add them to class ${classId}:`, error);
+      let message = "Student accounts were created but could not be added to the class.";
+      if (error instanceof Error) { message = error.message; }
+      throw new functions.https.HttpsError("internal", message);
+    }
+
+    functions.logger.info(`Created ${savedStudents.length} of ${count} students for class ${classId}.`);
+    return {
+      success: true,
+      message: `${savedStudents.length} of ${count} students generated successfully. They must reset their password on first login using the temporary default password: "${TEMPORARY_DEFAULT_STUDENT_PASSWORD}".`,
+      createdStudents: savedStudents,
+      failedStudents: failedStudents.map((student) => ({ username: student.username, error: "Profile could not be saved; the account was removed." })),
+    };
   });
 
 // resetStudentPassword function (remains the same)
@@ -206,6 +440,7 @@ export const resetStudentPassword = functions
     try {
       await auth.updateUser(studentUid, { password: newPassword });
       await db.collection("users").doc(studentUid).set({ passwordNeedsReset: false }, { merge: true });
+      await syncClaimsFromProfile(studentUid);
       functions.logger.info(`Password reset successfully for student UID: ${studentUid} by teacher UID: ${context.auth.uid}`);
       return { success: true, message: "Student password reset successfully.", newPassword: newPassword };
     } catch (error: unknown) {
@@ -216,7 +451,28 @@ export const resetStudentPassword = functions
     }
   });
 
-// removeStudentFromClass function (remains the same)
+// completePasswordReset: a student who has just chosen their own password clears the reset flag
+// in their profile and their claims (clients can't set claims themselves).
+export const completePasswordReset = functions
+  .region("europe-west1")
+  .https.onCall(async (_data: unknown, context: functions.https.CallableContext) => {
+    if (!context.auth || !context.auth.uid) {
+      throw new functions.https.HttpsError("unauthenticated", "The function must be called while authenticated.");
+    }
+    const uid = context.auth.uid;
+    try {
+      await db.collection("users").doc(uid).set({ passwordNeedsReset: false }, { merge: true });
+      await syncClaimsFromProfile(uid);
+      return { success: true };
+    } catch (error: unknown) {
+      functions.logger.error(`Error completing password reset for UID ${uid}:`, error);
+      let message = "Failed to complete the password reset.";
+      if (error instanceof Error) { message = error.message; }
+      throw new functions.https.HttpsError("internal", message);
+    }
+  });
+
+// removeStudentFromClass: also prunes the class's entries from the student's assignment inbox
 export const removeStudentFromClass = functions
   .region("europe-west1")
   .https.onCall(async (data: { classId: string; studentUid: string }, context: functions.https.CallableContext) => {
@@ -238,6 +494,18 @@ export const removeStudentFromClass = functions
       batch.update(classRef, { studentIds: admin.firestore.FieldValue.arrayRemove(studentUid) });
       batch.update(studentUserRef, { classIds: admin.firestore.FieldValue.arrayRemove(classId) });
       await batch.commit();
+      await Promise.all([syncClaimsFromProfile(studentUid), syncTeacherIds(studentUid)]);
+      // Prune the class's entries from the student's assignment inbox.
+      const inboxEntries = await studentUserRef.collection(ASSIGNMENT_INBOX_COLLECTION).where("classId", "==", classId).select().get();
+      if (!inboxEntries.empty) {
+        const writer = db.bulkWriter();
+        inboxEntries.docs.forEach((docSnap) => {
+          writer.delete(docSnap.ref).catch((error: unknown) => {
+            functions.logger.warn(`Could not delete inbox entry ${docSnap.id} for student ${studentUid}:`, error);
+          });
+        });
+        await writer.close();
+      }
       return { success: true, message: "Student removed from class successfully." };
     } catch (error: unknown) {
       functions.logger.error(`Error removing student UID ${studentUid} from class ID ${classId}:`, error);
@@ -248,7 +516,7 @@ export const removeStudentFromClass = functions
     }
   });
 
-// assignWorksheetToClass function (remains the same)
+// assignWorksheetToClass: creates the assignment and fans out an inbox entry to every enrolled student
 export const assignWorksheetToClass = functions
   .region("europe-west1")
   .https.onCall(async (data: { classId: string; worksheetId: string; worksheetTitle?: string; className?: string }, context: functions.https.CallableContext) => {
@@ -269,6 +537,7 @@ export const assignWorksheetToClass = functions
       if (!classDoc.exists) { throw new functions.https.HttpsError("not-found", `Class ${classId} not found.`); }
       const classData = classDoc.data();
       if (classData?.teacherId !== teacherUid) { throw new functions.https.HttpsError("permission-denied", "You do not have permission to assign worksheets to this class."); }
+      const studentIds: string[] = classData?.studentIds || [];
       if (!actualClassName && classData?.className) { actualClassName = classData.className; }
       if (!actualWorksheetTitle) {
         const worksheetDoc = await worksheetRef.get();
@@ -278,17 +547,26 @@ export const assignWorksheetToClass = functions
       const assignmentsRef = db.collection("assignments");
       const existingAssignmentQuery = await assignmentsRef.where("classId", "==", classId).where("worksheetId", "==", worksheetId).limit(1).get();
       if (!existingAssignmentQuery.empty) {
-        return { success: true, message: "Worksheet was already assigned to this class.", assignmentId: existingAssignmentQuery.docs[0].id };
+        // Re-assigning repairs any inbox entries a previous fan-out missed.
+        const existing = existingAssignmentQuery.docs[0];
+        await fanOutToInboxes([{ id: existing.id, data: existing.data() }], studentIds);
+        return { success: true, message: "Worksheet was already assigned to this class.", assignmentId: existing.id };
       }
       const newAssignmentRef = assignmentsRef.doc();
-      await newAssignmentRef.set({
+      // A concrete timestamp (not serverTimestamp()) so the assignment and every inbox entry sort identically.
+      const assignmentData = {
         worksheetId: worksheetId,
         worksheetTitle: actualWorksheetTitle,
         classId: classId,
         className: actualClassName || "Unknown Class",
         teacherId: teacherUid,
-        assignedAt: admin.firestore.FieldValue.serverTimestamp(),
-      });
+        assignedAt: admin.firestore.Timestamp.now(),
+      };
+      await newAssignmentRef.set(assignmentData);
+      const failedEntries = await fanOutToInboxes([{ id: newAssignmentRef.id, data: assignmentData }], studentIds);
+      if (failedEntries > 0) {
+        functions.logger.error(`Assignment ${newAssignmentRef.id} is missing from ${failedEntries} of ${studentIds.length} student inboxes; assigning again repairs them.`);
+      }
       return { success: true, message: "Worksheet assigned successfully.", assignmentId: newAssignmentRef.id };
     } catch (error: unknown) {
       functions.logger.error(`Error assigning worksheet ${worksheetId} to class ${classId}:`, error);
@@ -298,3 +576,68 @@ export const assignWorksheetToClass = functions
       throw new functions.https.HttpsError("internal", message);
     }
   });
+
+// markStudentProgress: scores the objective questions (multiple choice, blanks, ordering, matching) whenever a
+// student's saved answers change, and stores the result as `score` on the progress document for teachers.
+// Writing the score triggers this again; the unchanged answers (or an identical score) end it there.
+export const markStudentProgress = functions
+  .region("europe-west1")
+  .firestore.document(`${STUDENT_PROGRESS_COLLECTION}/{progressId}`)
+  .onWrite(async (change, context) => {
+    if (!change.after.exists) {
+      return;
+    }
+    const progress = change.after.data() || {};
+    const previous = change.before.exists ? change.before.data() : undefined;
+    if (progress.score && JSON.stringify(previous?.answers) === JSON.stringify(progress.answers)) {
+      return;
+    }
+    if (!progress.worksheetId) {
+      functions.logger.warn(`Progress ${context.params.progressId} has no worksheetId; not marking.`);
+      return;
+    }
+    try {
+      const points = await answerKey(progress.worksheetId);
+      if (!points || points.length === 0) {
+        return;
+      }
+      const score = markAnswers(points, progress.answers);
+      if (sameScore(progress.score, score)) {
+        return;
+      }
+      await change.after.ref.update({ score: { ...score, markedAt: admin.firestore.FieldValue.serverTimestamp() } });
+    } catch (error: unknown) {
+      functions.logger.error(`Error marking progress ${context.params.progressId} (worksheet ${progress.worksheetId}):`, error);
+    }
+  });
+
+// sweepUsernameReservations: bulkCreateStudents reserves names with uid: null before creating the accounts.
+// If an invocation dies between the two (timeout, crash), the reservation would hold its name forever.
+export const sweepUsernameReservations = functions
+  .region("europe-west1")
+  .pubsub.schedule("every 24 hours")
+  .onRun(async () => {
+    const cutoff = Date.now() - RESERVATION_TTL_MS;
+    const pending = await db.collection(USERNAMES_COLLECTION).where("uid", "==", null).get();
+    const expired = pending.docs.filter((docSnap) => {
+      const reservedAt = docSnap.get("reservedAt") as admin.firestore.Timestamp | undefined;
+      return !reservedAt || reservedAt.toMillis() < cutoff;
+    });
+    let linked = 0;
+    let released = 0;
+    await mapWithConcurrency(expired, AUTH_CREATE_CONCURRENCY, async (docSnap) => {
+      try {
+        const owners = await db.collection("users").where("username", "==", docSnap.id).limit(1).select().get();
+        if (owners.empty) {
+          await docSnap.ref.delete();
+          released++;
+        } else {
+          await docSnap.ref.update({ uid: owners.docs[0].id });
+          linked++;
+        }
+      } catch (error: unknown) {
+        functions.logger.warn(`Could not sweep username reservation ${docSnap.id}:`, error);
+      }
+    });
+    functions.logger.info(`Swept ${expired.length} abandoned username reservation(s): ${released} released, ${linked} linked.`);
+  });
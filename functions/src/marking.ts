@@ -0,0 +1,131 @@
+// Auto-marking for the objective section types. A worksheet's answer key is flattened into marking
+// points (one mark each), and a student's answers map is scored point by point.
+// Keep in step with auto_marking.py, which re-marks whole cohorts with the same rules.
+//   Quiz / Questionnaire         one point per MultipleChoiceQuestion: answers[questionId] == correctAnswerId
+//   FillInTheBlanksInteractive   one point per blank with correctAnswer/acceptedAnswers (case and spacing ignored)
+//   OrderSequenceInteractive     one point per position of correctOrderIds the student has right
+//   MatchingPairsInteractive     one point per matchSetA item paired as in correctPairs
+// Interactive answers are JSON strings under the section id (src/components/worksheets/sectionAnswers.ts).
+import type { DocumentData } from "firebase-admin/firestore";
+
+export interface MarkingPoint {
+  sectionId: string;
+  answerId: string; // Key in the answers map
+  kind: "choice" | "blank" | "order" | "match";
+  part: string | number | null; // Blank id, order position or matchSetA id
+  accepted: string[]; // Normalised for blanks
+}
+
+export interface SectionScore {
+  marks: number;
+  available: number;
+}
+
+export interface Score {
+  marks: number;
+  available: number;
+  sections: Record<string, SectionScore>;
+}
+
+export function normaliseText(value: string): string {
+  return value.trim().replace(/\s+/g, " ").toLowerCase();
+}
+
+// correctPairs may be a {leftId: rightId} map or a list of {itemAId, itemBId} objects.
+function pairMap(pairs: unknown): Record<string, string> {
+  if (Array.isArray(pairs)) {
+    return Object.fromEntries(
+      pairs.filter((pair) => pair && typeof pair.itemAId === "string").map((pair) => [pair.itemAId, pair.itemBId])
+    );
+  }
+  return pairs && typeof pairs === "object" ? (pairs as Record<string, string>) : {};
+}
+
+export function markingPoints(worksheet: DocumentData): MarkingPoint[] {
+  const points: MarkingPoint[] = [];
+  for (const section of (worksheet.sections || []) as DocumentData[]) {
+    if (section.type === "Quiz" || section.type === "Questionnaire") {
+      for (const question of (section.questions || []) as DocumentData[]) {
+        if (question.type === "MultipleChoiceQuestion" && question.correctAnswerId) {
+          points.push({ sectionId: section.id, answerId: question.id, kind: "choice", part: null, accepted: [question.correctAnswerId] });
+        }
+      }
+    } else if (section.type === "FillInTheBlanksInteractive") {
+      for (const segment of (section.segments || []) as unknown[]) {
+        if (!segment || typeof segment !== "object") continue;
+        const blank = segment as DocumentData;
+        const accepted = [blank.correctAnswer, ...(blank.acceptedAnswers || [])]
+          .filter((answer): answer is string => typeof answer === "string")
+          .map(normaliseText);
+        if (accepted.length > 0) {
+          points.push({ sectionId: section.id, answerId: section.id, kind: "blank", part: blank.id, accepted: accepted });
+        }
+      }
+    } else if (section.type === "OrderSequenceInteractive") {
+      ((section.correctOrderIds || []) as string[]).forEach((itemId, position) => {
+        points.push({ sectionId: section.id, answerId: section.id, kind: "order", part: position, accepted: [itemId] });
+      });
+    } else if (section.type === "MatchingPairsInteractive") {
+      for (const [leftId, rightId] of Object.entries(pairMap(section.correctPairs))) {
+        points.push({ sectionId: section.id, answerId: section.id, kind: "match", part: leftId, accepted: [rightId] });
+      }
+    }
+  }
+  return points;
+}
+
+function parseSectionAnswer(stored: unknown): unknown {
+  if (typeof stored !== "string" || !stored) return null;
+  try {
+    return JSON.parse(stored);
+  } catch {
+    return null;
+  }
+}
+
+// The student's response to one point, or null if they haven't given one.
+export function pointResponse(point: MarkingPoint, answers: DocumentData, parsed: Map<string, unknown>): string | null {
+  if (point.kind === "choice") {
+    return typeof answers[point.answerId] === "string" ? answers[point.answerId] : null;
+  }
+  if (!parsed.has(point.answerId)) {
+    parsed.set(point.answerId, parseSectionAnswer(answers[point.answerId]));
+  }
+  const answer = parsed.get(point.answerId);
+  let response: unknown = null;
+  if (point.kind === "blank" && answer && typeof answer === "object" && !Array.isArray(answer)) {
+    const text = (answer as DocumentData)[point.part as string];
+    response = typeof text === "string" ? normaliseText(text) : null;
+  } else if (point.kind === "order" && Array.isArray(answer)) {
+    response = answer[point.part as number];
+  } else if (point.kind === "match") {
+    response = pairMap(answer)[point.part as string];
+  }
+  return typeof response === "string" ? response : null;
+}
+
+export function markAnswers(points: MarkingPoint[], answers: DocumentData | undefined): Score {
+  const score: Score = { marks: 0, available: 0, sections: {} };
+  const parsed = new Map<string, unknown>();
+  for (const point of points) {
+    const section = score.sections[point.sectionId] || (score.sections[point.sectionId] = { marks: 0, available: 0 });
+    const response = pointResponse(point, answers || {}, parsed);
+    const mark = response !== null && point.accepted.includes(response) ? 1 : 0;
+    section.marks += mark;
+    section.available += 1;
+    score.marks += mark;
+    score.available += 1;
+  }
+  return score;
+}
+
+// Whether a stored score already matches `score` (markedAt aside), so marking again can skip the write.
+export function sameScore(stored: DocumentData | undefined, score: Score): boolean {
+  if (!stored || stored.marks !== score.marks || stored.available !== score.available) {
+    return false;
+  }
+  const sections: DocumentData = stored.sections || {};
+  return Object.keys(sections).length === Object.keys(score.sections).length &&
+    Object.entries(score.sections).every(([sectionId, section]) =>
+      sections[sectionId]?.marks === section.marks && sections[sectionId]?.available === section.available);
+}
@@ -0,0 +1,310 @@
+import argparse
+import base64
+import hashlib
+import io
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+try:
+    from PIL import Image, ImageOps  # Optional: only needed to build variants (pip install pillow)
+except ImportError:
+    Image = None
+
+# --- Configuration ---
+PUBLIC_DIR = "public"
+SOURCE_DIR = "public/images"
+OUTPUT_DIR = "public/images/variants"
+MANIFEST_PATH = os.path.join(OUTPUT_DIR, "manifest.json")
+
+# Bump whenever widths, encoder settings or the manifest format change so every image is rebuilt.
+PIPELINE_VERSION = 1
+
+SOURCE_EXTENSIONS = (".png", ".jpg", ".jpeg")
+
+# Variant widths in CSS pixels. Images narrower than a width are never upscaled; the intrinsic
+# width is emitted instead.
+VARIANT_WIDTHS = (320, 640, 960, 1280)
+
+# Encoder settings per output format, in the order browsers should try them.
+FORMAT_OPTIONS = {
+    "avif": {"quality": 50},
+    "webp": {"quality": 80, "method": 6},
+}
+MIME_TYPES = {"avif": "image/avif", "webp": "image/webp"}
+
+# Blur placeholders are inlined as data URLs in the worksheet document, so keep them tiny.
+PLACEHOLDER_WIDTH = 16
+PLACEHOLDER_QUALITY = 40
+
+# Section fields holding an image URL, and the field their build metadata is recorded under.
+IMAGE_URL_FIELDS = {"diagramImageUrl": "diagramImage", "backgroundImageUrl": "backgroundImage"}
+
+DEFAULT_WORKERS = os.cpu_count() or 1
+
+
+# --- Sources ---
+def file_sha256(path):
+    """Returns the SHA-256 hex digest of a file's bytes."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def public_url(path):
+    """Maps a file under public/ to the site-relative URL Next.js serves it from."""
+    return "/" + os.path.relpath(path, PUBLIC_DIR).replace(os.sep, "/")
+
+
+def find_source_images(source_dir=SOURCE_DIR, output_dir=OUTPUT_DIR):
+    """Returns every raster image under source_dir (excluding generated variants), sorted."""
+    found = []
+    output_dir = os.path.normpath(output_dir)
+    for root, dir_names, file_names in os.walk(source_dir):
+        dir_names[:] = [d for d in dir_names if os.path.normpath(os.path.join(root, d)) != output_dir]
+        for file_name in file_names:
+            if file_name.lower().endswith(SOURCE_EXTENSIONS):
+                found.append(os.path.join(root, file_name))
+    return sorted(found)
+
+
+def supported_formats():
+    """Output formats this Pillow build can encode (AVIF needs Pillow 11.3+ or pillow-avif-plugin)."""
+    if Image is None:
+        return []
+    try:
+        import pillow_avif  # noqa: F401  Registers the AVIF codec on older Pillow versions
+    except ImportError:
+        pass
+    extensions = Image.registered_extensions()
+    return [fmt for fmt in FORMAT_OPTIONS if f".{fmt}" in extensions and fmt.upper() in Image.SAVE]
+
+
+def variant_widths(intrinsic_width):
+    """Widths to emit for an image: every VARIANT_WIDTHS step below its width, plus the width itself if smaller."""
+    widths = [width for width in VARIANT_WIDTHS if width < intrinsic_width]
+    if intrinsic_width <= VARIANT_WIDTHS[-1]:
+        widths.append(intrinsic_width)
+    return widths
+
+
+# --- Building ---
+def build_image(source_path, sha256, output_dir, formats):
+    """
+    Encodes every variant and the blur placeholder for one source image.
+    Module-level so it can run in worker processes. Returns the image's manifest entry.
+    """
+    with Image.open(source_path) as opened:
+        image = ImageOps.exif_transpose(opened)
+        image = image.convert("RGBA" if "A" in image.getbands() or image.mode == "P" else "RGB")
+    width, height = image.size
+    stem = os.path.splitext(os.path.basename(source_path))[0]
+
+    variants = []
+    for variant_width in variant_widths(width):
+        variant_height = max(1, round(height * variant_width / width))
+        resized = image if variant_width == width else image.resize((variant_width, variant_height), Image.LANCZOS)
+        for fmt in formats:
+            file_name = f"{stem}-{sha256[:12]}-{variant_width}.{fmt}"
+            output_path = os.path.join(output_dir, file_name)
+            resized.save(output_path, fmt.upper(), **FORMAT_OPTIONS[fmt])
+            variants.append({"format": fmt, "width": variant_width, "url": public_url(output_path),
+                             "bytes": os.path.getsize(output_path)})
+
+    placeholder = image.resize((PLACEHOLDER_WIDTH, max(1, round(height * PLACEHOLDER_WIDTH / width))), Image.BILINEAR)
+    buffer = io.BytesIO()
+    placeholder.save(buffer, "WEBP", quality=PLACEHOLDER_QUALITY)
+    return {
+        "sha256": sha256,
+        "pipelineVersion": PIPELINE_VERSION,
+        "width": width,
+        "height": height,
+        "bytes": os.path.getsize(source_path),
+        "formats": list(formats),
+        "blurDataURL": "data:image/webp;base64," + base64.b64encode(buffer.getvalue()).decode("ascii"),
+        "variants": variants,
+    }
+
+
+def is_up_to_date(entry, sha256, formats):
+    """True when a manifest entry was built from these exact bytes with the current settings and its files exist."""
+    return (
+        entry is not None
+        and entry.get("sha256") == sha256
+        and entry.get("pipelineVersion") == PIPELINE_VERSION
+        and entry.get("formats") == list(formats)
+        and all(os.path.isfile(os.path.join(PUBLIC_DIR, v["url"].lstrip("/"))) for v in entry.get("variants", []))
+    )
+
+
+# --- Manifest ---
+def load_manifest(manifest_path=MANIFEST_PATH):
+    """Returns {source_url: entry} from the manifest, or an empty map if it hasn't been built."""
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return manifest.get("images", {}) if isinstance(manifest, dict) else {}
+
+
+def save_manifest(manifest_path, images):
+    """Writes the manifest atomically so an interrupted build can't leave a corrupt file."""
+    os.makedirs(os.path.dirname(manifest_path) or ".", exist_ok=True)
+    temp_path = f"{manifest_path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump({"version": PIPELINE_VERSION, "images": images}, f, indent=2, sort_keys=True)
+        f.write("\n")
+    os.replace(temp_path, manifest_path)
+
+
+def prune_outputs(output_dir, images, manifest_path=MANIFEST_PATH):
+    """Deletes generated files no manifest entry refers to (old hashes, removed sources). Returns the count."""
+    keep = {os.path.normpath(os.path.join(PUBLIC_DIR, v["url"].lstrip("/")))
+            for entry in images.values() for v in entry["variants"]}
+    keep.add(os.path.normpath(manifest_path))
+    removed = 0
+    for file_name in os.listdir(output_dir):
+        path = os.path.normpath(os.path.join(output_dir, file_name))
+        if os.path.isfile(path) and path not in keep:
+            os.remove(path)
+            removed += 1
+    return removed
+
+
+def build_images(source_dir=SOURCE_DIR, output_dir=OUTPUT_DIR, manifest_path=MANIFEST_PATH,
+                 workers=DEFAULT_WORKERS, force=False):
+    """
+    Builds variants for every source image whose bytes changed since the last run, fanning the
+    encoding out across worker processes. Returns a JSON-serialisable report.
+    """
+    start = time.perf_counter()
+    formats = supported_formats()
+    previous = load_manifest(manifest_path)
+    images = {}
+    jobs = []
+    for source_path in find_source_images(source_dir, output_dir):
+        url = public_url(source_path)
+        sha256 = file_sha256(source_path)
+        if not force and is_up_to_date(previous.get(url), sha256, formats):
+            images[url] = previous[url]
+        else:
+            jobs.append((url, source_path, sha256))
+
+    os.makedirs(output_dir, exist_ok=True)
+    failed = []
+    if jobs:
+        with ProcessPoolExecutor(max_workers=max(1, min(workers, len(jobs)))) as executor:
+            futures = {
+                executor.submit(build_image, source_path, sha256, output_dir, formats): (url, source_path)
+                for url, source_path, sha256 in jobs
+            }
+            for future in as_completed(futures):
+                url, source_path = futures[future]
+                try:
+                    images[url] = future.result()
+                    print(f"Built {len(images[url]['variants'])} variant(s) for {url}")
+                except Exception as e:
+                    print(f"Error building variants for {source_path}: {e}")
+                    failed.append(url)
+
+    save_manifest(manifest_path, images)
+    removed = prune_outputs(output_dir, images, manifest_path)
+    return {
+        "images": len(images) + len(failed),
+        "built": len(jobs) - len(failed),
+        "cached": len(images) - (len(jobs) - len(failed)),
+        "failed": failed,
+        "removedFiles": removed,
+        "formats": formats,
+        "sourceBytes": sum(entry["bytes"] for entry in images.values()),
+        "elapsedSeconds": round(time.perf_counter() - start, 4),
+    }
+
+
+# --- Worksheet metadata ---
+def image_metadata(url, entry):
+    """The section-facing summary of a built image (DiagramImage in worksheetTypes.ts)."""
+    sources = []
+    for fmt in entry["formats"]:
+        candidates = [v for v in entry["variants"] if v["format"] == fmt]
+        sources.append({
+            "type": MIME_TYPES[fmt],
+            "srcSet": ", ".join(f"{v['url']} {v['width']}w" for v in candidates),
+        })
+    return {
+        "src": url,
+        "width": entry["width"],
+        "height": entry["height"],
+        "blurDataURL": entry["blurDataURL"],
+        "sources": sources,
+    }
+
+
+def attach_image_metadata(worksheet_data, manifest):
+    """
+    Records intrinsic dimensions, a blur placeholder and responsive sources on every section whose
+    image has been built (in place). Returns the site-relative image URLs that have no manifest entry.
+    """
+    missing = []
+    if not isinstance(worksheet_data, dict):
+        return missing
+    for section in worksheet_data.get("sections") or []:
+        if not isinstance(section, dict):
+            continue
+        for url_field, metadata_field in IMAGE_URL_FIELDS.items():
+            url = section.get(url_field)
+            if not isinstance(url, str) or not url.startswith("/"):
+                continue
+            if url in manifest:
+                section[metadata_field] = image_metadata(url, manifest[url])
+            else:
+                missing.append(url)
+    return missing
+
+
+def print_report(report):
+    """Prints a human-readable build summary."""
+    print("\n--- Image pipeline ---")
+    print(f"Formats: {', '.join(report['formats']) or 'none'}")
+    print(f"Images: {report['images']} ({report['built']} built, {report['cached']} unchanged)")
+    print(f"Source bytes: {report['sourceBytes'] / 1024:.1f} KiB")
+    print(f"Stale files removed: {report['removedFiles']}")
+    print(f"Elapsed: {report['elapsedSeconds']:.3f}s")
+    if report["failed"]:
+        print(f"Failed ({len(report['failed'])}): {', '.join(report['failed'])}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Build resized WebP/AVIF variants and blur placeholders for images under public/.")
+    parser.add_argument("source_dir", nargs="?", default=SOURCE_DIR)
+    parser.add_argument("--output", default=OUTPUT_DIR, help=f"Directory for generated files (default: {OUTPUT_DIR})")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--force", action="store_true", help="Rebuild every image even if its hash is unchanged")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON instead of text")
+    args = parser.parse_args(argv)
+
+    if Image is None:
+        print("Error: the image pipeline needs Pillow (pip install pillow).")
+        return 1
+    if not supported_formats():
+        print("Error: this Pillow build can't encode WebP or AVIF.")
+        return 1
+
+    report = build_images(args.source_dir, args.output, os.path.join(args.output, "manifest.json"),
+                          workers=args.workers, force=args.force)
+    if args.json:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    else:
+        print_report(report)
+    return 1 if report["failed"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
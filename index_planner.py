@@ -0,0 +1,590 @@
+import argparse
+import json
+import os
+import re
+import sys
+import admin_session
+
+# --- Configuration ---
+INDEXES_PATH = "firestore.indexes.json"
+
+# Client (web SDK) and Cloud Functions (Admin SDK) sources, plus the top-level Python admin scripts.
+TS_SOURCE_DIRS = ("src", "functions/src")
+TS_EXTENSIONS = (".ts", ".tsx")
+PYTHON_SOURCE_DIR = "."
+SKIP_DIRS = {"node_modules", ".next", "lib", "__pycache__", ".git"}
+
+EQUALITY_OPERATORS = {"==", "in"}
+ARRAY_OPERATORS = {"array-contains", "array-contains-any"}
+INEQUALITY_OPERATORS = {"<", "<=", ">", ">=", "!=", "not-in"}
+LIST_OPERATORS = {"in", "not-in", "array-contains-any"}
+
+# documentId() / FieldPath.documentId(): every index already ends with it.
+DOCUMENT_ID_FIELD = "__name__"
+
+# Plan verdicts for queries the planner could only partly parse; print_report lists these for review.
+UNRESOLVED_FIELD = "a field or operator could not be resolved"
+UNRESOLVED_COLLECTION = "collection could not be resolved"
+
+# Placeholder used for every filter value when a query is run against the emulator.
+PLACEHOLDER_VALUE = "__index_planner__"
+
+IDENTIFIER = r"[A-Za-z_$][\w$]*"
+STRING_CONSTANT_PATTERN = re.compile(
+    rf"""(?:\b(?:const|let|var)\s+|^)({IDENTIFIER})\s*(?::\s*[\w<>\[\]|' ]+)?=\s*(['"`])([^'"`\n]*)\2""", re.MULTILINE)
+CLIENT_QUERY_PATTERN = re.compile(r"(?<![\w$.])query\(")
+CHAIN_START_PATTERN = re.compile(r"\.(collection|collectionGroup|collection_group)\(")
+# Local names bound to the Admin SDK's FieldFilter class: field_filter = firestore.FieldFilter, or
+# imported as "FieldFilter as FF".
+FIELD_FILTER_ALIAS_PATTERN = re.compile(
+    rf"\b({IDENTIFIER})\s*=\s*[\w$.()]*\bFieldFilter\b(?!\s*\()|\bFieldFilter\s+as\s+({IDENTIFIER})")
+
+
+# --- Source scanning ---
+def find_sources(root="."):
+    """Returns (path, language) for every TypeScript source under TS_SOURCE_DIRS and every top-level .py file."""
+    sources = []
+    for source_dir in TS_SOURCE_DIRS:
+        for dir_path, dir_names, file_names in os.walk(os.path.join(root, source_dir)):
+            dir_names[:] = sorted(d for d in dir_names if d not in SKIP_DIRS)
+            for file_name in sorted(file_names):
+                if file_name.endswith(TS_EXTENSIONS):
+                    sources.append((os.path.join(dir_path, file_name), "ts"))
+    python_dir = os.path.join(root, PYTHON_SOURCE_DIR)
+    for file_name in sorted(os.listdir(python_dir)):
+        if file_name.endswith(".py") and file_name != os.path.basename(__file__):
+            sources.append((os.path.join(python_dir, file_name), "py"))
+    return sources
+
+
+def blank_comments(text, language):
+    """Replaces comments with spaces (keeping newlines) so offsets and line numbers stay valid."""
+    out = list(text)
+    i, n = 0, len(text)
+    quote = None
+    while i < n:
+        ch = text[i]
+        if quote:
+            if ch == "\\":
+                i += 2
+                continue
+            if ch == quote:
+                quote = None
+            i += 1
+            continue
+        if ch in "'\"`":
+            quote = ch
+        elif language == "py" and ch == "#":
+            while i < n and text[i] != "\n":
+                out[i] = " "
+                i += 1
+            continue
+        elif language == "ts" and text.startswith("//", i):
+            while i < n and text[i] != "\n":
+                out[i] = " "
+                i += 1
+            continue
+        elif language == "ts" and text.startswith("/*", i):
+            end = text.find("*/", i + 2)
+            end = n if end < 0 else end + 2
+            for j in range(i, end):
+                if text[j] != "\n":
+                    out[j] = " "
+            i = end
+            continue
+        i += 1
+    return "".join(out)
+
+
+def balanced_end(text, open_index):
+    """Index just past the bracket matching the one at open_index (strings are skipped)."""
+    pairs = {"(": ")", "[": "]", "{": "}"}
+    stack = [pairs[text[open_index]]]
+    i = open_index + 1
+    quote = None
+    while i < len(text) and stack:
+        ch = text[i]
+        if quote:
+            if ch == "\\":
+                i += 1
+            elif ch == quote:
+                quote = None
+        elif ch in "'\"`":
+            quote = ch
+        elif ch in pairs:
+            stack.append(pairs[ch])
+        elif ch == stack[-1]:
+            stack.pop()
+        i += 1
+    return i
+
+
+def split_arguments(text):
+    """Splits an argument list (without its parentheses) at top-level commas."""
+    args, depth, start, quote = [], 0, 0, None
+    for i, ch in enumerate(text):
+        if quote:
+            if ch == quote and text[i - 1] != "\\":
+                quote = None
+        elif ch in "'\"`":
+            quote = ch
+        elif ch in "([{":
+            depth += 1
+        elif ch in ")]}":
+            depth -= 1
+        elif ch == "," and depth == 0:
+            args.append(text[start:i].strip())
+            start = i + 1
+    if text[start:].strip():
+        args.append(text[start:].strip())
+    return args
+
+
+def collect_constants(sources):
+    """Returns {NAME: "string value"} for every string constant in the sources (collection names and fields)."""
+    constants = {}
+    for path, language in sources:
+        with open(path, "r", encoding="utf-8") as f:
+            text = blank_comments(f.read(), language)
+        for match in STRING_CONSTANT_PATTERN.finditer(text):
+            constants.setdefault(match.group(1), match.group(3))
+    return constants
+
+
+def resolve_string(expression, constants):
+    """The string an argument evaluates to (a literal, a known constant or documentId()), else None."""
+    expression = expression.strip()
+    literal = re.fullmatch(r"""(['"`])([^'"`]*)\1""", expression)
+    if literal:
+        return literal.group(2)
+    if re.search(r"documentId\(\)|FieldPath\.document_id\(\)|DOCUMENT_ID", expression):
+        return DOCUMENT_ID_FIELD
+    name = expression.split(".")[-1]
+    return constants.get(name)
+
+
+def line_number(text, index):
+    """1-based line number of an offset."""
+    return text.count("\n", 0, index) + 1
+
+
+# --- Query extraction ---
+def call_arguments(text, name, start=0, end=None):
+    """Yields (offset, [args]) for every name(...) call in text[start:end]."""
+    pattern = re.compile(rf"(?<![\w$]){re.escape(name)}\(")
+    end = len(text) if end is None else end
+    for match in pattern.finditer(text, start, end):
+        close = balanced_end(text, match.end() - 1)
+        yield match.start(), split_arguments(text[match.end():close - 1])
+
+
+def parse_client_constraints(text, constraint_text_spans, constants):
+    """Returns (filters, order_by) from the where()/orderBy() calls in the given spans of text."""
+    filters, order_by = [], []
+    for start, end in constraint_text_spans:
+        for _, args in call_arguments(text, "where", start, end):
+            if len(args) >= 2:
+                filters.append((resolve_string(args[0], constants), resolve_string(args[1], constants)))
+        for _, args in call_arguments(text, "orderBy", start, end):
+            if args:
+                direction = resolve_string(args[1], constants) if len(args) > 1 else "asc"
+                order_by.append((resolve_string(args[0], constants), direction or "asc"))
+    return filters, order_by
+
+
+def array_literal_span(text, name, before):
+    """The span of the array literal most recently assigned to name before offset `before`, or None."""
+    span = None
+    for match in re.finditer(rf"\b(?:const|let|var)\s+{re.escape(name)}\b[^=]*=\s*\[", text[:before]):
+        span = (match.end() - 1, balanced_end(text, match.end() - 1))
+    return span
+
+
+def resolve_client_collection(expression, text, before, constants, depth=0):
+    """(collection_id, scope) for a web-SDK collection()/collectionGroup() expression or variable."""
+    expression = expression.strip()
+    call = re.match(r"(collection|collectionGroup)\(", expression)
+    if call:
+        args = split_arguments(expression[call.end():balanced_end(expression, call.end() - 1) - 1])
+        segments = args[1:]
+        name = resolve_string(segments[-1], constants) if segments else None
+        scope = "COLLECTION_GROUP" if call.group(1) == "collectionGroup" else "COLLECTION"
+        return name, scope
+    if depth < 3 and re.fullmatch(IDENTIFIER, expression):
+        assignment = None
+        for match in re.finditer(rf"\b(?:const|let|var)\s+{re.escape(expression)}\b[^=]*=\s*", text[:before]):
+            assignment = match
+        if assignment:
+            value_end = text.find(";", assignment.end())
+            value_end = text.find("\n", assignment.end()) if value_end < 0 else value_end
+            return resolve_client_collection(text[assignment.end():value_end], text, before, constants, depth + 1)
+    return None, "COLLECTION"
+
+
+def extract_client_queries(path, text, constants):
+    """Queries built with the web SDK's query(collectionRef, ...constraints)."""
+    queries = []
+    for match in CLIENT_QUERY_PATTERN.finditer(text):
+        close = balanced_end(text, match.end() - 1)
+        args = split_arguments(text[match.end():close - 1])
+        if not args:
+            continue
+        spans = [(match.end(), close)]
+        for arg in args[1:]:
+            spread = re.fullmatch(rf"\.\.\.({IDENTIFIER})", arg)
+            if spread:
+                span = array_literal_span(text, spread.group(1), match.start())
+                if span:
+                    spans.append(span)
+        filters, order_by = parse_client_constraints(text, spans, constants)
+        if not filters and not order_by:
+            continue
+        collection_id, scope = resolve_client_collection(args[0], text, match.start(), constants)
+        queries.append(make_query(collection_id, scope, filters, order_by, f"{path}:{line_number(text, match.start())}"))
+    return queries
+
+
+def new_chain_state():
+    return {"collection": None, "scope": "COLLECTION", "filters": [], "orderBy": [], "first": None}
+
+
+def resolve_ref_collection(text, before, name, constants, filter_names, depth=0):
+    """
+    The chain state an Admin SDK reference variable holds at offset `before`: its collection, plus any
+    filters and sort orders it was built up with (query = query.where(...) reassignments are followed).
+    """
+    assignment = None
+    for match in re.finditer(rf"\b{re.escape(name)}\s*(?::\s*[\w<>.]+)?\s*=(?![=>])", text[:before]):
+        assignment = match
+    if not assignment:
+        return new_chain_state()
+    line_end = text.find("\n", assignment.end())
+    value = text[:line_end if line_end >= 0 else len(text)]
+    base = re.compile(rf"\s*({IDENTIFIER})(?=\s*\.)").match(value, assignment.end())
+    if not base:
+        return new_chain_state()
+    if depth < 5:
+        state = resolve_ref_collection(text, assignment.start(), base.group(1), constants, filter_names, depth + 1)
+    else:
+        state = new_chain_state()
+    calls, _ = parse_chain(value, base.end())
+    apply_admin_calls(state, calls, constants, filter_names)
+    state["first"] = None
+    return state
+
+
+def parse_chain(text, start):
+    """Parses .method(args) calls from start onwards. Returns ([(name, args, offset)], end_offset)."""
+    calls = []
+    i = start
+    while True:
+        match = re.compile(rf"\s*\.\s*({IDENTIFIER})\(").match(text, i)
+        if not match:
+            return calls, i
+        close = balanced_end(text, match.end() - 1)
+        calls.append((match.group(1), split_arguments(text[match.end():close - 1]), match.start(1)))
+        i = close
+
+
+def admin_filter(args, constants, filter_names=("FieldFilter",)):
+    """
+    (field, op) for an Admin SDK .where(field, op, value) or .where(filter=FieldFilter(field, op, value)).
+    filter_names are the names FieldFilter is called by; anything else (composite filters, helpers) gives
+    (None, None) so the query is reported as unresolved rather than dropped.
+    """
+    if args and args[0].startswith("filter="):
+        call = re.fullmatch(r"filter=\s*([\w$.]+)\((.*)\)", args[0], re.DOTALL)
+        if not call or call.group(1).split(".")[-1] not in filter_names:
+            return None, None
+        args = split_arguments(call.group(2))
+    if len(args) < 2:
+        return None, None
+    return resolve_string(args[0], constants), resolve_string(args[1], constants)
+
+
+def admin_direction(args, constants):
+    """'asc' or 'desc' for an Admin SDK orderBy/order_by call."""
+    if len(args) < 2:
+        return "asc"
+    text = " ".join(args[1:])
+    return "desc" if "desc" in text.lower() else "asc"
+
+
+def apply_admin_calls(state, calls, constants, filter_names, consumed=None):
+    """
+    Applies parsed chain calls to a chain state (see new_chain_state). Calls whose offsets are already in
+    `consumed` belong to an earlier chain and are skipped; the rest are added to it.
+    """
+    for name, args, offset in calls:
+        if name in ("collection", "collectionGroup", "collection_group"):
+            state["collection"] = resolve_string(args[0], constants) if args else None
+            state["scope"] = "COLLECTION" if name == "collection" else "COLLECTION_GROUP"
+            state["filters"], state["orderBy"] = [], []
+        elif name not in ("where", "orderBy", "order_by") or (consumed is not None and offset in consumed):
+            continue
+        elif name == "where":
+            state["filters"].append(admin_filter(args, constants, filter_names))
+        elif args:
+            state["orderBy"].append((resolve_string(args[0], constants), admin_direction(args, constants)))
+        else:
+            continue
+        if consumed is not None:
+            consumed.add(offset)
+        state["first"] = offset if state["first"] is None else state["first"]
+    return state
+
+
+def extract_admin_queries(path, text, constants):
+    """Queries built as Admin SDK method chains: ref.collection(x).where(...).orderBy(...)."""
+    queries = []
+    consumed = set()
+    filter_names = {"FieldFilter"} | {name for match in FIELD_FILTER_ALIAS_PATTERN.findall(text) for name in match if name}
+    starts = [(m.start(), None) for m in CHAIN_START_PATTERN.finditer(text)]
+    # Chains that start from a reference variable, e.g. assignmentsRef.where(...).
+    for match in re.finditer(rf"({IDENTIFIER})\s*\.\s*(where|orderBy|order_by)\(", text):
+        if not text[:match.start()].rstrip().endswith((".", ")")):
+            starts.append((match.end(1), match.group(1)))
+    for start, ref_name in sorted(starts):
+        calls, _ = parse_chain(text, start)
+        if ref_name:
+            # The reference as it stood before this statement (query = query.where(...) reassigns it).
+            statement_start = text.rfind("\n", 0, start) + 1
+            state = resolve_ref_collection(text, statement_start, ref_name, constants, filter_names)
+        else:
+            state = new_chain_state()
+        apply_admin_calls(state, calls, constants, filter_names, consumed)
+        if state["first"] is not None and (state["filters"] or state["orderBy"]):
+            queries.append(make_query(state["collection"], state["scope"], state["filters"], state["orderBy"],
+                                      f"{path}:{line_number(text, state['first'])}"))
+    return queries
+
+
+def make_query(collection_id, scope, filters, order_by, location):
+    """A query's shape: what it filters and sorts on, and where it is in the source."""
+    return {
+        "collection": collection_id,
+        "scope": scope,
+        "filters": [list(f) for f in filters],
+        "orderBy": [[field, "desc" if (direction or "").lower().startswith("desc") else "asc"]
+                    for field, direction in order_by],
+        "location": location,
+    }
+
+
+def extract_queries(root="."):
+    """Every query in the sources, in file order."""
+    sources = find_sources(root)
+    constants = collect_constants(sources)
+    queries = []
+    for path, language in sources:
+        with open(path, "r", encoding="utf-8") as f:
+            text = blank_comments(f.read(), language)
+        relative = os.path.relpath(path, root).replace(os.sep, "/")
+        if language == "ts":
+            queries.extend(extract_client_queries(relative, text, constants))
+        queries.extend(extract_admin_queries(relative, text, constants))
+    return queries
+
+
+# --- Planning ---
+def required_index(query):
+    """
+    The composite index a query needs, or (None, reason) when single-field indexes serve it.
+    Index fields: equality fields (sorted; their order doesn't matter), array-contains, then the sort order,
+    with inequality fields that aren't explicitly ordered appended ascending as Firestore does implicitly.
+    """
+    if any(field is None or op is None for field, op in query["filters"]) or any(f is None for f, _ in query["orderBy"]):
+        return None, UNRESOLVED_FIELD
+    filters = [(f, op) for f, op in query["filters"] if f != DOCUMENT_ID_FIELD]
+    equality = sorted({f for f, op in filters if op in EQUALITY_OPERATORS})
+    arrays = sorted({f for f, op in filters if op in ARRAY_OPERATORS})
+    order = [(f, d) for f, d in query["orderBy"] if f != DOCUMENT_ID_FIELD and f not in equality]
+    for field in (f for f, op in filters if op in INEQUALITY_OPERATORS):
+        if field not in [f for f, _ in order]:
+            order.append((field, "asc"))
+
+    fields = ([{"fieldPath": f, "order": "ASCENDING"} for f in equality]
+              + [{"fieldPath": f, "arrayConfig": "CONTAINS"} for f in arrays]
+              + [{"fieldPath": f, "order": "DESCENDING" if d == "desc" else "ASCENDING"} for f, d in order])
+    if len(fields) <= 1:
+        return None, "single-field index"
+    if not order:
+        return None, "equality filters only: served by merging single-field indexes"
+    if not query["collection"]:
+        return None, UNRESOLVED_COLLECTION
+    return {"collectionGroup": query["collection"], "queryScope": query["scope"], "fields": fields}, "composite"
+
+
+def index_key(index):
+    """Identity of an index for de-duplication and comparison with the index file."""
+    return json.dumps([index["collectionGroup"], index.get("queryScope", "COLLECTION"), index["fields"]], sort_keys=True)
+
+
+def plan_indexes(queries):
+    """Returns (indexes, plan_rows): the minimal composite index set, and each query's requirement."""
+    indexes = {}
+    rows = []
+    for query in queries:
+        index, reason = required_index(query)
+        if index:
+            indexes.setdefault(index_key(index), index)
+        rows.append({"query": query, "index": index, "reason": reason})
+    ordered = sorted(indexes.values(), key=lambda ix: (ix["collectionGroup"], ix["queryScope"], index_key(ix)))
+    return ordered, rows
+
+
+# --- firestore.indexes.json ---
+def load_index_file(path=INDEXES_PATH):
+    """Returns {"indexes", "fieldOverrides"} from the index file (both empty if it's missing or `{}`)."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {"indexes": [], "fieldOverrides": []}
+    return {"indexes": data.get("indexes", []), "fieldOverrides": data.get("fieldOverrides", [])}
+
+
+def serialise_index_file(indexes, field_overrides):
+    """firestore.indexes.json in the repo's layout: one line per index field."""
+    lines = ["{", '  "indexes": [']
+    for i, index in enumerate(indexes):
+        lines.append("    {")
+        lines.append(f'      "collectionGroup": {json.dumps(index["collectionGroup"])},')
+        lines.append(f'      "queryScope": {json.dumps(index.get("queryScope", "COLLECTION"))},')
+        lines.append('      "fields": [')
+        for j, field in enumerate(index["fields"]):
+            entry = ", ".join(f"{json.dumps(k)}: {json.dumps(v)}" for k, v in field.items())
+            lines.append(f"        {{ {entry} }}{',' if j < len(index['fields']) - 1 else ''}")
+        lines.append("      ]")
+        lines.append(f"    }}{',' if i < len(indexes) - 1 else ''}")
+    lines.append("  ],")
+    overrides = json.dumps(field_overrides, indent=2).replace("\n", "\n  ")
+    lines.append(f'  "fieldOverrides": {overrides}')
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def reconcile(planned, existing, prune=False):
+    """Returns (indexes_to_write, unused_existing, added): unused indexes are kept unless prune is set."""
+    planned_keys = {index_key(ix) for ix in planned}
+    existing_keys = {index_key(ix) for ix in existing}
+    unused = [ix for ix in existing if index_key(ix) not in planned_keys]
+    added = [ix for ix in planned if index_key(ix) not in existing_keys]
+    indexes = list(planned) + ([] if prune else unused)
+    return indexes, unused, added
+
+
+# --- Emulator verification ---
+def run_query_on_emulator(db_client, query):
+    """Runs one query shape (with placeholder values) against the emulator; raises if Firestore rejects it."""
+    firestore = admin_session.firestore_module()
+    # A collection-group query has the same shape as a query on any one collection (or subcollection)
+    # with that id, so every query runs as a group query and no parent path is needed.
+    ref = db_client.collection_group(query["collection"])
+    for field, op in query["filters"]:
+        if field == DOCUMENT_ID_FIELD:
+            continue
+        value = [PLACEHOLDER_VALUE] if op in LIST_OPERATORS else PLACEHOLDER_VALUE
+        ref = ref.where(filter=firestore.FieldFilter(field, op, value))
+    for field, direction in query["orderBy"]:
+        ref = ref.order_by(field, direction=firestore.Query.DESCENDING if direction == "desc" else firestore.Query.ASCENDING)
+    return list(ref.limit(1).stream())
+
+
+def verify_on_emulator(queries):
+    """Returns [(query, error)] for every query the emulator rejects."""
+    db_client = admin_session.get_firestore()
+    failures = []
+    for query in queries:
+        if not query["collection"]:
+            continue
+        try:
+            run_query_on_emulator(db_client, query)
+        except Exception as e:
+            failures.append((query, str(e)))
+    return failures
+
+
+# --- Reporting ---
+def describe_query(query):
+    """One-line summary, e.g. 'assignments: classId in, orderBy assignedAt desc'."""
+    parts = ([f"{f or '?'} {op or '?'}" for f, op in query["filters"]]
+             + [f"orderBy {f or '?'} {d}" for f, d in query["orderBy"]])
+    return f"{query['collection'] or '?'}: " + ", ".join(parts)
+
+
+def describe_index(index):
+    """One-line summary, e.g. 'assignments [classId ASCENDING, assignedAt DESCENDING]'."""
+    fields = ", ".join(f"{f['fieldPath']} {f.get('order') or f.get('arrayConfig')}" for f in index["fields"])
+    scope = " (group)" if index.get("queryScope") == "COLLECTION_GROUP" else ""
+    return f"{index['collectionGroup']}{scope} [{fields}]"
+
+
+def print_report(rows, planned, unused, added, prune=False):
+    """Prints each query's requirement, then the index changes."""
+    print("\n--- Firestore index plan ---")
+    for row in rows:
+        verdict = describe_index(row["index"]) if row["index"] else f"no composite index ({row['reason']})"
+        print(f"{row['query']['location']}\n    {describe_query(row['query'])}\n    -> {verdict}")
+    print(f"\nQueries: {len(rows)}; composite indexes needed: {len(planned)}")
+    unresolved = [row for row in rows if row["reason"] in (UNRESOLVED_FIELD, UNRESOLVED_COLLECTION)]
+    if unresolved:
+        print("Queries that could not be fully parsed (check their indexes by hand):")
+        for row in unresolved:
+            print(f"  ? {row['query']['location']}: {row['reason']}")
+    for index in added:
+        print(f"  + {describe_index(index)}")
+    if unused:
+        print(f"Indexes no query uses ({'removed' if prune else 'kept; pass --prune to remove'}):")
+        for index in unused:
+            print(f"  - {describe_index(index)}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Derive the composite indexes firestore.indexes.json needs from the queries in the code.")
+    parser.add_argument("--root", default=".", help="Project root (default: current directory)")
+    parser.add_argument("--indexes", default=INDEXES_PATH, help=f"Index file (default: {INDEXES_PATH})")
+    parser.add_argument("--write", action="store_true", help="Write the plan to the index file")
+    parser.add_argument("--prune", action="store_true", help="Drop indexes no query uses (default: keep and flag)")
+    parser.add_argument("--check", action="store_true",
+                        help="Exit with status 1 if the index file is missing a needed index (for CI)")
+    parser.add_argument("--emulator", metavar="HOST:PORT",
+                        help="Also run every extracted query against the Firestore emulator")
+    parser.add_argument("--project", help="Project ID to use with the emulator")
+    parser.add_argument("--json", action="store_true", help="Print the plan as JSON instead of text")
+    args = parser.parse_args(argv)
+
+    queries = extract_queries(args.root)
+    planned, rows = plan_indexes(queries)
+    index_path = os.path.join(args.root, args.indexes)
+    existing = load_index_file(index_path)
+    indexes, unused, added = reconcile(planned, existing["indexes"], prune=args.prune)
+
+    if args.json:
+        json.dump({"queries": rows, "indexes": planned, "unused": unused, "added": added}, sys.stdout, indent=2)
+        print()
+    else:
+        print_report(rows, planned, unused, added, prune=args.prune)
+
+    exit_code = 0
+    if args.emulator:
+        admin_session.use_emulator(args.emulator, args.project)
+        failures = verify_on_emulator(queries)
+        print(f"\nEmulator: {len(queries) - len(failures)} of {len(queries)} queries ran.")
+        for query, error in failures:
+            print(f"  {query['location']}: {describe_query(query)}: {error}")
+        exit_code = 1 if failures else exit_code
+
+    if args.write:
+        with open(index_path, "w", encoding="utf-8") as f:
+            f.write(serialise_index_file(indexes, existing["fieldOverrides"]))
+        print(f"Wrote {len(indexes)} index(es) to {index_path}.")
+    elif args.check and added:
+        print(f"{index_path} is missing {len(added)} index(es); run 'python admin.py plan-indexes --write'.")
+        exit_code = 1
+    return exit_code
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,171 @@
+import re
+from html.parser import HTMLParser
+
+# --- Configuration ---
+# Bump when the tree format changes; StaticContentWithKeywords.tsx only renders versions it understands.
+COMPILED_HTML_VERSION = 1
+
+# Section types whose htmlContent is compiled into a keyword-resolved tree.
+KEYWORD_SECTION_TYPES = {"StaticContentWithKeywords"}
+
+KEYWORD_TAG = "keyword"
+
+# Elements that never have children or a closing tag.
+VOID_ELEMENTS = {"area", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+
+# Opening one of these implicitly closes an open <p>, as browsers do (so the tree nests like the DOM).
+CLOSES_PARAGRAPH = {
+    "address", "article", "aside", "blockquote", "details", "div", "dl", "fieldset", "figcaption", "figure",
+    "footer", "form", "h1", "h2", "h3", "h4", "h5", "h6", "header", "hr", "main", "nav", "ol", "p", "pre",
+    "section", "table", "ul",
+}
+
+# Whitespace-only text is dropped inside these, as React rejects text nodes there.
+WHITESPACE_SENSITIVE_PARENTS = {"table", "thead", "tbody", "tfoot", "tr", "colgroup"}
+
+# HTML attribute names that React spells differently.
+REACT_ATTRIBUTE_NAMES = {
+    "class": "className",
+    "for": "htmlFor",
+    "tabindex": "tabIndex",
+    "colspan": "colSpan",
+    "rowspan": "rowSpan",
+    "readonly": "readOnly",
+    "maxlength": "maxLength",
+    "srcset": "srcSet",
+    "crossorigin": "crossOrigin",
+    "contenteditable": "contentEditable",
+}
+
+
+def style_to_object(style):
+    """Converts an inline CSS string into the camelCased object React expects for `style`."""
+    result = {}
+    for declaration in style.split(";"):
+        if ":" not in declaration:
+            continue
+        name, value = declaration.split(":", 1)
+        name = name.strip()
+        if not name:
+            continue
+        if not name.startswith("--"):
+            name = re.sub(r"-([a-z])", lambda m: m.group(1).upper(), name.lower())
+        result[name] = value.strip()
+    return result
+
+
+def react_attributes(attrs):
+    """Maps parsed HTML attributes to React props. Valueless attributes become True."""
+    props = {}
+    for name, value in attrs:
+        if name == "style":
+            props["style"] = style_to_object(value or "")
+            continue
+        props[REACT_ATTRIBUTE_NAMES.get(name, name)] = True if value is None else value
+    return props
+
+
+class _TreeBuilder(HTMLParser):
+    """
+    Builds the compact tree:
+      text    -> "string"
+      element -> {"t": tag, "a": {props}, "c": [children]}   ("a"/"c" omitted when empty)
+      keyword -> {"k": term_key, "c": [children]}
+    Firestore forbids nested arrays, so nodes are strings or maps, never lists.
+    """
+
+    def __init__(self, keywords_data):
+        super().__init__(convert_charrefs=True)
+        self.keywords_data = keywords_data
+        self.root = {"c": []}
+        self.stack = [("#root", self.root)]
+        self.unresolved_terms = []
+
+    def _append(self, node):
+        self.stack[-1][1].setdefault("c", []).append(node)
+
+    def _close_implicitly(self, tag, scope_boundaries):
+        """Closes the nearest open `tag` unless one of scope_boundaries is open above it."""
+        for depth in range(len(self.stack) - 1, 0, -1):
+            open_tag = self.stack[depth][0]
+            if open_tag == tag:
+                del self.stack[depth:]
+                return
+            if open_tag in scope_boundaries:
+                return
+
+    def handle_starttag(self, tag, attrs):
+        if tag in CLOSES_PARAGRAPH:
+            self._close_implicitly("p", {"table", "td", "th", "button"})
+        elif tag == "li":
+            self._close_implicitly("li", {"ul", "ol"})
+
+        if tag == KEYWORD_TAG:
+            term = (dict(attrs).get("data-term") or "").strip().lower()
+            if term and term in self.keywords_data:
+                node = {"k": term}
+            else:
+                # Unknown terms render as their plain contents.
+                self.unresolved_terms.append(term)
+                node = {"t": "span"}
+        else:
+            node = {"t": tag}
+            props = react_attributes(attrs)
+            if props:
+                node["a"] = props
+        self._append(node)
+        if tag not in VOID_ELEMENTS:
+            self.stack.append((tag, node))
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_ELEMENTS:
+            self.stack.pop()
+
+    def handle_endtag(self, tag):
+        # Close back to the matching open tag; stray closing tags are ignored like a browser would.
+        for depth in range(len(self.stack) - 1, 0, -1):
+            if self.stack[depth][0] == tag:
+                del self.stack[depth:]
+                return
+
+    def handle_data(self, data):
+        if not data:
+            return
+        if not data.strip() and self.stack[-1][0] in WHITESPACE_SENSITIVE_PARENTS:
+            return
+        children = self.stack[-1][1].setdefault("c", [])
+        if children and isinstance(children[-1], str):
+            children[-1] += data
+        else:
+            children.append(data)
+
+
+def compile_html(html, keywords_data=None):
+    """
+    Parses an HTML string once into the compact tree, resolving <keyword data-term> tags against
+    keywords_data (keys are matched case-insensitively). Returns (compiled, unresolved_terms).
+    """
+    builder = _TreeBuilder({key.lower(): value for key, value in (keywords_data or {}).items()})
+    builder.feed(html or "")
+    builder.close()
+    return {"v": COMPILED_HTML_VERSION, "nodes": builder.root.get("c", [])}, builder.unresolved_terms
+
+
+def compile_worksheet_keywords(worksheet_data):
+    """
+    Adds a `compiledHtml` tree to every keyword section of a worksheet dict (in place).
+    Returns the list of (section_id, term) pairs that had no definition in keywordsData.
+    """
+    unresolved = []
+    if not isinstance(worksheet_data, dict):
+        return unresolved
+    keywords_data = worksheet_data.get("keywordsData") or {}
+    for section in worksheet_data.get("sections") or []:
+        if not isinstance(section, dict) or section.get("type") not in KEYWORD_SECTION_TYPES:
+            continue
+        if not isinstance(section.get("htmlContent"), str):
+            continue
+        section["compiledHtml"], terms = compile_html(section["htmlContent"], keywords_data)
+        unresolved.extend((section.get("id"), term) for term in terms)
+    return unresolved
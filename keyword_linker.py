@@ -0,0 +1,328 @@
+import argparse
+import html
+import json
+import os
+import re
+import sys
+import time
+from collections import deque
+
+from keyword_compiler import KEYWORD_SECTION_TYPES, KEYWORD_TAG
+from worksheet_content import CONTENT_DIR, find_content_files, parse_content_bytes, yaml
+from worksheet_validator import KEYWORD_TERM_PATTERN
+
+# --- Configuration ---
+# Shorter glossary keys ("cu", "pc") are only linked when a worksheet's own glossary defines them;
+# borrowed from elsewhere in the library they match too many unrelated words.
+MIN_BORROWED_TERM_LENGTH = 4
+
+# Text inside these elements is never linked: existing keywords, links, code and headings.
+SKIP_ELEMENTS = {KEYWORD_TAG, "a", "button", "code", "pre", "script", "style", "textarea",
+                 "h1", "h2", "h3", "h4", "h5", "h6"}
+
+# One token per tag (quoted attribute values may contain '>'), comment or character reference.
+# Everything between two tokens is plain text.
+MARKUP_PATTERN = re.compile(
+    r"""<!--.*?-->|<(?:[^>"']|"[^"]*"|'[^']*')*>|&(?:#\d+|#[xX][0-9a-fA-F]+|\w+);""", re.DOTALL)
+TAG_NAME_PATTERN = re.compile(r"<\s*(/?)\s*([a-zA-Z][\w-]*)")
+
+
+class KeywordAutomaton:
+    """
+    Aho-Corasick automaton over lower-cased glossary terms. Scanning a text visits each character
+    once, however many terms there are, so the whole library costs one linear pass.
+    """
+
+    def __init__(self, terms):
+        self.goto = [{}]
+        self.fail = [0]
+        # Terms ending at each node, longest first (the node's own term, then its suffixes').
+        self.output = [()]
+        for term in sorted(set(terms)):
+            self._add(term)
+        self._link()
+
+    def _add(self, term):
+        node = 0
+        for char in term:
+            next_node = self.goto[node].get(char)
+            if next_node is None:
+                next_node = len(self.goto)
+                self.goto[node][char] = next_node
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append(())
+            node = next_node
+        self.output[node] = (term,)
+
+    def _link(self):
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self.goto[node].items():
+                state = self.fail[node]
+                while state and char not in self.goto[state]:
+                    state = self.fail[state]
+                self.fail[child] = self.goto[state].get(char, 0)
+                self.output[child] = self.output[child] + self.output[self.fail[child]]
+                queue.append(child)
+
+    def find(self, text, allowed_terms=None):
+        """
+        Returns non-overlapping whole-word matches in text as (start, end, term), preferring the
+        leftmost and then the longest match ("main memory" over "memory"). With allowed_terms, other
+        terms are ignored before overlaps are resolved, so they never hide an allowed term they overlap.
+        """
+        lowered = text.lower()
+        if len(lowered) != len(text):
+            # A few characters change length when lower-cased; keep offsets aligned with the original.
+            lowered = "".join(c.lower() if len(c.lower()) == 1 else c for c in text)
+        goto, fail, output = self.goto, self.fail, self.output
+        text_length = len(text)
+        candidates = []
+        node = 0
+        for index, char in enumerate(lowered):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            if not output[node]:
+                continue
+            end = index + 1
+            if end < text_length and text[end].isalnum():
+                continue
+            for term in output[node]:
+                if allowed_terms is not None and term not in allowed_terms:
+                    continue
+                start = end - len(term)
+                if start == 0 or not text[start - 1].isalnum():
+                    candidates.append((start, end, term))
+                    break
+
+        matches = []
+        last_end = 0
+        for start, end, term in sorted(candidates, key=lambda c: (c[0], c[0] - c[1])):
+            if start >= last_end:
+                matches.append((start, end, term))
+                last_end = end
+        return matches
+
+
+def build_glossary(worksheets):
+    """
+    Merges every worksheet's keywordsData into {term: (definition, doc_id)}. Where two worksheets define
+    the same term, the first (in file order) wins; a worksheet's own definition always takes precedence
+    when linking inside it.
+    """
+    glossary = {}
+    for doc_id, worksheet_data in worksheets:
+        for term, definition in (worksheet_data.get("keywordsData") or {}).items():
+            term = str(term).strip().lower()
+            if term and isinstance(definition, str) and definition:
+                glossary.setdefault(term, (definition, doc_id))
+    return glossary
+
+
+def link_html(html_content, automaton, allowed_terms, already_linked, every_occurrence=False):
+    """
+    Wraps glossary terms found in the text of an HTML string in <keyword data-term> tags.
+    Tags, attributes, comments, character references and SKIP_ELEMENTS contents are left untouched.
+    already_linked (a set, updated in place) holds terms not to link again unless every_occurrence.
+    Returns (new_html, linked_terms) where linked_terms lists each newly wrapped term.
+    """
+    parts = []
+    linked_terms = []
+    skip_stack = []
+    position = 0
+
+    def link_text(text):
+        if skip_stack or not text.strip():
+            parts.append(text)
+            return
+        cursor = 0
+        for start, end, term in automaton.find(text, allowed_terms):
+            if term in already_linked and not every_occurrence:
+                continue
+            parts.append(text[cursor:start])
+            parts.append(f"<{KEYWORD_TAG} data-term='{html.escape(term, quote=True)}'>{text[start:end]}</{KEYWORD_TAG}>")
+            cursor = end
+            already_linked.add(term)
+            linked_terms.append(term)
+        parts.append(text[cursor:])
+
+    for match in MARKUP_PATTERN.finditer(html_content):
+        link_text(html_content[position:match.start()])
+        token = match.group(0)
+        parts.append(token)
+        position = match.end()
+        tag = TAG_NAME_PATTERN.match(token)
+        if not tag:
+            continue
+        is_closing, name = tag.group(1), tag.group(2).lower()
+        if name not in SKIP_ELEMENTS or token.endswith("/>"):
+            continue
+        if not is_closing:
+            skip_stack.append(name)
+        elif name in skip_stack:
+            del skip_stack[len(skip_stack) - 1 - skip_stack[::-1].index(name):]
+    link_text(html_content[position:])
+    return "".join(parts), linked_terms
+
+
+def iter_html_fields(worksheet_data):
+    """Yields (section, owner_dict) for every dict with a string htmlContent: sections and their questions."""
+    for section in worksheet_data.get("sections") or []:
+        if not isinstance(section, dict):
+            continue
+        if isinstance(section.get("htmlContent"), str):
+            yield section, section
+        for question in section.get("questions") or []:
+            if isinstance(question, dict) and isinstance(question.get("htmlContent"), str):
+                yield section, question
+
+
+def link_worksheet(doc_id, worksheet_data, automaton, glossary, every_occurrence=False):
+    """
+    Auto-links one worksheet dict in place. Only sections that render keyword tooltips
+    (KEYWORD_SECTION_TYPES) are rewritten; matches elsewhere are counted as unlinked mentions.
+    Definitions borrowed from other worksheets are copied into this worksheet's keywordsData.
+    Returns the worksheet's coverage report.
+    """
+    own_terms = {str(term).lower() for term in (worksheet_data.get("keywordsData") or {})}
+    allowed_terms = own_terms | {term for term in glossary if len(term) >= MIN_BORROWED_TERM_LENGTH}
+    linked = set()
+    mentioned = set()
+    new_links = 0
+    changed = False
+
+    for section, owner in iter_html_fields(worksheet_data):
+        if section.get("type") not in KEYWORD_SECTION_TYPES:
+            mentioned.update(term for _, _, term in automaton.find(owner["htmlContent"], allowed_terms))
+            continue
+        already_linked = {term.lower() for _, term in KEYWORD_TERM_PATTERN.findall(owner["htmlContent"])}
+        linked |= already_linked
+        new_html, terms = link_html(owner["htmlContent"], automaton, allowed_terms, already_linked, every_occurrence)
+        if terms:
+            owner["htmlContent"] = new_html
+            linked.update(terms)
+            new_links += len(terms)
+            changed = True
+
+    borrowed = sorted(term for term in linked - own_terms if term in glossary)
+    if borrowed:
+        keywords_data = worksheet_data.setdefault("keywordsData", {})
+        for term in borrowed:
+            keywords_data[term] = glossary[term][0]
+
+    return {
+        "docId": doc_id,
+        "glossaryTerms": len(own_terms),
+        "linkedTerms": sorted(linked),
+        "newLinks": new_links,
+        "borrowedTerms": borrowed,
+        "unlinkedTerms": sorted(own_terms - linked),
+        "mentionedOnly": sorted(mentioned - linked),
+        "coverage": (len(own_terms & linked) / len(own_terms)) if own_terms else None,
+        "changed": changed,
+    }
+
+
+def serialise_content(file_path, worksheet_data):
+    """Formats worksheet_data the way content files are stored (2-space JSON, or block-style YAML)."""
+    if file_path.endswith(".json"):
+        return json.dumps(worksheet_data, indent=2, ensure_ascii=False) + "\n"
+    return yaml.safe_dump(worksheet_data, sort_keys=False, allow_unicode=True)
+
+
+def link_library(content_dir=CONTENT_DIR, write=False, every_occurrence=False):
+    """Auto-links every worksheet under content_dir. Returns a JSON-serialisable report."""
+    start = time.perf_counter()
+    worksheets = []
+    errors = []
+    for file_path in find_content_files(content_dir):
+        with open(file_path, "rb") as f:
+            try:
+                worksheet_data = parse_content_bytes(file_path, f.read())
+            except Exception as e:
+                errors.append(f"{file_path}: could not parse ({e})")
+                continue
+        if isinstance(worksheet_data, dict):
+            worksheets.append((file_path, worksheet_data))
+
+    doc_ids = [(data.get("id") or os.path.splitext(os.path.basename(file_path))[0], data)
+               for file_path, data in worksheets]
+    glossary = build_glossary(doc_ids)
+    automaton = KeywordAutomaton(glossary)
+    results = []
+    written = []
+    for (file_path, worksheet_data), (doc_id, _) in zip(worksheets, doc_ids):
+        result = link_worksheet(doc_id, worksheet_data, automaton, glossary, every_occurrence)
+        result["path"] = file_path
+        results.append(result)
+        if write and result["changed"]:
+            if file_path.endswith((".yaml", ".yml")) and yaml is None:
+                errors.append(f"{file_path}: not written (PyYAML is not installed)")
+                continue
+            with open(file_path, "w", encoding="utf-8") as f:
+                f.write(serialise_content(file_path, worksheet_data))
+            written.append(file_path)
+
+    return {
+        "summary": {
+            "worksheets": len(results),
+            "glossaryTerms": len(glossary),
+            "newLinks": sum(r["newLinks"] for r in results),
+            "changedWorksheets": sum(1 for r in results if r["changed"]),
+            "written": written,
+            "errors": errors,
+            "elapsedSeconds": round(time.perf_counter() - start, 4),
+        },
+        "worksheets": results,
+    }
+
+
+def print_report(report, write=False):
+    """Prints per-worksheet coverage and a library summary."""
+    print("\n--- Keyword coverage ---")
+    for result in report["worksheets"]:
+        coverage = "n/a" if result["coverage"] is None else f"{result['coverage']:.0%}"
+        print(f"{result['docId']}: {coverage} of {result['glossaryTerms']} glossary term(s) linked, "
+              f"{result['newLinks']} new link(s)")
+        if result["borrowedTerms"]:
+            print(f"  Borrowed from other worksheets: {', '.join(result['borrowedTerms'])}")
+        if result["unlinkedTerms"]:
+            print(f"  Never linked: {', '.join(result['unlinkedTerms'])}")
+        if result["mentionedOnly"]:
+            print(f"  Mentioned outside keyword sections only: {', '.join(result['mentionedOnly'])}")
+    summary = report["summary"]
+    for error in summary["errors"]:
+        print(f"Error: {error}")
+    print(f"\nScanned {summary['worksheets']} worksheet(s) against {summary['glossaryTerms']} glossary term(s) "
+          f"in {summary['elapsedSeconds'] * 1000:.1f} ms: {summary['newLinks']} new link(s) in "
+          f"{summary['changedWorksheets']} worksheet(s).")
+    if write:
+        print(f"Rewrote {len(summary['written'])} file(s).")
+    elif summary["changedWorksheets"]:
+        print("Dry run: no files were changed. Re-run with --write to apply the links.")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Link glossary terms in worksheet HTML to keyword tooltips and report term coverage.")
+    parser.add_argument("content_dir", nargs="?", default=CONTENT_DIR)
+    parser.add_argument("--write", action="store_true", help="Rewrite content files with the new links")
+    parser.add_argument("--every-occurrence", action="store_true",
+                        help="Link every occurrence of a term, not just the first per section")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON instead of text")
+    args = parser.parse_args(argv)
+
+    report = link_library(args.content_dir, write=args.write, every_occurrence=args.every_occurrence)
+    if args.json:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    else:
+        print_report(report, write=args.write)
+    return 1 if report["summary"]["errors"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
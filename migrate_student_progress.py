@@ -0,0 +1,178 @@
+import argparse
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import admin_session
+from seed_worksheets import HASH_LOOKUP_CHUNK_SIZE, MAX_PARALLEL_COMMITS, MAX_RETRIES, RETRY_BASE_DELAY_SECONDS
+
+# --- Configuration ---
+STUDENT_PROGRESS_COLLECTION = "studentProgress"
+
+# Each migrated document is two writes (set the new document, delete the old one); keep each
+# WriteBatch below Firestore's 500-write limit.
+MAX_MIGRATIONS_PER_BATCH = 200
+
+
+def progress_doc_id(assignment_id, student_id):
+    """Deterministic id of a student's progress document (matches studentProgressDocId in firestoreService.ts)."""
+    return f"{assignment_id}_{student_id}"
+
+
+def find_legacy_documents(db_client, collection_name):
+    """
+    Returns [(legacy_id, data)] for progress documents that aren't stored under their per-student id.
+    Documents missing assignmentId or studentId can't be re-keyed and are reported separately.
+    """
+    legacy = []
+    unmigratable = []
+    for snapshot in db_client.collection(collection_name).stream():
+        data = snapshot.to_dict() or {}
+        assignment_id = data.get("assignmentId")
+        student_id = data.get("studentId")
+        if not assignment_id or not student_id:
+            unmigratable.append(snapshot.id)
+        elif snapshot.id != progress_doc_id(assignment_id, student_id):
+            legacy.append((snapshot.id, data))
+    return legacy, unmigratable
+
+
+def fetch_existing_targets(db_client, collection_name, target_ids):
+    """Returns {doc_id: data} for the per-student documents that already exist."""
+    collection_ref = db_client.collection(collection_name)
+    existing = {}
+    for start in range(0, len(target_ids), HASH_LOOKUP_CHUNK_SIZE):
+        refs = [collection_ref.document(doc_id) for doc_id in target_ids[start:start + HASH_LOOKUP_CHUNK_SIZE]]
+        for snapshot in db_client.get_all(refs):
+            if snapshot.exists:
+                existing[snapshot.id] = snapshot.to_dict() or {}
+    return existing
+
+
+def merge_progress(legacy_data, target_data):
+    """
+    Combines a legacy document with an already-written per-student document.
+    The per-student document is newer (it is what the app writes now), so its answers win.
+    """
+    if target_data is None:
+        return dict(legacy_data)
+    merged = dict(legacy_data)
+    merged.update(target_data)
+    merged["answers"] = {**(legacy_data.get("answers") or {}), **(target_data.get("answers") or {})}
+    return merged
+
+
+def plan_migrations(legacy_documents, existing_targets):
+    """Returns [(legacy_id, target_id, data_to_write)] for every legacy document."""
+    plan = []
+    for legacy_id, data in legacy_documents:
+        target_id = progress_doc_id(data["assignmentId"], data["studentId"])
+        plan.append((legacy_id, target_id, merge_progress(data, existing_targets.get(target_id))))
+    return plan
+
+
+def commit_migration_batch(db_client, collection_name, migrations, keep_legacy=False, max_retries=MAX_RETRIES):
+    """
+    Writes each new document and deletes its legacy document in one WriteBatch, so a document is never
+    lost or duplicated halfway. Retries the whole batch with exponential backoff; returns the retry count.
+    """
+    collection_ref = db_client.collection(collection_name)
+    attempt = 0
+    while True:
+        batch = db_client.batch()
+        for legacy_id, target_id, data in migrations:
+            batch.set(collection_ref.document(target_id), data)
+            if not keep_legacy:
+                batch.delete(collection_ref.document(legacy_id))
+        try:
+            batch.commit()
+            return attempt
+        except Exception as e:
+            if attempt >= max_retries:
+                raise
+            delay = RETRY_BASE_DELAY_SECONDS * (2 ** attempt) + random.uniform(0, RETRY_BASE_DELAY_SECONDS)
+            attempt += 1
+            print(f"  Batch starting at '{migrations[0][0]}' failed ({e}); retry {attempt}/{max_retries} in {delay:.2f}s")
+            time.sleep(delay)
+
+
+def migrate_student_progress(db_client, collection_name=STUDENT_PROGRESS_COLLECTION, keep_legacy=False,
+                             dry_run=False, max_workers=MAX_PARALLEL_COMMITS):
+    """Moves every legacy progress document to its per-student id. Returns a report dict."""
+    start = time.perf_counter()
+    legacy_documents, unmigratable = find_legacy_documents(db_client, collection_name)
+    target_ids = [progress_doc_id(data["assignmentId"], data["studentId"]) for _, data in legacy_documents]
+    existing_targets = fetch_existing_targets(db_client, collection_name, target_ids)
+    plan = plan_migrations(legacy_documents, existing_targets)
+
+    report = {
+        "legacy_documents": len(plan),
+        "merged_into_existing": sum(1 for target_id in target_ids if target_id in existing_targets),
+        "unmigratable": unmigratable,
+        "migrated": 0,
+        "retries": 0,
+        "failed": [],
+    }
+    if not dry_run:
+        batches = [plan[i:i + MAX_MIGRATIONS_PER_BATCH] for i in range(0, len(plan), MAX_MIGRATIONS_PER_BATCH)]
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            futures = {
+                executor.submit(commit_migration_batch, db_client, collection_name, batch, keep_legacy): batch
+                for batch in batches
+            }
+            for future in as_completed(futures):
+                batch = futures[future]
+                try:
+                    report["retries"] += future.result()
+                    report["migrated"] += len(batch)
+                    print(f"Migrated batch of {len(batch)} progress document(s).")
+                except Exception as e:
+                    print(f"Error migrating batch of {len(batch)} progress documents: {e}")
+                    report["failed"].extend(legacy_id for legacy_id, _, _ in batch)
+    report["elapsed_seconds"] = time.perf_counter() - start
+    return report
+
+
+def print_report(report, dry_run=False):
+    """Prints a human-readable migration summary."""
+    print("\n--- Student progress migration ---")
+    print(f"Legacy documents found: {report['legacy_documents']}")
+    print(f"Merged into an existing per-student document: {report['merged_into_existing']}")
+    if dry_run:
+        print("Dry run: nothing was written.")
+    else:
+        print(f"Migrated: {report['migrated']} (retries: {report['retries']})")
+    print(f"Elapsed: {report['elapsed_seconds']:.3f}s")
+    if report["unmigratable"]:
+        print(f"Skipped (no assignmentId/studentId): {', '.join(report['unmigratable'])}")
+    if report["failed"]:
+        print(f"Failed ({len(report['failed'])}): {', '.join(report['failed'])}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Move studentProgress/{assignmentId} documents to studentProgress/{assignmentId}_{studentId}.")
+    parser.add_argument("--collection", default=STUDENT_PROGRESS_COLLECTION)
+    parser.add_argument("--workers", type=int, default=MAX_PARALLEL_COMMITS,
+                        help="Maximum number of batches committed concurrently")
+    parser.add_argument("--keep-legacy", action="store_true", help="Copy documents without deleting the originals")
+    parser.add_argument("--dry-run", action="store_true", help="Report what would be migrated; write nothing")
+    parser.add_argument("--emulator", metavar="HOST:PORT", help="Use the Firestore emulator")
+    parser.add_argument("--project", help="Project ID to use with the emulator")
+    args = parser.parse_args(argv)
+
+    if args.emulator:
+        admin_session.use_emulator(args.emulator, args.project)
+    try:
+        db = admin_session.get_firestore()
+    except Exception as e:
+        print(f"Error initializing Firebase Admin SDK: {e}")
+        return 1
+
+    report = migrate_student_progress(db, args.collection, keep_legacy=args.keep_legacy,
+                                      dry_run=args.dry_run, max_workers=args.workers)
+    print_report(report, dry_run=args.dry_run)
+    return 1 if report["failed"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,7 +1,20 @@
 import type { NextConfig } from "next";
 
 const nextConfig: NextConfig = {
-  /* config options here */
+  async headers() {
+    return [
+      {
+        // Worksheet bundles (static_export.py) are named after their content hash and never change.
+        source: "/content/worksheets/:bundle*",
+        headers: [{ key: "Cache-Control", value: "public, max-age=31536000, immutable" }],
+      },
+      {
+        // The manifest points at the current bundles, so it must be revalidated to pick up new content.
+        source: "/content/worksheet-manifest.json",
+        headers: [{ key: "Cache-Control", value: "public, max-age=60, must-revalidate" }],
+      },
+    ];
+  },
 };
 
 export default nextConfig;
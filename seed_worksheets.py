@@ -0,0 +1,367 @@
+import argparse
+import copy
+import json
+import os
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import admin_session
+from content_hash import stamp_hashes
+import image_pipeline
+import worksheet_validator
+from worksheet_content import CONTENT_DIR, load_worksheet_library
+from worksheet_index import INDEX_COLLECTION, index_entry
+
+# --- Configuration ---
+WORKSHEETS_COLLECTION = "worksheets"
+
+# Firestore allows at most 500 writes and ~10 MiB per commit; stay comfortably below both.
+MAX_BATCH_DOCS = 400
+MAX_BATCH_BYTES = 9 * 1024 * 1024
+
+# Each worksheet is committed together with its worksheetIndex entry, so a batch holds half as many worksheets.
+WRITES_PER_WORKSHEET = 2
+
+# Number of document references fetched per get_all() call when diffing content hashes.
+HASH_LOOKUP_CHUNK_SIZE = 300
+
+MAX_PARALLEL_COMMITS = 4
+MAX_RETRIES = 3
+RETRY_BASE_DELAY_SECONDS = 0.5
+
+
+# --- Worksheet definitions ---
+def estimate_document_bytes(worksheet_data):
+    """Approximate wire size of a worksheet (sentinels and timestamps are counted as strings)."""
+    return len(json.dumps(worksheet_data, default=str, separators=(",", ":")).encode("utf-8"))
+
+
+def chunk_definitions(definitions, max_docs=MAX_BATCH_DOCS // WRITES_PER_WORKSHEET, max_bytes=MAX_BATCH_BYTES):
+    """
+    Groups (doc_id, worksheet_data) pairs into chunks that each fit in a single WriteBatch.
+    Returns a list of chunks, each a list of (doc_id, worksheet_data, size_in_bytes).
+    """
+    chunks = []
+    current_chunk = []
+    current_bytes = 0
+    for doc_id, worksheet_data in definitions:
+        size = estimate_document_bytes(worksheet_data)
+        if current_chunk and (len(current_chunk) >= max_docs or current_bytes + size > max_bytes):
+            chunks.append(current_chunk)
+            current_chunk = []
+            current_bytes = 0
+        current_chunk.append((doc_id, worksheet_data, size))
+        current_bytes += size
+    if current_chunk:
+        chunks.append(current_chunk)
+    return chunks
+
+
+def prepare_definitions(definitions, skip_invalid=False, verbose=True):
+    """
+    Turns content into exactly the documents seeding writes: validates every worksheet with the full
+    validator and attaches diagram image metadata (see image_pipeline.py) to a copy of the rest. Every
+    writer goes through here, so the same worksheet always gets the same contentHash.
+    Returns (prepared_definitions, invalid_doc_ids); nothing is prepared if any worksheet is invalid
+    unless skip_invalid is True.
+    """
+    library = [{"doc_id": doc_id, "data": data, "path": doc_id, "errors": []} for doc_id, data in definitions]
+    validation_report = worksheet_validator.validate_library(library)
+    invalid_ids = worksheet_validator.invalid_doc_ids(validation_report)
+    if invalid_ids and verbose:
+        worksheet_validator.print_report(validation_report)
+    if invalid_ids and not skip_invalid:
+        return [], sorted(invalid_ids)
+
+    image_manifest = image_pipeline.load_manifest()
+    prepared = []
+    for doc_id, worksheet_data in definitions:
+        if doc_id in invalid_ids:
+            continue
+        worksheet_data = copy.deepcopy(worksheet_data)
+        for url in image_pipeline.attach_image_metadata(worksheet_data, image_manifest):
+            if image_manifest and verbose:
+                print(f"Warning: {doc_id}: image '{url}' has no built variants; run 'python admin.py images'.")
+        prepared.append((doc_id, worksheet_data))
+    return prepared, sorted(invalid_ids)
+
+
+# --- Change detection ---
+def fetch_remote_hashes(db_client, collection_name, doc_ids):
+    """
+    Returns {doc_id: contentHash} for the given documents, reading only the contentHash field.
+    Documents that don't exist (or predate content hashing) are omitted.
+    """
+    collection_ref = db_client.collection(collection_name)
+    remote_hashes = {}
+    for start in range(0, len(doc_ids), HASH_LOOKUP_CHUNK_SIZE):
+        refs = [collection_ref.document(doc_id) for doc_id in doc_ids[start:start + HASH_LOOKUP_CHUNK_SIZE]]
+        for snapshot in db_client.get_all(refs, field_paths=["contentHash"]):
+            if snapshot.exists:
+                content_hash = (snapshot.to_dict() or {}).get("contentHash")
+                if content_hash:
+                    remote_hashes[snapshot.id] = content_hash
+    return remote_hashes
+
+
+def select_changed_definitions(db_client, collection_name, definitions):
+    """
+    Stamps each definition with its content hashes and drops the ones whose hash matches Firestore.
+    Returns (changed_definitions, unchanged_doc_ids).
+    """
+    stamped = [(doc_id, stamp_hashes(worksheet_data)) for doc_id, worksheet_data in definitions]
+    remote_hashes = fetch_remote_hashes(db_client, collection_name, [doc_id for doc_id, _ in stamped])
+    changed = []
+    unchanged = []
+    for doc_id, worksheet_data in stamped:
+        if remote_hashes.get(doc_id) == worksheet_data["contentHash"]:
+            unchanged.append(doc_id)
+        else:
+            changed.append((doc_id, worksheet_data))
+    return changed, unchanged
+
+
+# --- Seeding ---
+def commit_chunk(db_client, collection_name, chunk, max_retries=MAX_RETRIES, index_collection=INDEX_COLLECTION):
+    """
+    Writes one chunk with a single WriteBatch, retrying the whole batch with exponential backoff.
+    Each worksheet's index entry is written in the same batch, so the two can't disagree.
+    Batched set() calls are idempotent, so a retry after a partial network failure is safe.
+    Returns the number of retries that were needed.
+    """
+    firestore = admin_session.firestore_module()
+    collection_ref = db_client.collection(collection_name)
+    index_ref = db_client.collection(index_collection)
+    attempt = 0
+    while True:
+        batch = db_client.batch()
+        for doc_id, worksheet_data, _ in chunk:
+            data_to_set = dict(worksheet_data)
+            data_to_set.setdefault("createdAt", firestore.SERVER_TIMESTAMP)
+            data_to_set["lastScriptUpdate"] = firestore.SERVER_TIMESTAMP
+            batch.set(collection_ref.document(doc_id), data_to_set)
+            batch.set(index_ref.document(doc_id), {**index_entry(worksheet_data), "updatedAt": firestore.SERVER_TIMESTAMP})
+        try:
+            batch.commit()
+            return attempt
+        except Exception as e:
+            if attempt >= max_retries:
+                raise
+            delay = RETRY_BASE_DELAY_SECONDS * (2 ** attempt) + random.uniform(0, RETRY_BASE_DELAY_SECONDS)
+            attempt += 1
+            print(f"  Batch starting at '{chunk[0][0]}' failed ({e}); retry {attempt}/{max_retries} in {delay:.2f}s")
+            time.sleep(delay)
+
+
+def seed_worksheets(db_client, definitions, collection_name=WORKSHEETS_COLLECTION,
+                    max_workers=MAX_PARALLEL_COMMITS, max_retries=MAX_RETRIES, force=False,
+                    index_collection=INDEX_COLLECTION, skip_invalid=False):
+    """
+    Validates and seeds (doc_id, worksheet_data) pairs into Firestore using parallel WriteBatch commits.
+    If any worksheet fails validation nothing is written (unless skip_invalid, which seeds the rest).
+    Worksheets whose contentHash already matches Firestore are skipped unless force is True.
+    Returns a throughput report dict.
+    """
+    definitions, invalid_ids = prepare_definitions(definitions, skip_invalid=skip_invalid)
+    if force:
+        unchanged = []
+        definitions = [(doc_id, stamp_hashes(worksheet_data)) for doc_id, worksheet_data in definitions]
+    else:
+        definitions, unchanged = select_changed_definitions(db_client, collection_name, definitions)
+
+    chunks = chunk_definitions(definitions)
+    report = {
+        "documents": 0,
+        "bytes": 0,
+        "batches": len(chunks),
+        "retries": 0,
+        "skipped_unchanged": len(unchanged),
+        "invalid_documents": invalid_ids,
+        "failed_documents": [],
+    }
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        futures = {
+            executor.submit(commit_chunk, db_client, collection_name, chunk, max_retries, index_collection): chunk
+            for chunk in chunks
+        }
+        for future in as_completed(futures):
+            chunk = futures[future]
+            try:
+                report["retries"] += future.result()
+                report["documents"] += len(chunk)
+                report["bytes"] += sum(size for _, _, size in chunk)
+                print(f"Committed batch of {len(chunk)} worksheet(s): {chunk[0][0]} .. {chunk[-1][0]}")
+            except Exception as e:
+                print(f"Error committing batch of {len(chunk)} worksheets: {e}")
+                report["failed_documents"].extend(doc_id for doc_id, _, _ in chunk)
+    elapsed = time.perf_counter() - start
+
+    report["elapsed_seconds"] = elapsed
+    report["docs_per_second"] = report["documents"] / elapsed if elapsed > 0 else 0.0
+    report["bytes_per_second"] = report["bytes"] / elapsed if elapsed > 0 else 0.0
+    return report
+
+
+def verify_worksheets(db_client, definitions, collection_name=WORKSHEETS_COLLECTION):
+    """
+    Checks Firestore holds exactly the given content, reading only each document's contentHash.
+    Returns the list of doc ids that are missing or out of date (invalid worksheets count as out of date).
+    """
+    definitions, invalid_ids = prepare_definitions(definitions, skip_invalid=True, verbose=False)
+    _, unchanged = select_changed_definitions(db_client, collection_name, definitions)
+    unchanged = set(unchanged)
+    return invalid_ids + [doc_id for doc_id, _ in definitions if doc_id not in unchanged]
+
+
+def rebuild_index(db_client, collection_name=WORKSHEETS_COLLECTION, index_collection=INDEX_COLLECTION,
+                  force=False, max_workers=MAX_PARALLEL_COMMITS):
+    """
+    Rewrites the index entries of worksheets already in Firestore whose entry is missing or stale, e.g.
+    seeded before the index existed or edited in the console. Entries of deleted worksheets are removed.
+    Returns (written, deleted, failed_doc_ids).
+    """
+    firestore = admin_session.firestore_module()
+    worksheets = {snapshot.id: snapshot.to_dict() or {} for snapshot in db_client.collection(collection_name).stream()}
+    entries = {doc_id: index_entry(worksheet_data) for doc_id, worksheet_data in worksheets.items()}
+    index_ref = db_client.collection(index_collection)
+    remote_hashes = {} if force else fetch_remote_hashes(db_client, index_collection, sorted(entries))
+    stale = [doc_id for doc_id, entry in sorted(entries.items()) if remote_hashes.get(doc_id) != entry["contentHash"]]
+    orphans = sorted({ref.id for ref in index_ref.list_documents()} - set(entries))
+
+    def commit_index_batch(doc_ids):
+        batch = db_client.batch()
+        for doc_id in doc_ids:
+            if doc_id in entries:
+                batch.set(index_ref.document(doc_id), {**entries[doc_id], "updatedAt": firestore.SERVER_TIMESTAMP})
+            else:
+                batch.delete(index_ref.document(doc_id))
+        batch.commit()
+
+    written, deleted, failed = 0, 0, []
+    work = stale + orphans
+    batches = [work[i:i + MAX_BATCH_DOCS] for i in range(0, len(work), MAX_BATCH_DOCS)]
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        futures = {executor.submit(commit_index_batch, doc_ids): doc_ids for doc_ids in batches}
+        for future in as_completed(futures):
+            doc_ids = futures[future]
+            try:
+                future.result()
+                written += sum(1 for doc_id in doc_ids if doc_id in entries)
+                deleted += sum(1 for doc_id in doc_ids if doc_id not in entries)
+            except Exception as e:
+                print(f"Error writing batch of {len(doc_ids)} index entries: {e}")
+                failed.extend(doc_ids)
+    return written, deleted, failed
+
+
+def print_report(report):
+    """Prints a human-readable throughput summary for a seeding run."""
+    print("\n--- Seeding report ---")
+    print(f"Documents written: {report['documents']} in {report['batches']} batch(es)")
+    print(f"Payload: {report['bytes'] / 1024:.1f} KiB")
+    print(f"Elapsed: {report['elapsed_seconds']:.3f}s")
+    print(f"Throughput: {report['docs_per_second']:.1f} docs/sec, {report['bytes_per_second'] / 1024:.1f} KiB/sec")
+    print(f"Skipped (unchanged): {report['skipped_unchanged']}")
+    print(f"Retries: {report['retries']}")
+    if report["invalid_documents"]:
+        print(f"Invalid documents ({len(report['invalid_documents'])}): {', '.join(report['invalid_documents'])}")
+    if report["failed_documents"]:
+        print(f"Failed documents ({len(report['failed_documents'])}): {', '.join(report['failed_documents'])}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Seed a directory of worksheet definitions into Firestore.")
+    parser.add_argument("content_dir", nargs="?", default=CONTENT_DIR,
+                        help=f"Directory of worksheet JSON/YAML files (default: {CONTENT_DIR})")
+    parser.add_argument("--collection", default=WORKSHEETS_COLLECTION)
+    parser.add_argument("--workers", type=int, default=MAX_PARALLEL_COMMITS,
+                        help="Maximum number of batches committed concurrently")
+    parser.add_argument("--retries", type=int, default=MAX_RETRIES)
+    parser.add_argument("--emulator", metavar="HOST:PORT",
+                        help="Seed the Firestore emulator instead of the live project")
+    parser.add_argument("--project", help="Project ID to use with the emulator")
+    parser.add_argument("--force", action="store_true",
+                        help="Write every worksheet even if its content hash is unchanged")
+    parser.add_argument("--skip-invalid", action="store_true",
+                        help="Seed the valid worksheets even if others fail validation")
+    parser.add_argument("--verify", action="store_true",
+                        help="Write nothing; only check that Firestore matches the content library")
+    parser.add_argument("--report-json", metavar="PATH", help="Also write the throughput report to a JSON file")
+    parser.add_argument("--index-collection", default=INDEX_COLLECTION,
+                        help=f"Collection holding the worksheet summaries (default: {INDEX_COLLECTION})")
+    parser.add_argument("--rebuild-index", action="store_true",
+                        help="Seed nothing; rebuild stale index entries from the worksheets already in Firestore")
+    args = parser.parse_args(argv)
+
+    if args.rebuild_index:
+        if args.emulator:
+            admin_session.use_emulator(args.emulator, args.project)
+        try:
+            db = admin_session.get_firestore()
+        except Exception as e:
+            print(f"Error initializing Firebase Admin SDK: {e}")
+            return 1
+        written, deleted, failed = rebuild_index(db, args.collection, args.index_collection,
+                                                 force=args.force, max_workers=args.workers)
+        print(f"Index '{args.index_collection}': {written} entr{'y' if written == 1 else 'ies'} written, {deleted} removed.")
+        if failed:
+            print(f"Failed ({len(failed)}): {', '.join(failed)}")
+        return 1 if failed else 0
+
+    if not os.path.isdir(args.content_dir):
+        print(f"Error: content directory '{args.content_dir}' does not exist.")
+        return 1
+
+    library = load_worksheet_library(args.content_dir)
+    if not library:
+        print(f"No worksheet definitions found in '{args.content_dir}'.")
+        return 1
+
+    # Files that didn't load can't be validated further; seed_worksheets() validates the rest.
+    load_failures = [e for e in library if e["errors"]]
+    for entry in load_failures:
+        for error in entry["errors"]:
+            print(f"Error: {error}")
+    if load_failures and not args.skip_invalid:
+        print("Some worksheets failed to load; nothing was seeded. Fix the errors above or pass --skip-invalid.")
+        return 1
+    definitions = [(e["doc_id"], e["data"]) for e in library if not e["errors"]]
+
+    if args.emulator:
+        admin_session.use_emulator(args.emulator, args.project)
+    try:
+        db = admin_session.get_firestore()
+    except Exception as e:
+        print(f"Error initializing Firebase Admin SDK: {e}")
+        print("Please ensure you have set up your Firebase Admin credentials correctly.")
+        return 1
+
+    if args.verify:
+        out_of_date = verify_worksheets(db, definitions, collection_name=args.collection)
+        if out_of_date:
+            print(f"{len(out_of_date)} worksheet(s) missing or out of date in '{args.collection}': {', '.join(out_of_date)}")
+            return 1
+        print(f"All {len(definitions)} worksheet(s) in '{args.collection}' match the content library.")
+        return 0
+
+    print(f"Seeding {len(definitions)} worksheet(s) from '{args.content_dir}' into '{args.collection}'...")
+    report = seed_worksheets(db, definitions, collection_name=args.collection,
+                             max_workers=args.workers, max_retries=args.retries, force=args.force,
+                             index_collection=args.index_collection, skip_invalid=args.skip_invalid)
+    if report["invalid_documents"] and not args.skip_invalid:
+        print("Validation failed; nothing was seeded. Fix the errors above or pass --skip-invalid.")
+        return 1
+    print_report(report)
+    admin_session.print_startup_report()
+
+    if args.report_json:
+        with open(args.report_json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.report_json}")
+    return 1 if report["failed_documents"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,43 +1,33 @@
 // src/app/(platform)/gcse/page.tsx
-"use client";
-
+// Statically generated from the course tree (src/lib/courseTree.ts): the units listed are the ones in
+// content/courses, with their worksheet counts. No Firestore queries.
 import React from 'react';
 import Link from 'next/link';
-// Added Users to the import from lucide-react
-import { BookOpen, ChevronLeft, ExternalLink, Youtube, FileText, Brain, Users } from 'lucide-react'; 
-
-// Data for General Resources
-const generalResources = [
-  { name: "Join Quizlet Class", href: "#", icon: Users }, // Now uses Users from lucide-react
-  { name: "Craig n Dave YouTube (J277)", href: "https://www.youtube.com/@craigndave", icon: Youtube, external: true },
-  { name: "OCR J277 Specification (PDF)", href: "https://www.ocr.org.uk/Images/558027-specification-gcse-computer-science-j277.pdf", icon: FileText, external: true },
-  { name: "MGS Notion Resources", href: "#", icon: BookOpen }, // Placeholder href
-];
+import { loadCourseTree, CourseResource } from '@/lib/courseTree';
+import { BookOpen, ChevronLeft, ExternalLink, Youtube, FileText, Brain, Users, Code } from 'lucide-react';
 
-// Data for Component 01 Topics
-const component01Topics = [
-  { id: "j277-1-1", title: "Systems Architecture", href: "/gcse/j277/unit-1-1" },
-  { id: "j277-1-2", title: "Memory and Storage", href: "/gcse/j277/unit-1-2" },
-  { id: "j277-1-3", title: "Computer Networks, Connections and Protocols", href: "/gcse/j277/unit-1-3" },
-  { id: "j277-1-4", title: "Network Security", href: "/gcse/j277/unit-1-4" },
-  { id: "j277-1-5", title: "Systems Software", href: "/gcse/j277/unit-1-5" },
-  { id: "j277-1-6", title: "Ethical, Legal, Cultural and Environmental Concerns", href: "/gcse/j277/unit-1-6" },
-];
+// Icons for the resource links named in content/courses/*.json.
+const resourceIcons: Record<NonNullable<CourseResource["icon"]>, React.ElementType> = {
+  users: Users,
+  youtube: Youtube,
+  file: FileText,
+  book: BookOpen,
+};
 
-// Data for Component 02 Topics
-const component02Topics = [
-  { id: "j277-2-1", title: "Algorithms", href: "/gcse/j277/unit-2-1" },
-  { id: "j277-2-2", title: "Programming Fundamentals", href: "/gcse/j277/unit-2-2" },
-  { id: "j277-2-3", title: "Producing Robust Programs", href: "/gcse/j277/unit-2-3" }, // Assuming unit number for consistency
-  { id: "j277-2-4", title: "Boolean Logic", href: "/gcse/j277/unit-2-4" },
-  { id: "j277-2-5", title: "Programming Languages and Integrated Development Environments (IDEs)", href: "/gcse/j277/unit-2-5" },
+// Card styles for a course's components, in order (Component 01, Component 02, ...).
+const componentStyles = [
+  { icon: Brain, iconClass: "text-purple-600", titleClass: "text-purple-700 border-purple-200" },
+  { icon: Code, iconClass: "text-teal-600", titleClass: "text-teal-700 border-teal-200" },
 ];
 
 // Helper component for topic links/buttons
-const TopicLink: React.FC<{ title: string; href: string }> = ({ title, href }) => (
+const TopicLink: React.FC<{ title: string; href: string; worksheetCount: number }> = ({ title, href, worksheetCount }) => (
   <Link href={href} className="block w-full">
     <div className="text-center p-3 bg-white hover:bg-indigo-50 border border-gray-200 rounded-lg shadow-sm transition-all duration-200 ease-in-out hover:border-indigo-300">
       <span className="text-sm font-medium text-gray-700 group-hover:text-indigo-600">{title}</span>
+      {worksheetCount > 0 && (
+        <span className="ml-2 text-xs text-gray-500">({worksheetCount} worksheet{worksheetCount === 1 ? "" : "s"})</span>
+      )}
     </div>
   </Link>
 );
@@ -53,7 +43,9 @@ const GeneralResourceButton: React.FC<{ name: string; href: string; icon: React.
 );
 
 
-export default function GcsePageNewLayout() {
+export default async function GcsePageNewLayout() {
+  const { courses } = await loadCourseTree();
+
   return (
     <div className="min-h-screen bg-slate-50">
       <div className="container mx-auto p-4 sm:p-6 lg:p-8">
@@ -69,54 +61,64 @@ export default function GcsePageNewLayout() {
           </div>
         </header>
 
-        {/* General Resources Section */}
-        <section className="mb-10 p-6 bg-white rounded-xl shadow-lg">
-          <h2 className="text-xl font-semibold text-center text-gray-700 mb-6">General Resources</h2>
-          <div className="flex flex-wrap justify-center gap-3 sm:gap-4">
-            {generalResources.map(resource => (
-              <GeneralResourceButton key={resource.name} {...resource} />
-            ))}
-          </div>
-        </section>
+        {courses.length === 0 && (
+          <p className="text-center text-gray-600">No courses have been published yet.</p>
+        )}
 
-        {/* Components Section - Two Columns */}
-        <div className="grid grid-cols-1 md:grid-cols-2 gap-8">
-          {/* Component 01 */}
-          <section className="p-6 bg-white rounded-xl shadow-lg">
-            <div className="flex items-center mb-5">
-                <Brain className="w-7 h-7 text-purple-600 mr-3" />
-                <h2 className="text-2xl font-semibold text-purple-700 border-b-2 border-purple-200 pb-2 flex-grow">
-                    Component 01: Computer Systems
-                </h2>
-            </div>
-            <div className="space-y-3">
-              {component01Topics.map(topic => (
-                <TopicLink key={topic.id} title={topic.title} href={topic.href} />
-              ))}
-            </div>
-          </section>
+        {courses.map(course => (
+          <div key={course.slug} className="mb-12">
+            {courses.length > 1 && (
+              <h2 className="text-2xl font-bold text-center text-indigo-700 mb-6">{course.title}</h2>
+            )}
 
-          {/* Component 02 */}
-          <section className="p-6 bg-white rounded-xl shadow-lg">
-            <div className="flex items-center mb-5">
-                <svg xmlns="http://www.w3.org/2000/svg" className="h-7 w-7 text-teal-600 mr-3" fill="none" viewBox="0 0 24 24" stroke="currentColor" strokeWidth={2}>
-                    <path strokeLinecap="round" strokeLinejoin="round" d="M10 20l4-16m4 4l4 4-4 4M6 16l-4-4 4-4" />
-                </svg>
-                <h2 className="text-2xl font-semibold text-teal-700 border-b-2 border-teal-200 pb-2 flex-grow">
-                    Component 02: Computational Thinking, Algorithms and Programming
-                </h2>
-            </div>
-            <div className="space-y-3">
-              {component02Topics.map(topic => (
-                <TopicLink key={topic.id} title={topic.title} href={topic.href} />
-              ))}
+            {/* General Resources Section */}
+            {course.resources.length > 0 && (
+              <section className="mb-10 p-6 bg-white rounded-xl shadow-lg">
+                <h2 className="text-xl font-semibold text-center text-gray-700 mb-6">General Resources</h2>
+                <div className="flex flex-wrap justify-center gap-3 sm:gap-4">
+                  {course.resources.map(resource => (
+                    <GeneralResourceButton
+                      key={resource.name}
+                      name={resource.name}
+                      href={resource.href}
+                      icon={resourceIcons[resource.icon ?? "book"]}
+                      external={resource.external}
+                    />
+                  ))}
+                </div>
+              </section>
+            )}
+
+            {/* Components Section - Two Columns */}
+            <div className="grid grid-cols-1 md:grid-cols-2 gap-8">
+              {course.components.map((component, index) => {
+                const style = componentStyles[index % componentStyles.length];
+                const Icon = style.icon;
+                return (
+                  <section key={component.id} className="p-6 bg-white rounded-xl shadow-lg">
+                    <div className="flex items-center mb-5">
+                        <Icon className={`w-7 h-7 mr-3 ${style.iconClass}`} />
+                        <h2 className={`text-2xl font-semibold border-b-2 pb-2 flex-grow ${style.titleClass}`}>
+                            {component.title}
+                        </h2>
+                    </div>
+                    <div className="space-y-3">
+                      {component.units.map(unit => (
+                        <TopicLink
+                          key={unit.slug}
+                          title={unit.title}
+                          href={`/gcse/${course.slug}/${unit.slug}`}
+                          worksheetCount={unit.worksheets.length}
+                        />
+                      ))}
+                    </div>
+                  </section>
+                );
+              })}
             </div>
-          </section>
-        </div>
+          </div>
+        ))}
       </div>
     </div>
   );
 }
-
-// Removed the dummy Users icon component as it's now imported from lucide-react
-
@@ -1,22 +1,13 @@
 // src/app/(platform)/student/assignments/page.tsx
 "use client";
 
-import React, { useState, useEffect, useCallback } from 'react';
+import React, { useState, useEffect, useCallback, useRef } from 'react';
 import Link from 'next/link';
-import { collection, query, where, getDocs, Timestamp, doc, getDoc } from 'firebase/firestore';
-import { db } from '@/config/firebase';
 import { useAuthStore, UserProfile } from '@/store/authStore'; // UserProfile includes classIds
+import { AssignmentFeed, AssignmentFeedItem, AssignmentInboxFeed, AssignmentPager } from '@/services/assignmentFeed';
 import { BookOpenCheck, ListTodo, AlertCircle, ChevronRight, ChevronLeft, Loader2 } from 'lucide-react';
 
-interface Assignment {
-  id: string; // Firestore document ID of the assignment
-  worksheetId: string;
-  worksheetTitle: string;
-  classId: string;
-  className: string;
-  teacherId: string; 
-  assignedAt: Date;
-}
+type Assignment = AssignmentFeedItem;
 
 // Explicitly type userProfile for this component for clarity with classIds
 interface StudentUserProfileWithClasses extends UserProfile {
@@ -29,6 +20,9 @@ export default function StudentAssignmentsPage() {
   const [assignments, setAssignments] = useState<Assignment[]>([]);
   const [isLoadingAssignments, setIsLoadingAssignments] = useState(true);
   const [error, setError] = useState<string | null>(null);
+  const [hasMore, setHasMore] = useState(false);
+  const [isLoadingMore, setIsLoadingMore] = useState(false);
+  const feedRef = useRef<AssignmentPager | null>(null);
   
   // Use a typed version of userProfile for better type safety within this component
   const studentUserProfile = userProfile as StudentUserProfileWithClasses | null;
@@ -53,40 +47,18 @@ export default function StudentAssignmentsPage() {
     console.log("StudentAssignmentsPage: Fetching assignments for student UID:", studentUserProfile.uid, "Class IDs:", studentUserProfile.classIds);
 
     try {
-      // Firestore 'in' queries are limited to 30 items in the array.
-      // If a student could be in more than 30 classes (unlikely for this app),
-      // you'd need to batch these queries. For now, assuming <30 classes.
-      if (studentUserProfile.classIds.length > 30) {
-          console.warn("Student is in more than 30 classes, Firestore 'in' query might be an issue.");
-          // Implement batching if this becomes a reality
+      // The student's own inbox is one indexed query per page. An empty inbox may just not have been
+      // backfilled yet, so fall back to the class-wide feed (chunked by 30 classes and merged).
+      let feed: AssignmentPager = new AssignmentInboxFeed(studentUserProfile.uid);
+      let firstPage = await feed.loadNextPage();
+      if (firstPage.length === 0) {
+        feed = new AssignmentFeed(studentUserProfile.classIds);
+        firstPage = await feed.loadNextPage();
       }
-
-      const assignmentsQuery = query(
-        collection(db, "assignments"),
-        where("classId", "in", studentUserProfile.classIds)
-        // orderBy("assignedAt", "desc") // You can add ordering if needed
-      );
-      
-      const querySnapshot = await getDocs(assignmentsQuery);
-      const fetchedAssignments: Assignment[] = [];
-      querySnapshot.forEach((docSnap) => { // Renamed doc to docSnap to avoid conflict
-        const data = docSnap.data();
-        fetchedAssignments.push({
-          id: docSnap.id,
-          worksheetId: data.worksheetId,
-          worksheetTitle: data.worksheetTitle || "Untitled Worksheet",
-          classId: data.classId,
-          className: data.className || "Unknown Class",
-          teacherId: data.teacherId,
-          assignedAt: (data.assignedAt as Timestamp)?.toDate ? (data.assignedAt as Timestamp).toDate() : new Date(),
-        });
-      });
-      
-      // Sort by assignedAt date client-side if not done by Firestore, newest first
-      fetchedAssignments.sort((a, b) => b.assignedAt.getTime() - a.assignedAt.getTime());
-
-      setAssignments(fetchedAssignments);
-      console.log("StudentAssignmentsPage: Fetched assignments:", fetchedAssignments);
+      feedRef.current = feed;
+      setAssignments(firstPage);
+      setHasMore(feed.hasMore());
+      console.log("StudentAssignmentsPage: Fetched assignments:", firstPage, feed.getStats());
 
     } catch (err) {
       console.error("StudentAssignmentsPage: Error fetching assignments:", err);
@@ -96,6 +68,24 @@ export default function StudentAssignmentsPage() {
     }
   }, [studentUserProfile]); // Depend on the typed studentUserProfile
 
+  const loadMoreAssignments = async () => {
+    const feed = feedRef.current;
+    if (!feed || isLoadingMore) {
+      return;
+    }
+    setIsLoadingMore(true);
+    try {
+      const nextPage = await feed.loadNextPage();
+      setAssignments(prev => [...prev, ...nextPage]);
+      setHasMore(feed.hasMore());
+    } catch (err) {
+      console.error("StudentAssignmentsPage: Error fetching more assignments:", err);
+      setError("Failed to load more assignments. Please try again.");
+    } finally {
+      setIsLoadingMore(false);
+    }
+  };
+
   useEffect(() => {
     // Only fetch if auth is not loading and user profile (with role and classIds) is available
     if (!authIsLoading && studentUserProfile && studentUserProfile.role === "student") {
@@ -209,6 +199,19 @@ export default function StudentAssignmentsPage() {
               </div>
             </div>
           ))}
+          {hasMore && (
+            <div className="text-center">
+              <button
+                type="button"
+                onClick={loadMoreAssignments}
+                disabled={isLoadingMore}
+                className="inline-flex items-center text-sm bg-white border border-indigo-300 text-indigo-600 hover:bg-indigo-50 font-medium py-2.5 px-5 rounded-lg transition-colors disabled:opacity-60"
+              >
+                {isLoadingMore && <Loader2 className="animate-spin h-4 w-4 mr-2" />}
+                {isLoadingMore ? "Loading..." : "Load more assignments"}
+              </button>
+            </div>
+          )}
         </div>
       )}
     </div>
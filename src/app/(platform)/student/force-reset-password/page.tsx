@@ -4,9 +4,10 @@
 import React, { useState, useEffect } from 'react';
 import { useRouter } from 'next/navigation';
 import { useAuthStore } from '@/store/authStore';
-import { auth, db } from '@/config/firebase';
+import { auth, functions } from '@/config/firebase';
 import { updatePassword, EmailAuthProvider, reauthenticateWithCredential } from 'firebase/auth';
-import { doc, updateDoc } from 'firebase/firestore';
+import { httpsCallable } from 'firebase/functions';
+import { refreshClaims } from '@/services/authClaims';
 import { LogIn, KeyRound, ShieldCheck, Loader2 } from 'lucide-react'; // Added Loader2 here
 
 export default function ForcePasswordResetPage() {
@@ -91,12 +92,12 @@ export default function ForcePasswordResetPage() {
       await updatePassword(currentUser, newPassword);
       console.log("ForcePasswordResetPage: Password updated successfully in Firebase Auth.");
 
-      // Update the passwordNeedsReset flag in Firestore
-      const userDocRef = doc(db, "users", currentUser.uid);
-      await updateDoc(userDocRef, {
-        passwordNeedsReset: false,
-      });
-      console.log("ForcePasswordResetPage: passwordNeedsReset flag updated in Firestore.");
+      // Clear the passwordNeedsReset flag in the profile and the token claims (the function does both),
+      // then refresh the token so the cleared claim applies immediately.
+      const completePasswordReset = httpsCallable(functions, 'completePasswordReset');
+      await completePasswordReset();
+      await refreshClaims();
+      console.log("ForcePasswordResetPage: passwordNeedsReset flag cleared in profile and claims.");
 
       // Update userProfile in Zustand store (optional, but good for consistency)
       if (userProfile) {
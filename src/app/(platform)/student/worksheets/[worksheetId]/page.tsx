@@ -1,14 +1,19 @@
 // src/app/(platform)/student/worksheets/[worksheetId]/page.tsx
 "use client";
 
-import React, { useState, useEffect, useCallback } from 'react';
+import React, { useState, useEffect, useCallback, useRef } from 'react';
 import { useParams, useRouter, useSearchParams } from 'next/navigation';
 import Link from 'next/link';
-import { doc, getDoc, Timestamp, setDoc, updateDoc, collection } from 'firebase/firestore';
+import { doc, getDoc, Timestamp, updateDoc, collection } from 'firebase/firestore';
 import { db } from '@/config/firebase';
 import { useAuthStore } from '@/store/authStore';
+import { STUDENT_PROGRESS_COLLECTION, studentProgressDocRef } from '@/services/firestoreService';
+import { ProgressAutosaver } from '@/services/progressAutosave';
+import { loadWorksheet } from '@/services/worksheetBundles';
+import { useAnswerStore, useHasAnswers } from '@/store/answerStore';
 
 import WorksheetComponent from '@/components/worksheets/Worksheet'; 
+import { preloadSectionTypes } from '@/components/worksheets/sectionRegistry';
 import type { Worksheet as WorksheetType } from '@/components/worksheets/worksheetTypes';
 import { ChevronLeft, BookOpen, Save, Send, Loader2, AlertTriangle } from 'lucide-react';
 
@@ -19,6 +24,8 @@ interface FetchedWorksheetStudentView extends Omit<WorksheetType, "createdAt"> {
 
 type AnswersState = Record<string, string>;
 
+const isReadOnly = false;
+
 export default function StudentViewWorksheetPage() {
   const params = useParams();
   const router = useRouter();
@@ -28,11 +35,15 @@ export default function StudentViewWorksheetPage() {
   const assignmentId = searchParams.get("assignmentId"); 
 
   const { userProfile, isLoading: authIsLoading } = useAuthStore();
+  // Effects key on the uid alone: a token refresh must never reload the worksheet over unsaved answers.
+  const studentUid = userProfile?.uid;
   const [worksheet, setWorksheet] = useState<FetchedWorksheetStudentView | null>(null);
   const [isLoadingPage, setIsLoadingPage] = useState(true);
   const [error, setError] = useState<string | null>(null);
 
-  const [answers, setAnswers] = useState<AnswersState>({});
+  // Answers live in the answer store so each question subscribes to its own value; the page never re-renders on typing.
+  const replaceAnswers = useAnswerStore((state) => state.replaceAnswers);
+  const hasAnswers = useHasAnswers();
   const [isSaving, setIsSaving] = useState(false);
   const [lastSaved, setLastSaved] = useState<Date | null>(null);
   const [saveError, setSaveError] = useState<string | null>(null);
@@ -43,64 +54,64 @@ export default function StudentViewWorksheetPage() {
   }, [authIsLoading, userProfile]);
 
 
-  const debounce = <F extends (...args: any[]) => any>(func: F, waitFor: number) => {
-    let timeout: NodeJS.Timeout | null = null;
-    return (...args: Parameters<F>): Promise<ReturnType<F>> =>
-      new Promise(resolve => {
-        if (timeout) {
-          clearTimeout(timeout);
-        }
-        timeout = setTimeout(() => resolve(func(...args)), waitFor);
-      });
-  };
+  // Don't let answers from this worksheet leak into the next one opened.
+  useEffect(() => () => useAnswerStore.getState().clearAnswers(), [worksheetId]);
 
-  const saveProgress = useCallback(async (currentAnswers: AnswersState) => {
+  // Autosave engine for this (assignment, student): writes only changed answers, at most once per interval.
+  const autosaverRef = useRef<ProgressAutosaver | null>(null);
+  useEffect(() => {
     if (!userProfile?.uid || !worksheetId || !assignmentId) {
-      console.warn("StudentViewWorksheetPage - SaveProgress: Missing user, worksheet, or assignment ID. Cannot save.");
-      setSaveError("Cannot save progress: missing required information.");
+      autosaverRef.current = null;
       return;
     }
-    setIsSaving(true);
-    setSaveError(null);
-    console.log(`StudentViewWorksheetPage - SaveProgress: Saving for assignment ${assignmentId}, worksheet ${worksheetId}`);
-    
-    try {
-      const progressDocRef = doc(db, "studentProgress", assignmentId);
-      const progressData = {
+    const autosaver = new ProgressAutosaver(studentProgressDocRef(assignmentId, userProfile.uid), {
+      baseFields: {
         studentId: userProfile.uid,
         worksheetId: worksheetId,
         assignmentId: assignmentId,
-        answers: currentAnswers,
-        lastUpdated: Timestamp.now(),
         status: "in-progress",
-      };
-      await setDoc(progressDocRef, progressData, { merge: true });
-      setLastSaved(new Date());
-      setHasUnsavedChanges(false);
-      console.log("StudentViewWorksheetPage - SaveProgress: Progress saved successfully.");
-    } catch (err: any) { // Explicitly type err as any or unknown then check type
-      console.error("StudentViewWorksheetPage - SaveProgress: Error saving progress:", err);
-      setSaveError(`Failed to save your progress: ${err.message || "Unknown error"}`);
-    } finally {
-      setIsSaving(false);
-    }
+      },
+      onStatusChange: (status) => {
+        setIsSaving(status.isSaving);
+        setHasUnsavedChanges(status.hasUnsavedChanges);
+        if (status.lastSaved) {
+          setLastSaved(status.lastSaved);
+        }
+        setSaveError(status.error ? `Failed to save your progress: ${status.error}` : null);
+      },
+    });
+    autosaverRef.current = autosaver;
+    const detachListeners = autosaver.attachLifecycleListeners();
+    return () => {
+      detachListeners();
+      void autosaver.flush().then(() => console.log("StudentViewWorksheetPage - Autosave stats:", autosaver.getStats()));
+      autosaverRef.current = null;
+    };
   }, [userProfile?.uid, worksheetId, assignmentId]);
 
-  const debouncedSaveProgress = useCallback(debounce(saveProgress, 2500), [saveProgress]);
+  const saveProgress = useCallback(async () => {
+    if (!autosaverRef.current) {
+      console.warn("StudentViewWorksheetPage - SaveProgress: Missing user, worksheet, or assignment ID. Cannot save.");
+      setSaveError("Cannot save progress: missing required information.");
+      return;
+    }
+    await autosaverRef.current.flush();
+  }, []);
 
-  const handleAnswerChange = (questionId: string, answer: string) => {
-    setAnswers(prevAnswers => {
-      const newAnswers = { ...prevAnswers, [questionId]: answer };
-      if (!isReadOnly) {
+  // Stable across renders so the memoized worksheet and sections never re-render because of it.
+  const handleAnswerChange = useCallback((questionId: string, answer: string) => {
+    useAnswerStore.getState().setAnswer(questionId, answer);
+    if (!isReadOnly) {
+      if (autosaverRef.current) {
+        autosaverRef.current.markDirty(questionId, answer);
+      } else {
         setHasUnsavedChanges(true);
-        debouncedSaveProgress(newAnswers);
       }
-      return newAnswers;
-    });
-  };
+    }
+  }, []);
   
   const fetchWorksheetAndProgress = useCallback(async () => {
-    if (!userProfile?.uid) {
+    if (!studentUid) {
       console.log("StudentViewWorksheetPage - fetchWorksheetAndProgress: No userProfile.uid available. Aborting fetch.");
       setError("Authentication details are missing. Please log in again.");
       setIsLoadingPage(false);
@@ -116,22 +127,24 @@ export default function StudentViewWorksheetPage() {
     setIsLoadingPage(true);
     setError(null);
     setSaveError(null);
-    console.log(`StudentViewWorksheetPage - fetchWorksheetAndProgress: Fetching worksheet ${worksheetId}. Assignment ID (for progress): ${assignmentId}. User UID: ${userProfile.uid}`);
+    console.log(`StudentViewWorksheetPage - fetchWorksheetAndProgress: Fetching worksheet ${worksheetId}. Assignment ID (for progress): ${assignmentId}. User UID: ${studentUid}`);
     
     let fetchedWorksheetData: FetchedWorksheetStudentView | null = null;
 
     // Step 1: Fetch worksheet content
     try {
-      console.log("StudentViewWorksheetPage - fetchWorksheetAndProgress: Attempting to fetch worksheet document...");
-      const worksheetDocRef = doc(db, "worksheets", worksheetId);
-      const worksheetDocSnap = await getDoc(worksheetDocRef);
+      console.log("StudentViewWorksheetPage - fetchWorksheetAndProgress: Attempting to fetch worksheet...");
+      // The static bundle when the worksheet has been exported (no Firestore read), otherwise the document.
+      const loaded = await loadWorksheet(worksheetId);
 
-      if (worksheetDocSnap.exists()) {
-        console.log("StudentViewWorksheetPage - fetchWorksheetAndProgress: Worksheet document found.");
-        const data = worksheetDocSnap.data() as WorksheetType;
+      if (loaded) {
+        console.log(`StudentViewWorksheetPage - fetchWorksheetAndProgress: Worksheet found (${loaded.source}).`);
+        const data = loaded.worksheet;
+        // Start downloading the section renderers while saved progress is still loading.
+        preloadSectionTypes(data.sections);
         fetchedWorksheetData = {
           ...data,
-          id: worksheetDocSnap.id,
+          id: worksheetId,
           createdAt: (data.createdAt as Timestamp)?.toDate ? (data.createdAt as Timestamp).toDate() : undefined,
         };
         setWorksheet(fetchedWorksheetData);
@@ -152,24 +165,39 @@ export default function StudentViewWorksheetPage() {
     if (assignmentId && fetchedWorksheetData) {
       try {
         console.log("StudentViewWorksheetPage - fetchWorksheetAndProgress: Attempting to fetch student progress for assignment:", assignmentId);
-        const progressDocRef = doc(db, "studentProgress", assignmentId);
-        const progressDocSnap = await getDoc(progressDocRef);
+        let progressDocSnap = await getDoc(studentProgressDocRef(assignmentId, studentUid));
+        const hasPerStudentDoc = progressDocSnap.exists();
+        autosaverRef.current?.setDocumentExists(hasPerStudentDoc);
+        if (!hasPerStudentDoc) {
+          // Fall back to the old shared studentProgress/{assignmentId} layout until it has been migrated.
+          // Rules deny the read when that document belongs to another student, which just means "no progress".
+          try {
+            progressDocSnap = await getDoc(doc(db, STUDENT_PROGRESS_COLLECTION, assignmentId));
+          } catch (legacyErr) {
+            console.log("StudentViewWorksheetPage - fetchWorksheetAndProgress: No readable legacy progress document.", legacyErr);
+          }
+        }
 
         if (progressDocSnap.exists()) {
           const progressData = progressDocSnap.data();
-          if (progressData.studentId === userProfile.uid) {
-            setAnswers(progressData.answers as AnswersState || {});
+          if (progressData.studentId === studentUid) {
+            const savedAnswers = (progressData.answers as AnswersState) || {};
+            replaceAnswers(savedAnswers);
             setLastSaved(progressData.lastUpdated?.toDate() || null);
+            if (!hasPerStudentDoc) {
+              // Copy legacy answers into the per-student document with the first save.
+              Object.entries(savedAnswers).forEach(([questionId, answer]) => autosaverRef.current?.markDirty(questionId, answer));
+            }
             console.log("StudentViewWorksheetPage - fetchWorksheetAndProgress: Loaded saved answers:", progressData.answers);
           } else {
-            console.warn(`StudentViewWorksheetPage - fetchWorksheetAndProgress: Progress document ${assignmentId} found, but studentId mismatch. Current user: ${userProfile.uid}, Doc studentId: ${progressData.studentId}`);
-            setAnswers({}); 
+            console.warn(`StudentViewWorksheetPage - fetchWorksheetAndProgress: Progress document ${assignmentId} found, but studentId mismatch. Current user: ${studentUid}, Doc studentId: ${progressData.studentId}`);
+            replaceAnswers({}); 
             // Optionally set an error or message if progress belongs to another user but assignment ID was accessed
             // setError("Could not load progress: data mismatch."); 
           }
         } else {
           console.log("StudentViewWorksheetPage - fetchWorksheetAndProgress: No saved progress found for this assignment. Starting fresh.");
-          setAnswers({});
+          replaceAnswers({});
         }
       } catch (err: any) {
         console.error(`StudentViewWorksheetPage - fetchWorksheetAndProgress: Error fetching student progress (assignmentId: ${assignmentId}):`, err);
@@ -177,26 +205,25 @@ export default function StudentViewWorksheetPage() {
         // This error is specific to loading progress.
         setSaveError(`Failed to load your saved progress: ${err.message || "Unknown error"}. Check permissions for 'studentProgress' collection.`);
         // Allow worksheet to still be displayed even if progress fails to load
-        setAnswers({}); 
+        replaceAnswers({}); 
       }
     } else if (!assignmentId) {
         console.warn("StudentViewWorksheetPage - fetchWorksheetAndProgress: No assignmentId provided. Cannot load or save progress. Worksheet will be view-only without progress tracking.");
-        setAnswers({});
+        replaceAnswers({});
     }
     
     setIsLoadingPage(false); // Set loading to false after all attempts
-  }, [userProfile, worksheetId, assignmentId]);
+  }, [studentUid, worksheetId, assignmentId, replaceAnswers]);
 
   useEffect(() => {
-    if (!authIsLoading && userProfile?.uid && worksheetId) {
+    if (!authIsLoading && studentUid && worksheetId) {
         fetchWorksheetAndProgress();
-    } else if (!authIsLoading && !userProfile) {
+    } else if (!authIsLoading && !studentUid) {
         setError("Please log in to view this worksheet.");
         setIsLoadingPage(false);
     }
-  }, [authIsLoading, userProfile, worksheetId, fetchWorksheetAndProgress]);
+  }, [authIsLoading, studentUid, worksheetId, fetchWorksheetAndProgress]);
 
-  const isReadOnly = false; 
 
   if (authIsLoading || isLoadingPage) {
     return (
@@ -257,7 +284,7 @@ export default function StudentViewWorksheetPage() {
             {isSaving && <Loader2 className="animate-spin h-4 w-4 mr-1.5" />}
             {isSaving ? "Saving..." : 
              lastSaved ? `Last saved: ${lastSaved.toLocaleTimeString()}` : 
-             hasUnsavedChanges ? "Unsaved changes" : (worksheet && Object.keys(answers).length > 0 ? "All changes saved" : "No changes yet")}
+             hasUnsavedChanges ? "Unsaved changes" : (worksheet && hasAnswers ? "All changes saved" : "No changes yet")}
             {saveError && <span className="ml-2 text-red-500 font-semibold">(Save Error: {saveError})</span>}
         </div>
       </div>
@@ -267,14 +294,13 @@ export default function StudentViewWorksheetPage() {
         isLoading={false} 
         error={null}    
         isReadOnly={isReadOnly} 
-        answers={answers}
         onAnswerChange={handleAnswerChange}
       />
 
       {worksheet && !isReadOnly && (
         <div className="max-w-4xl mx-auto mt-8 p-4 text-center flex flex-col sm:flex-row justify-end gap-3">
             <button 
-                onClick={() => saveProgress(answers)} 
+                onClick={() => saveProgress()} 
                 disabled={isSaving || !hasUnsavedChanges}
                 className="bg-blue-500 hover:bg-blue-600 text-white font-semibold py-2.5 px-6 rounded-lg shadow-md hover:shadow-lg transition-colors disabled:opacity-50 flex items-center justify-center"
             >
@@ -10,6 +10,7 @@ import { db, functions } from '@/config/firebase';
 import { useAuthStore } from '@/store/authStore'; // Ensure this imports the updated store
 import type { SchoolClass, StudentUser } from '@/types';
 import BulkAddStudentsModal from '@/components/teacher/BulkAddStudentsModal'; // Ensure this path is correct
+import { getRosterCacheStats, invalidateStudentCache, loadStudentsByUid } from '@/services/firestoreService';
 
 export default function ClassDetailsPage() {
   const params = useParams();
@@ -99,20 +100,13 @@ export default function ClassDetailsPage() {
       console.log("ClassDetailsPage: Fetching student usernames for IDs:", schoolClass.studentIds);
       try {
         const newStudentDetails: Record<string, Partial<StudentUser>> = {};
-        const studentPromises = schoolClass.studentIds.map(async (studentId) => {
-          const userDocRef = doc(db, "users", studentId);
-          const userDocSnap = await getDoc(userDocRef);
-          if (userDocSnap.exists()) {
-            const userData = userDocSnap.data() as StudentUser;
-            newStudentDetails[studentId] = {
-              uid: studentId,
-              username: userData.username || "N/A",
-            };
-          } else {
-            newStudentDetails[studentId] = { uid: studentId, username: "Unknown Student" };
-          }
+        const studentsByUid = await loadStudentsByUid(schoolClass.studentIds);
+        studentsByUid.forEach((student, studentId) => {
+          newStudentDetails[studentId] = student
+            ? { uid: studentId, username: student.username || "N/A" }
+            : { uid: studentId, username: "Unknown Student" };
         });
-        await Promise.all(studentPromises);
+        console.log("ClassDetailsPage: Roster cache stats:", getRosterCacheStats());
         setStudentDetails(newStudentDetails);
       } catch (err) {
         console.error("ClassDetailsPage: Error fetching student usernames:", err);
@@ -169,6 +163,7 @@ export default function ClassDetailsPage() {
       const result = (await removeStudentFn({ classId: schoolClass.id, studentUid: studentUidToRemove })) as { data: { success: boolean; message: string } };
 
       if (result.data.success) {
+        invalidateStudentCache([studentUidToRemove]); // Their classIds changed
         fetchClassDetails(); // Refetch to get updated student list
       } else {
         setActionError(result.data.message || "Failed to remove student.");
@@ -4,9 +4,9 @@
 import React, { useState, useEffect, useCallback } from "react";
 import { useParams, useRouter } from "next/navigation";
 import Link from "next/link";
-import { doc, getDoc, Timestamp } from "firebase/firestore";
-import { db } from "@/config/firebase";
+import { Timestamp } from "firebase/firestore";
 import { useAuthStore } from "@/store/authStore";
+import { loadWorksheet } from "@/services/worksheetBundles";
 
 import WorksheetComponent from "@/components/worksheets/Worksheet"; 
 import type { Worksheet as WorksheetType } from "@/components/worksheets/worksheetTypes";
@@ -47,14 +47,13 @@ export default function ViewWorksheetPage() {
     setIsLoading(true);
     setError(null);
     try {
-      const worksheetDocRef = doc(db, "worksheets", worksheetId);
-      const worksheetDocSnap = await getDoc(worksheetDocRef);
+      const loaded = await loadWorksheet(worksheetId);
 
-      if (worksheetDocSnap.exists()) {
-        const data = worksheetDocSnap.data() as WorksheetType;
+      if (loaded) {
+        const data = loaded.worksheet;
         setWorksheet({
           ...data,
-          id: worksheetDocSnap.id,
+          id: worksheetId,
           createdAt: (data.createdAt as Timestamp)?.toDate ? (data.createdAt as Timestamp).toDate() : undefined,
         });
       } else {
@@ -1,26 +1,22 @@
 // src/app/(platform)/teacher/library/page.tsx
 "use client";
 
-import React, { useState, useEffect, useCallback } from "react";
+import React, { useState, useEffect, useCallback, useRef } from "react";
 import Link from "next/link"; 
 import { useRouter } from "next/navigation"; 
-import { collection, getDocs, query, orderBy, Timestamp } from "firebase/firestore";
-import { db } from "@/config/firebase";
 import { useAuthStore } from "@/store/authStore"; // Ensure this imports the updated store
-import type { Worksheet } from "@/components/worksheets/worksheetTypes"; 
+import { WorksheetIndexEntry, WorksheetIndexPager } from "@/services/worksheetIndex";
 import { Loader2, AlertCircle, BookOpen, Search, ChevronLeft } from "lucide-react"; // Added icons
 
-interface FetchedWorksheet extends Omit<Worksheet, "createdAt"> {
-  id: string;
-  createdAt?: Date; 
-}
-
 export default function TeacherLibraryPage() {
   const { userProfile, isLoading: authStoreIsLoading } = useAuthStore(); // Use userProfile and authStoreIsLoading
   const router = useRouter();
-  const [worksheets, setWorksheets] = useState<FetchedWorksheet[]>([]);
+  const [worksheets, setWorksheets] = useState<WorksheetIndexEntry[]>([]);
   const [isLoadingPageData, setIsLoadingPageData] = useState(true); // Local loading for page data
   const [error, setError] = useState<string | null>(null);
+  const [hasMore, setHasMore] = useState(false);
+  const [isLoadingMore, setIsLoadingMore] = useState(false);
+  const pagerRef = useRef<WorksheetIndexPager | null>(null);
 
   const fetchWorksheets = useCallback(async () => {
     // This function should only run if userProfile is available and is a teacher
@@ -35,20 +31,12 @@ export default function TeacherLibraryPage() {
     setIsLoadingPageData(true);
     setError(null);
     try {
-      const worksheetsCollectionRef = collection(db, "worksheets");
-      const q = query(worksheetsCollectionRef, orderBy("title"));
-      const querySnapshot = await getDocs(q);
-      
-      const fetchedWorksheets: FetchedWorksheet[] = [];
-      querySnapshot.forEach((doc) => {
-        const data = doc.data() as Worksheet;
-        fetchedWorksheets.push({
-          ...data,
-          id: doc.id,
-          createdAt: (data.createdAt as Timestamp)?.toDate ? (data.createdAt as Timestamp).toDate() : undefined,
-        });
-      });
-      setWorksheets(fetchedWorksheets);
+      // Summaries only (worksheetIndex), a page at a time; the full worksheet is read when it's opened.
+      const pager = new WorksheetIndexPager();
+      const firstPage = await pager.loadNextPage();
+      pagerRef.current = pager;
+      setWorksheets(firstPage);
+      setHasMore(pager.hasMore());
     } catch (err) {
       console.error("Error fetching worksheets:", err);
       setError("Failed to load worksheets from the library.");
@@ -57,6 +45,24 @@ export default function TeacherLibraryPage() {
     }
   }, [userProfile]); // Depend on userProfile
 
+  const loadMoreWorksheets = async () => {
+    const pager = pagerRef.current;
+    if (!pager || isLoadingMore) {
+      return;
+    }
+    setIsLoadingMore(true);
+    try {
+      const nextPage = await pager.loadNextPage();
+      setWorksheets(prev => [...prev, ...nextPage]);
+      setHasMore(pager.hasMore());
+    } catch (err) {
+      console.error("Error fetching more worksheets:", err);
+      setError("Failed to load more worksheets from the library.");
+    } finally {
+      setIsLoadingMore(false);
+    }
+  };
+
   useEffect(() => {
     // Wait for global auth loading to finish AND userProfile to be available
     if (!authStoreIsLoading && userProfile) {
@@ -158,10 +164,19 @@ export default function TeacherLibraryPage() {
                   </p>
                 )}
                 {worksheet.unit && (
-                  <p className="text-xs text-gray-500 mb-3">
+                  <p className="text-xs text-gray-500 mb-1">
                     <span className="font-medium">Unit:</span> {worksheet.unit}
                   </p>
                 )}
+                {worksheet.specReference && (
+                  <p className="text-xs text-gray-500 mb-1">
+                    <span className="font-medium">Spec Ref:</span> {worksheet.specReference}
+                  </p>
+                )}
+                <p className="text-xs text-gray-500 mb-3">
+                  {worksheet.sectionCount} section{worksheet.sectionCount === 1 ? "" : "s"}
+                  {worksheet.keywords.length > 0 && ` · ${worksheet.keywords.length} keyword${worksheet.keywords.length === 1 ? "" : "s"}`}
+                </p>
                 {worksheet.learningObjectives && worksheet.learningObjectives.length > 0 && (
                     <div className="mb-3">
                         <p className="text-xs font-medium text-gray-600 mb-1">Objectives:</p>
@@ -186,6 +201,20 @@ export default function TeacherLibraryPage() {
           ))}
         </div>
       )}
+
+      {hasMore && (
+        <div className="mt-8 text-center">
+          <button
+            type="button"
+            onClick={loadMoreWorksheets}
+            disabled={isLoadingMore}
+            className="inline-flex items-center text-sm bg-white border border-indigo-300 text-indigo-600 hover:bg-indigo-50 font-medium py-2.5 px-5 rounded-lg transition-colors disabled:opacity-60"
+          >
+            {isLoadingMore && <Loader2 className="animate-spin h-4 w-4 mr-2" />}
+            {isLoadingMore ? "Loading..." : "Load more worksheets"}
+          </button>
+        </div>
+      )}
     </div>
   );
 }
@@ -1,23 +1,36 @@
 // src/components/layout/AuthProvider.tsx
 "use client";
 
-import React, { useEffect, useState } from "react";
+import React, { useEffect, useRef, useState } from "react";
 import { usePathname, useRouter } from "next/navigation";
-import { onAuthStateChanged, User as FirebaseUser } from "firebase/auth";
-import { doc, getDoc } from "firebase/firestore";
-import { auth, db } from "@/config/firebase";
+import { onIdTokenChanged, User as FirebaseUser } from "firebase/auth";
+import { auth } from "@/config/firebase";
 import { useAuthStore, UserProfile } from "@/store/authStore"; // UserProfile now includes passwordNeedsReset and classIds
+import { readProfileClaims, refreshClaimsIfStale } from "@/services/authClaims";
+import { invalidateStudentCache } from "@/services/firestoreService";
 
 interface AuthProviderProps {
   children: React.ReactNode;
 }
 
+// Whether a rebuilt profile carries the same user and claims as the one in the store. Token refreshes
+// (hourly, or refreshClaimsIfStale on focus) then keep the existing profile object, so pages whose
+// effects depend on userProfile don't refetch and reset what the user is doing.
+const sameProfile = (current: UserProfile | null, next: UserProfile): boolean =>
+  !!current &&
+  current.uid === next.uid &&
+  current.role === next.role &&
+  current.passwordNeedsReset === next.passwordNeedsReset &&
+  (current.classIds ?? []).join("\u0000") === (next.classIds ?? []).join("\u0000") &&
+  (current.classIds === undefined) === (next.classIds === undefined);
+
 export default function AuthProvider({ children }: AuthProviderProps) {
   const { setUserProfile, userProfile, isLoading: authStoreIsLoading } = useAuthStore();
   const pathname = usePathname();
   const router = useRouter();
 
   const [hasMounted, setHasMounted] = useState(false);
+  const currentUidRef = useRef<string | null>(null);
 
   useEffect(() => {
     setHasMounted(true);
@@ -25,42 +38,32 @@ export default function AuthProvider({ children }: AuthProviderProps) {
   }, []);
 
   useEffect(() => {
-    console.log("AuthProvider: Setting up onAuthStateChanged listener.");
-    const unsubscribe = onAuthStateChanged(auth, async (firebaseUser: FirebaseUser | null) => {
-      console.log(`AuthProvider: onAuthStateChanged fired. User UID: ${firebaseUser ? firebaseUser.uid : "null"}`);
-      useAuthStore.getState().setLoading(true);
+    // onIdTokenChanged (rather than onAuthStateChanged) also fires when the token is refreshed, which is
+    // how changed custom claims reach the profile (see src/services/authClaims.ts).
+    console.log("AuthProvider: Setting up onIdTokenChanged listener.");
+    const unsubscribe = onIdTokenChanged(auth, async (firebaseUser: FirebaseUser | null) => {
+      console.log(`AuthProvider: onIdTokenChanged fired. User UID: ${firebaseUser ? firebaseUser.uid : "null"}`);
+      const isNewUser = (firebaseUser?.uid ?? null) !== currentUidRef.current;
+      currentUidRef.current = firebaseUser?.uid ?? null;
+      if (isNewUser) {
+        // Token refreshes for the same user update the profile in place, without the full-page loader.
+        useAuthStore.getState().setLoading(true);
+        invalidateStudentCache(); // Don't keep the previous account's roster in memory
+      }
 
       if (firebaseUser) {
         try {
-          console.log(`AuthProvider: User detected (UID: ${firebaseUser.uid}). Fetching role, passwordNeedsReset, and classIds...`);
-          const userDocRef = doc(db, "users", firebaseUser.uid);
-          const userDocSnap = await getDoc(userDocRef);
-          
-          let userRole: "teacher" | "student" | null = null;
-          let passwordNeedsReset: boolean | null = null;
-          let classIds: string[] | undefined = undefined; // Initialize as undefined
-
-          if (userDocSnap.exists()) {
-            const userData = userDocSnap.data();
-            userRole = userData?.role || null;
-            passwordNeedsReset = userData?.passwordNeedsReset === true; 
-            if (userRole === "student") { // Only fetch classIds for students
-                classIds = userData?.classIds || []; // Default to empty array if not present
-            }
-
-            if (!userRole) {
-              console.warn(`AuthProvider: User UID: ${firebaseUser.uid} document exists but is missing the 'role' field.`);
-            } else {
-              console.log(`AuthProvider: Role fetched for UID ${firebaseUser.uid}: ${userRole}`);
-            }
-            console.log(`AuthProvider: passwordNeedsReset flag for UID ${firebaseUser.uid}: ${passwordNeedsReset}`);
-            if (userRole === "student") {
-                console.log(`AuthProvider: classIds for student UID ${firebaseUser.uid}:`, classIds);
-            }
+          console.log(`AuthProvider: User detected (UID: ${firebaseUser.uid}). Reading role, passwordNeedsReset, and classIds from token claims...`);
+          const { role: userRole, passwordNeedsReset, classIds } = await readProfileClaims(firebaseUser);
+          if (!userRole) {
+            console.warn(`AuthProvider: User UID: ${firebaseUser.uid} has no role in their claims or profile.`);
           } else {
-            console.warn(`AuthProvider: No user document found in Firestore for UID: ${firebaseUser.uid}. Role, passwordNeedsReset, and classIds will be null/undefined.`);
+            console.log(`AuthProvider: Role for UID ${firebaseUser.uid}: ${userRole}, passwordNeedsReset: ${passwordNeedsReset}`);
+          }
+          if (userRole === "student") {
+            console.log(`AuthProvider: classIds for student UID ${firebaseUser.uid}:`, classIds);
           }
-          
+
           const profile: UserProfile = {
             uid: firebaseUser.uid,
             email: firebaseUser.email,
@@ -81,6 +84,10 @@ export default function AuthProvider({ children }: AuthProviderProps) {
             passwordNeedsReset: passwordNeedsReset,
             classIds: classIds, // Add classIds to the profile
           };
+          if (sameProfile(useAuthStore.getState().userProfile, profile)) {
+            console.log("AuthProvider: Token refreshed; role and classes unchanged, keeping the current profile.");
+            return;
+          }
           console.log("AuthProvider: Setting user profile in store:", profile);
           setUserProfile(profile);
         } catch (error) {
@@ -105,12 +112,24 @@ export default function AuthProvider({ children }: AuthProviderProps) {
       }
     });
     return () => {
-      console.log("AuthProvider: Cleaning up onAuthStateChanged listener.");
+      console.log("AuthProvider: Cleaning up onIdTokenChanged listener.");
       unsubscribe();
     };
   // eslint-disable-next-line react-hooks/exhaustive-deps
   }, []); // Run once on mount
 
+  // Pick up claims changed by someone else (e.g. a teacher adding or removing this student) when the tab
+  // comes back into view, without waiting for the hourly token refresh.
+  useEffect(() => {
+    const handleVisibilityChange = () => {
+      if (document.visibilityState === "visible") {
+        refreshClaimsIfStale().catch((error) => console.warn("AuthProvider: Could not refresh token claims:", error));
+      }
+    };
+    document.addEventListener("visibilitychange", handleVisibilityChange);
+    return () => document.removeEventListener("visibilitychange", handleVisibilityChange);
+  }, []);
+
   // Redirection logic (remains the same as previous version with passwordNeedsReset handling)
   useEffect(() => {
     if (!hasMounted || authStoreIsLoading) {
@@ -65,8 +65,8 @@ export default function BulkAddStudentsModal({
       setIsLoading(false);
       return;
     }
-    if (numberOfStudents > 50) {
-        setError('Cannot create more than 50 students at a time.');
+    if (numberOfStudents > 300) {
+        setError('Cannot create more than 300 students at a time.');
         setIsLoading(false);
         return;
     }
@@ -78,13 +78,16 @@ export default function BulkAddStudentsModal({
       const result = (await bulkCreateStudentsFn({
         classId,
         count: numberOfStudents,
-      })) as { data: { success: boolean; message: string; createdStudents?: CreatedStudentInfoFromFunction[] } }; 
+      })) as { data: { success: boolean; message: string; createdStudents?: CreatedStudentInfoFromFunction[]; failedStudents?: Array<{ username: string; error: string }> } }; 
 
       console.log("BulkAddStudentsModal: Firebase function result received:", result);
 
       if (result.data.success && result.data.createdStudents && result.data.createdStudents.length > 0) {
         console.log("BulkAddStudentsModal: Success! Setting createdStudentsInfo with data (passwords should be here):", JSON.stringify(result.data.createdStudents, null, 2));
         setCreatedStudentsInfo(result.data.createdStudents);
+        if (result.data.failedStudents && result.data.failedStudents.length > 0) {
+          setError(`${result.data.failedStudents.length} account(s) could not be saved and were not created. ${result.data.message}`);
+        }
         onStudentsAdded(); 
       } else if (result.data.success && (!result.data.createdStudents || result.data.createdStudents.length === 0)) {
         console.warn("BulkAddStudentsModal: Function reported success but no student data was returned or array was empty.");
@@ -187,7 +190,7 @@ export default function BulkAddStudentsModal({
                 className="w-full p-2.5 border border-gray-300 rounded-md shadow-sm focus:ring-indigo-500 focus:border-indigo-500 text-sm"
                 placeholder="e.g., 30"
                 min="1"
-                max="50"
+                max="300"
                 required
                 disabled={isLoading}
               />
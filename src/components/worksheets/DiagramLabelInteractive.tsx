@@ -3,11 +3,15 @@
 
 import React, { useState, useEffect } from 'react';
 import Image from 'next/image';
-import type { Hotspot } from './worksheetTypes'; // Make sure Hotspot is defined in worksheetTypes
+import type { DiagramImage, Hotspot } from './worksheetTypes'; // Make sure Hotspot is defined in worksheetTypes
 import KeywordTooltipWrapper from './KeywordTooltipWrapper';
 
+// Rendered width of the diagram: the container below is max-w-2xl (42rem).
+const DIAGRAM_IMAGE_SIZES = "(max-width: 672px) 100vw, 672px";
+
 interface DiagramLabelInteractiveProps {
   diagramImageUrl?: string;
+  diagramImage?: DiagramImage; // Built variants and intrinsic size (image_pipeline.py)
   diagramAltText?: string;
   hotspots?: Hotspot[];
   keywordsData?: Record<string, string>;
@@ -19,6 +23,7 @@ interface DiagramLabelInteractiveProps {
 
 const DiagramLabelInteractive: React.FC<DiagramLabelInteractiveProps> = ({
   diagramImageUrl,
+  diagramImage,
   diagramAltText = "Interactive Diagram",
   hotspots = [],
   keywordsData = {},
@@ -43,6 +48,7 @@ const DiagramLabelInteractive: React.FC<DiagramLabelInteractiveProps> = ({
   };
 
   const [revealedState, setRevealedState] = useState<Record<string, boolean>>(getInitialRevealedState());
+  const [imageLoaded, setImageLoaded] = useState(false);
 
   useEffect(() => {
     setRevealedState(getInitialRevealedState());
@@ -63,12 +69,56 @@ const DiagramLabelInteractive: React.FC<DiagramLabelInteractiveProps> = ({
     }
   };
 
+  const handleImageError = (e: React.SyntheticEvent<HTMLImageElement>) => {
+    const target = e.target as HTMLImageElement;
+    target.style.display = 'none';
+    const parent = target.closest('.relative.w-full'); // The outer container
+    if (parent) {
+      const errorMsg = document.createElement('p');
+      errorMsg.textContent = `Failed to load image: ${diagramAltText}`;
+      errorMsg.className = "text-red-500 text-center p-4";
+      parent.appendChild(errorMsg);
+    }
+  };
+
   if (!diagramImageUrl) {
     return <p className="text-red-500">Diagram image URL is missing.</p>;
   }
 
   return (
     <div className="relative w-full max-w-2xl mx-auto my-6">
+      {diagramImage ? (
+        // Sized from the intrinsic dimensions, so nothing shifts (and hotspot percentages line up with the
+        // image itself) while it loads; the blur placeholder fills the space until then.
+        <div
+          className="rounded-md shadow-md bg-gray-100 overflow-hidden"
+          style={{
+            position: 'relative',
+            width: '100%',
+            paddingBottom: `${(diagramImage.height / diagramImage.width) * 100}%`,
+            backgroundImage: imageLoaded ? undefined : `url(${diagramImage.blurDataURL})`,
+            backgroundSize: 'cover',
+          }}
+        >
+          <picture>
+            {diagramImage.sources.map(source => (
+              <source key={source.type} type={source.type} srcSet={source.srcSet} sizes={DIAGRAM_IMAGE_SIZES} />
+            ))}
+            {/* eslint-disable-next-line @next/next/no-img-element -- variants are pre-built, next/image would re-encode them */}
+            <img
+              src={diagramImage.src}
+              alt={diagramAltText}
+              width={diagramImage.width}
+              height={diagramImage.height}
+              decoding="async"
+              fetchPriority="high"
+              style={{ position: 'absolute', inset: 0, width: '100%', height: '100%', objectFit: 'contain' }}
+              onLoad={() => setImageLoaded(true)}
+              onError={handleImageError}
+            />
+          </picture>
+        </div>
+      ) : (
       <div style={{ position: 'relative', width: '100%', paddingBottom: '75%' }}> {/* Aspect ratio container */}
         <Image
           src={diagramImageUrl}
@@ -77,19 +127,10 @@ const DiagramLabelInteractive: React.FC<DiagramLabelInteractiveProps> = ({
           objectFit="contain"
           className="rounded-md shadow-md bg-gray-100"
           priority
-          onError={(e) => {
-            const target = e.target as HTMLImageElement;
-            target.style.display = 'none';
-            const parent = target.parentElement?.parentElement; // Access the outer div
-            if (parent) {
-                 const errorMsg = document.createElement('p');
-                 errorMsg.textContent = `Failed to load image: ${diagramAltText}`;
-                 errorMsg.className = "text-red-500 text-center p-4";
-                 parent.appendChild(errorMsg);
-            }
-          }}
+          onError={handleImageError}
         />
       </div>
+      )}
       {hotspots.map((hotspot) => {
         const isRevealed = revealedState[hotspot.id];
         const definition = hotspot.termKey ? keywordsData[hotspot.termKey.toLowerCase()] : undefined;
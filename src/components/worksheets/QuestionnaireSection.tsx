@@ -0,0 +1,39 @@
+// src/components/worksheets/QuestionnaireSection.tsx
+'use client';
+
+import React from 'react';
+import type { Section } from './worksheetTypes';
+import StaticContentBlock from './StaticContentBlock';
+import ShortAnswerQuestion from './ShortAnswerQuestion';
+
+interface QuestionnaireSectionProps {
+  section: Section;
+  isReadOnly?: boolean;
+  onAnswerChange?: (questionId: string, answer: string) => void;
+}
+
+const QuestionnaireSection: React.FC<QuestionnaireSectionProps> = ({ section, isReadOnly = true, onAnswerChange }) => (
+  <div className="space-y-4">
+    {(section.questions || []).map((question) => {
+      if (question.type === "ShortAnswer") {
+        return (
+          <ShortAnswerQuestion 
+            key={question.id} 
+            question={question} 
+            isReadOnly={isReadOnly}
+            onChange={onAnswerChange}
+          />
+        );
+      } else if (question.type === "StaticContent" && question.htmlContent) {
+        return (
+          <div key={question.id} className="p-3 my-2 bg-indigo-50 rounded-md">
+               <StaticContentBlock htmlContent={question.htmlContent} />
+          </div>
+        );
+      }
+      return <p key={question.id} className="text-red-500 text-sm">Unsupported question type: {question.type} in section {section.title}</p>;
+    })}
+  </div>
+);
+
+export default QuestionnaireSection;
@@ -0,0 +1,50 @@
+// src/components/worksheets/QuizSection.tsx
+'use client';
+
+import React from 'react';
+import type { Section } from './worksheetTypes';
+import StaticContentBlock from './StaticContentBlock';
+import MultipleChoiceQuestionInteractive from './MultipleChoiceQuestionInteractive';
+
+interface QuizSectionProps {
+  section: Section;
+  isReadOnly?: boolean;
+  // Maps questionId to selectedOptionId
+  quizAnswers?: Record<string, string | null>;
+  onQuizAnswerSelect?: (questionId: string, selectedOptionId: string) => void;
+  showQuizFeedback?: boolean;
+}
+
+const QuizSection: React.FC<QuizSectionProps> = ({
+  section,
+  isReadOnly = true,
+  quizAnswers,
+  onQuizAnswerSelect,
+  showQuizFeedback,
+}) => (
+  <div className="space-y-3"> {/* Adjusted spacing for list of questions */}
+    {(section.questions || []).map((question) => {
+      if (question.type === "MultipleChoiceQuestion") {
+        return (
+          <MultipleChoiceQuestionInteractive
+            key={question.id}
+            questionData={question}
+            isReadOnly={isReadOnly}
+            selectedAnswer={quizAnswers?.[question.id]}
+            onAnswerSelect={onQuizAnswerSelect ? (qId, oId) => onQuizAnswerSelect(qId, oId) : () => {}}
+            showFeedback={showQuizFeedback}
+          />
+        );
+      } else if (question.type === "StaticContent" && question.htmlContent) {
+        return (
+          <div key={question.id} className="p-3 my-2 bg-indigo-50 rounded-md prose prose-sm sm:prose max-w-none">
+               <StaticContentBlock htmlContent={question.htmlContent} />
+          </div>
+        );
+      }
+      return <p key={question.id} className="text-red-500 text-sm">Unsupported question type: {question.type} in Quiz section {section.title}</p>;
+    })}
+  </div>
+);
+
+export default QuizSection;
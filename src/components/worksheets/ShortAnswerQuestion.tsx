@@ -4,21 +4,26 @@
 import React from 'react';
 import type { Question } from './worksheetTypes'; // Assuming worksheetTypes.ts is created or types are imported
 import StaticContentBlock from './StaticContentBlock';
+import { useAnswer } from '@/store/answerStore';
 
 
 interface ShortAnswerQuestionProps {
   question: Question; 
   isReadOnly?: boolean; // True for teacher previews, false for student interaction
-  value?: string; // Current answer value for this question
+  value?: string; // Current answer value; read from the answer store when omitted
   onChange?: (questionId: string, answer: string) => void; // Callback when answer changes
 }
 
 const ShortAnswerQuestion: React.FC<ShortAnswerQuestionProps> = ({ 
   question, 
   isReadOnly = false, // Default to false (editable) for student use
-  value = '',       // Default to empty string
+  value,
   onChange 
 }) => {
+  // Subscribes to this question only, so other questions' keystrokes don't re-render it.
+  const storedValue = useAnswer(question.id);
+  const currentValue = value ?? storedValue;
+
   if (question.type !== "ShortAnswer") {
     console.warn(`ShortAnswerQuestion received question of type: ${question.type}`);
     return null;
@@ -44,7 +49,7 @@ const ShortAnswerQuestion: React.FC<ShortAnswerQuestionProps> = ({
         className={`w-full p-2 border border-gray-300 rounded-md shadow-sm focus:ring-indigo-500 focus:border-indigo-500 text-sm ${isReadOnly ? 'bg-gray-100 cursor-not-allowed' : 'bg-white'}`}
         placeholder={question.placeholder || "Your answer..."}
         readOnly={isReadOnly}
-        value={value}
+        value={currentValue}
         onChange={!isReadOnly ? handleChange : undefined} // Only allow onChange if not read-only
         aria-label={question.prompt || "Short answer question input"}
       />
@@ -53,4 +58,4 @@ const ShortAnswerQuestion: React.FC<ShortAnswerQuestionProps> = ({
   );
 };
 
-export default ShortAnswerQuestion;
+export default React.memo(ShortAnswerQuestion);
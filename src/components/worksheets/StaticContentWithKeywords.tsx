@@ -1,93 +1,90 @@
 // src/components/worksheets/StaticContentWithKeywords.tsx
 "use client";
 
-import React from 'react';
+import React, { useMemo } from 'react';
 import KeywordTooltipWrapper from './KeywordTooltipWrapper';
-// For a more robust solution with complex HTML, consider:
-// import parse, { domToReact, HTMLReactParserOptions, Element } from 'html-react-parser';
+import type { CompiledHtml, CompiledHtmlNode } from './worksheetTypes';
+
+// Tree format version this component understands (COMPILED_HTML_VERSION in keyword_compiler.py).
+const SUPPORTED_COMPILED_HTML_VERSION = 1;
 
 interface StaticContentWithKeywordsProps {
   htmlContent: string;
   keywordsData: Record<string, string>; // e.g., { "cpu": "Central Processing Unit..." }
+  compiledHtml?: CompiledHtml; // Pre-tokenised htmlContent from the seeding pipeline
 }
 
-const StaticContentWithKeywords: React.FC<StaticContentWithKeywordsProps> = ({ htmlContent, keywordsData }) => {
-  if (!htmlContent || !keywordsData) {
-    return <div dangerouslySetInnerHTML={{ __html: htmlContent || "" }} />;
+const renderNodes = (nodes: CompiledHtmlNode[], keywordsData: Record<string, string>, keyPrefix: string): React.ReactNode[] =>
+  nodes.map((node, index) => renderNode(node, keywordsData, `${keyPrefix}${index}`));
+
+// Walks the compiled tree directly into React elements: no HTML parsing or regex work on the client,
+// and keywords keep whatever markup they were nested in (or contain).
+const renderNode = (node: CompiledHtmlNode, keywordsData: Record<string, string>, key: string): React.ReactNode => {
+  if (typeof node === "string") {
+    return node;
+  }
+  const children = node.c ? renderNodes(node.c, keywordsData, `${key}.`) : undefined;
+  if ("k" in node) {
+    const definition = keywordsData[node.k];
+    if (!definition) {
+      return <React.Fragment key={key}>{children}</React.Fragment>;
+    }
+    return (
+      <KeywordTooltipWrapper key={key} term={node.k} definition={definition}>
+        {children}
+      </KeywordTooltipWrapper>
+    );
   }
+  return React.createElement(node.t, { ...node.a, key }, children);
+};
 
+// Fallback for documents seeded before keyword compilation existed: the original regex split,
+// run once per content change rather than on every render.
+const splitKeywords = (htmlContent: string, keywordsData: Record<string, string>): React.ReactNode[] => {
   // Regex to find <keyword data-term="some-key">Displayed Text</keyword>
   // This is a simplified parser. It might break with nested HTML within the keyword tag.
   const keywordRegex = /<keyword data-term=["']([^"']+)["']>([^<]+)<\/keyword>/g;
-
-  const parts: (string | React.ReactNode)[] = [];
+  const parts: React.ReactNode[] = [];
   let lastIndex = 0;
   let match;
-
   while ((match = keywordRegex.exec(htmlContent)) !== null) {
-    const [fullMatch, termKey, displayedText] = match;
+    const [, termKey, displayedText] = match;
     const definition = keywordsData[termKey.toLowerCase()]; // Ensure keys are consistently cased
-
-    // Add the text before this match
     if (match.index > lastIndex) {
-      parts.push(htmlContent.substring(lastIndex, match.index));
-    }
-
-    // Add the keyword component or text if definition not found
-    if (definition) {
-      parts.push(
-        <KeywordTooltipWrapper key={`${termKey}-${match.index}`} term={displayedText} definition={definition} />
-      );
-    } else {
-      // If no definition, just render the text without tooltip functionality
-      // or you could log a warning.
-      console.warn(`StaticContentWithKeywords: No definition found for keyword key: ${termKey}`);
-      parts.push(displayedText);
+      parts.push(<span key={`html-${lastIndex}`} dangerouslySetInnerHTML={{ __html: htmlContent.substring(lastIndex, match.index) }} />);
     }
+    parts.push(
+      definition
+        ? <KeywordTooltipWrapper key={`${termKey}-${match.index}`} term={displayedText} definition={definition} />
+        : displayedText
+    );
     lastIndex = keywordRegex.lastIndex;
   }
-
-  // Add any remaining text after the last match
   if (lastIndex < htmlContent.length) {
-    parts.push(htmlContent.substring(lastIndex));
+    parts.push(<span key={`html-${lastIndex}`} dangerouslySetInnerHTML={{ __html: htmlContent.substring(lastIndex) }} />);
   }
+  return parts;
+};
 
-  // Render the parts. Need to wrap in a div that can handle mixed string/ReactNode array.
-  // We also need to handle the original HTML structure.
-  // A more robust solution uses html-react-parser with a replace function.
-
-  // Simplified rendering for now: join string parts and render React nodes.
-  // This will lose the original HTML structure around the keywords if not careful.
-  // For a quick solution, we can render the parts.
-  // A better approach is to use html-react-parser:
-  /*
-  const options: HTMLReactParserOptions = {
-    replace: domNode => {
-      if (domNode instanceof Element && domNode.name === 'keyword') {
-        const termKey = domNode.attribs['data-term'];
-        const displayedText = domNode.children.length > 0 && domNode.children[0].type === 'text' ? domNode.children[0].data : termKey;
-        const definition = keywordsData[termKey?.toLowerCase()];
-        if (definition) {
-          return <KeywordTooltipWrapper term={displayedText} definition={definition} />;
-        }
-        return <>{displayedText}</>; // Fallback if no definition
-      }
+const StaticContentWithKeywords: React.FC<StaticContentWithKeywordsProps> = ({ htmlContent, keywordsData, compiledHtml }) => {
+  const content = useMemo(() => {
+    if (!keywordsData) {
+      return null;
     }
-  };
-  return <div className="prose prose-sm sm:prose lg:prose-lg xl:prose-xl max-w-none text-gray-700">{parse(htmlContent, options)}</div>;
-  */
+    if (compiledHtml && compiledHtml.v === SUPPORTED_COMPILED_HTML_VERSION) {
+      return renderNodes(compiledHtml.nodes, keywordsData, "");
+    }
+    return htmlContent ? splitKeywords(htmlContent, keywordsData) : null;
+  }, [htmlContent, keywordsData, compiledHtml]);
+
+  if (!content) {
+    return <div dangerouslySetInnerHTML={{ __html: htmlContent || "" }} />;
+  }
 
-  // Current simplified approach: Render the processed parts.
-  // This will render strings directly and KeywordTooltipWrapper components.
-  // It might not perfectly preserve all HTML structure if keywords are inside complex tags.
-  // The `prose` class helps style the raw HTML parts.
+  // The `prose` class styles the rendered HTML elements.
   return (
     <div className="prose prose-sm sm:prose lg:prose-lg xl:prose-xl max-w-none text-gray-700">
-      {parts.map((part, index) => (
-        typeof part === "string" ? 
-        <span key={index} dangerouslySetInnerHTML={{ __html: part }} /> : 
-        part 
-      ))}
+      {content}
     </div>
   );
 };
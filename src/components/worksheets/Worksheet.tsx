@@ -1,10 +1,12 @@
 // src/components/worksheets/Worksheet.tsx
 'use client';
 
-import React from 'react';
+import React, { useEffect } from 'react';
 import type { Worksheet } from './worksheetTypes'; 
 import SectionComponent from './Section'; 
+import { preloadSectionTypes } from './sectionRegistry';
 import StaticContentBlock from './StaticContentBlock';
+import { RenderProfiler } from '@/utils/renderProfiler';
 
 
 interface WorksheetComponentProps {
@@ -12,8 +14,7 @@ interface WorksheetComponentProps {
   isLoading?: boolean;
   error?: string | null;
   isReadOnly?: boolean; // For overall worksheet read-only state
-  // Props for answer handling, to be passed down to section components
-  answers?: Record<string, string>;
+  // Answers live in the answer store (src/store/answerStore.ts); pass a stable handler for changes.
   onAnswerChange?: (questionId: string, answer: string) => void;
 }
 
@@ -22,9 +23,13 @@ const WorksheetComponent: React.FC<WorksheetComponentProps> = ({
   isLoading, 
   error, 
   isReadOnly = true, // Default to read-only
-  answers = {},
   onAnswerChange
 }) => {
+  // Fetch the code for the section types this worksheet uses (and only those) up front.
+  useEffect(() => {
+    preloadSectionTypes(worksheet?.sections);
+  }, [worksheet?.sections]);
+
   if (isLoading) {
     return <p className="text-center mt-10 p-4 text-gray-600">Loading worksheet...</p>;
   }
@@ -88,15 +93,15 @@ const WorksheetComponent: React.FC<WorksheetComponentProps> = ({
 
       {worksheet.sections && worksheet.sections.length > 0 ? (
         worksheet.sections.map((section) => (
-          <SectionComponent 
-            key={section.id} 
-            section={section} 
-            isReadOnly={isReadOnly}
-            answers={answers}
-            onAnswerChange={onAnswerChange}
-            // Pass keywordsData to each section
-            keywordsData={keywordsData} 
-          />
+          <RenderProfiler key={section.id} id={`section:${section.id}`}>
+            <SectionComponent 
+              section={section} 
+              isReadOnly={isReadOnly}
+              onAnswerChange={onAnswerChange}
+              // Pass keywordsData to each section
+              keywordsData={keywordsData} 
+            />
+          </RenderProfiler>
         ))
       ) : (
         <p className="text-gray-500">This worksheet has no sections defined.</p>
@@ -114,4 +119,4 @@ const WorksheetComponent: React.FC<WorksheetComponentProps> = ({
   );
 };
 
-export default WorksheetComponent;
+export default React.memo(WorksheetComponent);
@@ -0,0 +1,39 @@
+// src/components/worksheets/sectionAnswers.ts
+// The answers map is Record<string, string>, keyed by question id. Interactive sections keep their whole
+// answer under the section id as a JSON string, so it autosaves like any other answer and can be marked
+// server-side (functions/src/marking.ts, auto_marking.py):
+//   FillInTheBlanksInteractive -> {"blankId": "text", ...}
+//   OrderSequenceInteractive   -> ["itemId", ...] in the student's order
+//   MatchingPairsInteractive   -> [{"itemAId": "...", "itemBId": "..."}, ...]
+import type { StudentMatchPair } from './MatchingPairsInteractive';
+
+const parseSectionAnswer = (stored: string): unknown => {
+  if (!stored) {
+    return null;
+  }
+  try {
+    return JSON.parse(stored);
+  } catch {
+    return null;
+  }
+};
+
+export const encodeSectionAnswer = (answer: Record<string, string> | string[] | StudentMatchPair[]): string =>
+  JSON.stringify(answer);
+
+export const decodeBlankAnswers = (stored: string): Record<string, string> => {
+  const parsed = parseSectionAnswer(stored);
+  return parsed && typeof parsed === 'object' && !Array.isArray(parsed) ? (parsed as Record<string, string>) : {};
+};
+
+export const decodeOrderAnswer = (stored: string): string[] => {
+  const parsed = parseSectionAnswer(stored);
+  return Array.isArray(parsed) ? parsed.filter((id): id is string => typeof id === 'string') : [];
+};
+
+export const decodeMatchAnswer = (stored: string): StudentMatchPair[] => {
+  const parsed = parseSectionAnswer(stored);
+  return Array.isArray(parsed)
+    ? parsed.filter((pair): pair is StudentMatchPair => typeof pair?.itemAId === 'string' && typeof pair?.itemBId === 'string')
+    : [];
+};
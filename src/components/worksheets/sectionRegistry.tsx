@@ -0,0 +1,229 @@
+// src/components/worksheets/sectionRegistry.tsx
+'use client';
+
+import React, { useMemo } from 'react';
+import dynamic from 'next/dynamic';
+import type { Section } from './worksheetTypes';
+import type { StudentMatchPair } from './MatchingPairsInteractive';
+import { useAnswer, useAnswerStore } from '@/store/answerStore';
+import { decodeBlankAnswers, decodeMatchAnswer, decodeOrderAnswer, encodeSectionAnswer } from './sectionAnswers';
+// Plain HTML content appears on almost every worksheet and is tiny, so it stays in the main bundle.
+import StaticContentBlock from './StaticContentBlock';
+
+// Everything a section renderer may need; each renderer picks out its own props.
+export interface SectionRendererProps {
+  section: Section;
+  isReadOnly: boolean;
+  keywordsData?: Record<string, string>;
+  onAnswerChange?: (questionId: string, answer: string) => void;
+  // For DiagramLabelInteractive answers
+  diagramAnswers?: Record<string, Set<string>>;
+  onDiagramAnswerChange?: (sectionId: string, hotspotId: string, isRevealed: boolean) => void;
+  // For FillInTheBlanksInteractive answers for this specific section
+  fillInTheBlanksAnswers?: Record<string, string>;
+  onFillInTheBlanksAnswerChange?: (sectionId: string, blankId: string, value: string) => void;
+  // For Quiz answers (maps questionId to selectedOptionId)
+  quizAnswers?: Record<string, string | null>;
+  onQuizAnswerSelect?: (questionId: string, selectedOptionId: string) => void;
+  showQuizFeedback?: boolean;
+  // For OrderSequenceInteractive answers for this specific section
+  orderSequenceAnswers?: string[];
+  onOrderSequenceAnswerChange?: (sectionId: string, newOrderIds: string[]) => void;
+  // For MatchingPairsInteractive answers for this specific section
+  matchingPairsAnswers?: StudentMatchPair[];
+  onMatchingPairsAnswerChange?: (sectionId: string, newPairs: StudentMatchPair[]) => void;
+}
+
+interface SectionRegistryEntry {
+  // Starts downloading the renderer's code without rendering it.
+  preload: () => Promise<unknown>;
+  render: (props: SectionRendererProps) => React.ReactNode;
+}
+
+const SectionLoading = () => (
+  <div className="h-24 rounded-md bg-slate-100 animate-pulse" aria-hidden="true" />
+);
+
+// Each loader is its own chunk. The components below are built from the same loaders that `preload` calls,
+// so there is one import() per section type and webpack fetches each chunk once.
+const loaders = {
+  StaticContentWithKeywords: () => import('./StaticContentWithKeywords'),
+  KeywordGlossary: () => import('./KeywordGlossary'),
+  DiagramLabelInteractive: () => import('./DiagramLabelInteractive'),
+  FillInTheBlanksInteractive: () => import('./FillInTheBlanksInteractive'),
+  Quiz: () => import('./QuizSection'),
+  OrderSequenceInteractive: () => import('./OrderSequenceInteractive'),
+  MatchingPairsInteractive: () => import('./MatchingPairsInteractive'),
+  Questionnaire: () => import('./QuestionnaireSection'),
+};
+
+const StaticContentWithKeywords = dynamic(loaders.StaticContentWithKeywords, { loading: SectionLoading });
+const KeywordGlossary = dynamic(loaders.KeywordGlossary, { loading: SectionLoading });
+const DiagramLabelInteractive = dynamic(loaders.DiagramLabelInteractive, { loading: SectionLoading });
+const FillInTheBlanksInteractive = dynamic(loaders.FillInTheBlanksInteractive, { loading: SectionLoading });
+const QuizSection = dynamic(loaders.Quiz, { loading: SectionLoading });
+const OrderSequenceInteractive = dynamic(loaders.OrderSequenceInteractive, { loading: SectionLoading });
+const MatchingPairsInteractive = dynamic(loaders.MatchingPairsInteractive, { loading: SectionLoading });
+const QuestionnaireSection = dynamic(loaders.Questionnaire, { loading: SectionLoading });
+
+// Interactive sections read and write their answers through the answer store (encoded by sectionAnswers.ts)
+// unless the caller passes them explicitly, so they autosave and can be marked like every other answer.
+const StoredFillInTheBlanks = ({
+  section, isReadOnly, onAnswerChange, fillInTheBlanksAnswers, onFillInTheBlanksAnswerChange,
+}: SectionRendererProps) => {
+  const stored = useAnswer(section.id);
+  const sectionAnswers = useMemo(() => fillInTheBlanksAnswers ?? decodeBlankAnswers(stored), [fillInTheBlanksAnswers, stored]);
+  const handleChange = onFillInTheBlanksAnswerChange ?? (onAnswerChange
+    ? (sectionId: string, blankId: string, value: string) =>
+        onAnswerChange(sectionId, encodeSectionAnswer({ ...sectionAnswers, [blankId]: value }))
+    : undefined);
+  return (
+    <FillInTheBlanksInteractive
+      sectionId={section.id}
+      segments={section.segments}
+      isReadOnly={isReadOnly}
+      sectionAnswers={sectionAnswers}
+      onAnswerChange={handleChange}
+    />
+  );
+};
+
+const StoredQuiz = ({
+  section, isReadOnly, onAnswerChange, quizAnswers, onQuizAnswerSelect, showQuizFeedback,
+}: SectionRendererProps) => {
+  // One string per quiz, so the section only re-renders when one of its own answers changes.
+  const joined = useAnswerStore((state) =>
+    (section.questions || []).map((question) => state.answers[question.id] ?? '').join('\u0000'));
+  const storedAnswers = useMemo(() => {
+    const values = joined.split('\u0000');
+    return Object.fromEntries((section.questions || []).map((question, index) => [question.id, values[index] || null]));
+  }, [joined, section.questions]);
+  return (
+    <QuizSection
+      section={section}
+      isReadOnly={isReadOnly}
+      quizAnswers={quizAnswers ?? storedAnswers}
+      onQuizAnswerSelect={onQuizAnswerSelect ?? onAnswerChange}
+      showQuizFeedback={showQuizFeedback}
+    />
+  );
+};
+
+const StoredOrderSequence = ({
+  section, isReadOnly, onAnswerChange, orderSequenceAnswers, onOrderSequenceAnswerChange,
+}: SectionRendererProps) => {
+  const stored = useAnswer(section.id);
+  const studentOrder = useMemo(() => orderSequenceAnswers ?? decodeOrderAnswer(stored), [orderSequenceAnswers, stored]);
+  const handleChange = onOrderSequenceAnswerChange ?? (onAnswerChange
+    ? (sectionId: string, order: string[]) => onAnswerChange(sectionId, encodeSectionAnswer(order))
+    : () => {});
+  return (
+    <OrderSequenceInteractive
+      sectionId={section.id}
+      items={section.orderItems || []}
+      isReadOnly={isReadOnly}
+      studentOrder={studentOrder}
+      onOrderChange={handleChange}
+    />
+  );
+};
+
+const StoredMatchingPairs = ({
+  section, isReadOnly, onAnswerChange, matchingPairsAnswers, onMatchingPairsAnswerChange,
+}: SectionRendererProps) => {
+  const stored = useAnswer(section.id);
+  const studentPairs = useMemo(() => matchingPairsAnswers ?? decodeMatchAnswer(stored), [matchingPairsAnswers, stored]);
+  const handleChange = onMatchingPairsAnswerChange ?? (onAnswerChange
+    ? (sectionId: string, pairs: StudentMatchPair[]) => onAnswerChange(sectionId, encodeSectionAnswer(pairs))
+    : () => {});
+  return (
+    <MatchingPairsInteractive
+      sectionId={section.id}
+      setA={section.matchSetA || []}
+      setB={section.matchSetB || []}
+      isReadOnly={isReadOnly}
+      studentPairedIds={studentPairs}
+      onPairChange={handleChange}
+    />
+  );
+};
+
+export const SECTION_REGISTRY: Record<string, SectionRegistryEntry> = {
+  StaticContent: {
+    preload: () => Promise.resolve(),
+    render: ({ section }) => section.htmlContent ? <StaticContentBlock htmlContent={section.htmlContent} /> : null,
+  },
+  StaticContentWithKeywords: {
+    preload: loaders.StaticContentWithKeywords,
+    render: ({ section, keywordsData }) => section.htmlContent && keywordsData ? (
+      <StaticContentWithKeywords
+        htmlContent={section.htmlContent}
+        keywordsData={keywordsData}
+        compiledHtml={section.compiledHtml}
+      />
+    ) : null,
+  },
+  KeywordGlossary: {
+    preload: loaders.KeywordGlossary,
+    render: ({ section, keywordsData }) => section.termKeys && keywordsData ? (
+      <KeywordGlossary
+        introduction={section.introductionContent}
+        displayTermKeys={section.termKeys}
+        keywordsData={keywordsData}
+      />
+    ) : null,
+  },
+  DiagramLabelInteractive: {
+    preload: loaders.DiagramLabelInteractive,
+    render: ({ section, keywordsData, isReadOnly, diagramAnswers, onDiagramAnswerChange }) =>
+      section.diagramImageUrl && section.hotspots ? (
+        <DiagramLabelInteractive
+          sectionId={section.id}
+          diagramImageUrl={section.diagramImageUrl}
+          diagramImage={section.diagramImage}
+          diagramAltText={section.diagramAltText}
+          hotspots={section.hotspots}
+          keywordsData={keywordsData}
+          isReadOnly={isReadOnly}
+          answers={diagramAnswers}
+          onAnswerChange={onDiagramAnswerChange}
+        />
+      ) : null,
+  },
+  FillInTheBlanksInteractive: {
+    preload: loaders.FillInTheBlanksInteractive,
+    render: (props) => props.section.segments ? <StoredFillInTheBlanks {...props} /> : null,
+  },
+  Quiz: {
+    preload: loaders.Quiz,
+    render: (props) => props.section.questions && props.section.questions.length > 0 ? <StoredQuiz {...props} /> : null,
+  },
+  OrderSequenceInteractive: {
+    preload: loaders.OrderSequenceInteractive,
+    render: (props) => props.section.orderItems ? <StoredOrderSequence {...props} /> : null,
+  },
+  MatchingPairsInteractive: {
+    preload: loaders.MatchingPairsInteractive,
+    render: (props) => props.section.matchSetA && props.section.matchSetB ? <StoredMatchingPairs {...props} /> : null,
+  },
+  Questionnaire: {
+    preload: loaders.Questionnaire,
+    render: ({ section, isReadOnly, onAnswerChange }) => section.questions && section.questions.length > 0 ? (
+      <QuestionnaireSection section={section} isReadOnly={isReadOnly} onAnswerChange={onAnswerChange} />
+    ) : null,
+  },
+};
+
+export const getSectionRenderer = (sectionType: string): SectionRegistryEntry | undefined =>
+  Object.prototype.hasOwnProperty.call(SECTION_REGISTRY, sectionType) ? SECTION_REGISTRY[sectionType] : undefined;
+
+/**
+ * Starts loading the renderers for the section types a worksheet actually uses, so their chunks download
+ * in parallel with (rather than after) the first render. Types that aren't present are never fetched.
+ */
+export const preloadSectionTypes = (sections: Section[] | undefined) => {
+  const types = new Set((sections || []).map((section) => section.type));
+  types.forEach((type) => {
+    getSectionRenderer(type)?.preload().catch((err) => console.warn(`Failed to preload renderer for ${type}:`, err));
+  });
+};
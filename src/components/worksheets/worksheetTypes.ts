@@ -19,7 +19,10 @@ export interface Blank {
   id: string; // Unique ID for this blank within the section
   placeholder?: string; // Placeholder text for the input field
   size?: number; // Optional: suggested size for the input field (e.g., character width)
-  // correctAnswer?: string; // For potential future auto-grading, not used for rendering initially
+  // Answer key for auto-marking (functions/src/marking.ts, auto_marking.py); never shown while answering.
+  // Compared ignoring case and extra whitespace.
+  correctAnswer?: string;
+  acceptedAnswers?: string[]; // Other answers that also score the mark
 }
 
 // A segment can be a simple string (text) or a Blank object
@@ -34,6 +37,41 @@ export interface Hotspot {
   defaultRevealed?: boolean; // If the hotspot label should be visible by default
 }
 
+// Pre-tokenised HTML written by keyword_compiler.py at seed time (Firestore can't store nested arrays,
+// so nodes are strings or objects):
+//   text -> "string", element -> { t: tag, a?: props, c?: children }, keyword -> { k: termKey, c?: children }
+export interface CompiledHtmlElement {
+  t: string;
+  a?: Record<string, any>;
+  c?: CompiledHtmlNode[];
+}
+
+export interface CompiledHtmlKeyword {
+  k: string;
+  c?: CompiledHtmlNode[];
+}
+
+export type CompiledHtmlNode = string | CompiledHtmlElement | CompiledHtmlKeyword;
+
+export interface CompiledHtml {
+  v: number; // Format version
+  nodes: CompiledHtmlNode[];
+}
+
+// Responsive variants of a section image, recorded by image_pipeline.py at seed time.
+export interface DiagramImageSource {
+  type: string; // MIME type, e.g. "image/avif"
+  srcSet: string; // "url 320w, url 640w, ..."
+}
+
+export interface DiagramImage {
+  src: string; // The original image URL
+  width: number; // Intrinsic size, used to reserve layout space before the image loads
+  height: number;
+  blurDataURL: string; // Tiny inline placeholder shown while the image loads
+  sources: DiagramImageSource[]; // Most efficient format first
+}
+
 export interface Question {
   id: string;
   "ShortAnswer" | "StaticContent" | "MultipleChoiceQuestion" | string; // Allow other types for future
@@ -84,6 +122,7 @@ export interface Section {
   type: "Questionnaire" | "StaticContent" | "StaticContentWithKeywords" | "KeywordGlossary" | "DiagramLabelInteractive" | "FillInTheBlanksInteractive" | "Quiz" | "OrderSequenceInteractive" | "MatchingPairsInteractive" | string; // Allow other types
   questions?: Question[];
   htmlContent?: string; // Used by StaticContent question type
+  compiledHtml?: CompiledHtml; // htmlContent with keywords resolved; StaticContentWithKeywords only
 
   // Fields specific to MultipleChoiceQuestion
   options?: MultipleChoiceOption[];
@@ -100,6 +139,7 @@ export interface Section {
 
   // Fields specific to DiagramLabelInteractive
   diagramImageUrl?: string;
+  diagramImage?: DiagramImage; // Dimensions and variants of diagramImageUrl, when built
   diagramAltText?: string;
   hotspots?: Hotspot[];
 
@@ -108,10 +148,13 @@ export interface Section {
 
   // Fields for OrderSequenceInteractive
   orderItems?: OrderSequenceItem[];
+  correctOrderIds?: string[]; // Answer key: every orderItems id, in the correct order
 
   // Fields for MatchingPairsInteractive
   matchSetA?: MatchItem[]; 
   matchSetB?: MatchItem[]; // Array of text strings and Blank objects
+  // Answer key: { [matchSetA id]: matchSetB id }, or a list of pairs
+  correctPairs?: Record<string, string> | Array<{ itemAId: string; itemBId: string }>;
 
   // You might add other section-specific props here as needed for future types
   // For example, for DiagramLabelInteractive, FillInTheBlanksInteractive etc.
@@ -0,0 +1,76 @@
+// src/lib/courseTree.ts
+// The course -> unit -> worksheet tree behind the /gcse pages, generated from content/courses and the
+// worksheet library by static_export.py (course_tree.py), which the "prebuild" script runs before every
+// `next build`. Server-only: pages read it while they are statically generated, so navigating the hub
+// costs no Firestore queries and changes to the tree ship with the next build.
+import { promises as fs } from 'fs';
+import path from 'path';
+
+export const COURSE_TREE_PATH = path.join(process.cwd(), 'public', 'content', 'course-tree.json');
+
+export interface CourseResource {
+  name: string;
+  href: string;
+  icon?: 'users' | 'youtube' | 'file' | 'book';
+  external?: boolean;
+}
+
+export interface CourseWorksheet {
+  id: string;
+  title: string;
+  specReference?: string | null;
+  learningObjectives: string[];
+  sectionCount: number;
+}
+
+export interface CourseUnit {
+  slug: string;
+  number?: string | null;
+  title: string;
+  worksheets: CourseWorksheet[];
+}
+
+export interface CourseComponent {
+  id: string;
+  title: string;
+  units: CourseUnit[];
+}
+
+export interface Course {
+  slug: string;
+  title: string;
+  board?: string | null;
+  resources: CourseResource[];
+  components: CourseComponent[];
+}
+
+export interface CourseTree {
+  version: number;
+  courses: Course[];
+}
+
+/**
+ * Reads the generated tree. In development a missing tree is an empty one (run 'python admin.py export');
+ * a production build fails instead of deploying an empty hub whose unit pages all 404.
+ */
+export const loadCourseTree = async (): Promise<CourseTree> => {
+  try {
+    return JSON.parse(await fs.readFile(COURSE_TREE_PATH, 'utf-8')) as CourseTree;
+  } catch (error) {
+    if (process.env.NODE_ENV === 'production') {
+      throw new Error(`courseTree: Could not read ${COURSE_TREE_PATH}; the prebuild step (python admin.py export) must run first.`);
+    }
+    console.warn(`courseTree: Could not read ${COURSE_TREE_PATH} (run 'python admin.py export'):`, error);
+    return { version: 0, courses: [] };
+  }
+};
+
+export const findUnit = (
+  tree: CourseTree,
+  courseSlug: string,
+  unitSlug: string
+): { course: Course; unit: CourseUnit } | null => {
+  const course = tree.courses.find((c) => c.slug === courseSlug);
+  const unit = course?.components.flatMap((component) => component.units).find((u) => u.slug === unitSlug);
+  return course && unit ? { course, unit } : null;
+};
@@ -0,0 +1,185 @@
+// src/services/assignmentFeed.ts
+// Newest-first, paginated assignment lists for students.
+// - AssignmentInboxFeed reads the student's own users/{uid}/assignmentInbox subcollection, which the
+//   Cloud Functions keep in sync: one indexed query per page, however many classes there are.
+// - AssignmentFeed reads the class-wide assignments collection. Firestore allows at most 30 values per
+//   `in` filter, so class ids are split into chunks; each chunk is an ordered, limited query stream,
+//   the streams are fetched concurrently and k-way merged into pages. Used for inboxes that haven't
+//   been backfilled yet (see backfill_assignment_inbox.py).
+import {
+  collection,
+  getDocs,
+  limit,
+  orderBy,
+  query,
+  startAfter,
+  where,
+  QueryConstraint,
+  QueryDocumentSnapshot,
+  Timestamp,
+} from 'firebase/firestore';
+import { db } from '@/config/firebase';
+
+// Values per `in` filter. Each chunk query needs the assignments (classId ASC, assignedAt DESC)
+// index in firestore.indexes.json.
+export const ASSIGNMENT_CLASS_CHUNK_SIZE = 30;
+export const DEFAULT_ASSIGNMENT_PAGE_SIZE = 20;
+export const ASSIGNMENT_INBOX_COLLECTION = 'assignmentInbox';
+
+export interface AssignmentFeedItem {
+  id: string; // Firestore document ID of the assignment
+  worksheetId: string;
+  worksheetTitle: string;
+  classId: string;
+  className: string;
+  teacherId: string;
+  assignedAt: Date;
+}
+
+export interface AssignmentFeedStats {
+  queries: number; // Chunk queries issued
+  documentReads: number;
+}
+
+export interface AssignmentPager {
+  loadNextPage(): Promise<AssignmentFeedItem[]>;
+  hasMore(): boolean;
+  getStats(): AssignmentFeedStats;
+}
+
+interface ChunkStream {
+  classIds: string[];
+  buffer: AssignmentFeedItem[]; // Fetched but not yet merged, newest first
+  cursor: QueryDocumentSnapshot | null; // Last document fetched, for startAfter()
+  exhausted: boolean;
+}
+
+const toFeedItem = (docSnap: QueryDocumentSnapshot): AssignmentFeedItem => {
+  const data = docSnap.data();
+  return {
+    id: docSnap.id,
+    worksheetId: data.worksheetId,
+    worksheetTitle: data.worksheetTitle || "Untitled Worksheet",
+    classId: data.classId,
+    className: data.className || "Unknown Class",
+    teacherId: data.teacherId,
+    assignedAt: (data.assignedAt as Timestamp)?.toDate ? (data.assignedAt as Timestamp).toDate() : new Date(0),
+  };
+};
+
+// Same order as the queries: assignedAt descending, then document id descending (Firestore's implicit tie-break).
+const isNewer = (a: AssignmentFeedItem, b: AssignmentFeedItem): boolean =>
+  a.assignedAt.getTime() !== b.assignedAt.getTime()
+    ? a.assignedAt.getTime() > b.assignedAt.getTime()
+    : a.id > b.id;
+
+export class AssignmentFeed implements AssignmentPager {
+  private readonly pageSize: number;
+  private readonly streams: ChunkStream[];
+  private stats: AssignmentFeedStats = { queries: 0, documentReads: 0 };
+
+  constructor(classIds: string[], pageSize: number = DEFAULT_ASSIGNMENT_PAGE_SIZE) {
+    this.pageSize = pageSize;
+    const uniqueClassIds = Array.from(new Set(classIds.filter(Boolean)));
+    this.streams = [];
+    for (let i = 0; i < uniqueClassIds.length; i += ASSIGNMENT_CLASS_CHUNK_SIZE) {
+      this.streams.push({
+        classIds: uniqueClassIds.slice(i, i + ASSIGNMENT_CLASS_CHUNK_SIZE),
+        buffer: [],
+        cursor: null,
+        exhausted: false,
+      });
+    }
+  }
+
+  /** True while any chunk may still have assignments that haven't been returned. */
+  hasMore(): boolean {
+    return this.streams.some((stream) => stream.buffer.length > 0 || !stream.exhausted);
+  }
+
+  getStats(): AssignmentFeedStats {
+    return { ...this.stats };
+  }
+
+  /**
+   * Returns the next page, newest first. A stream is only queried when its buffer runs dry, and each
+   * query reads at most one page, so a page costs at most pageSize reads per chunk.
+   */
+  async loadNextPage(): Promise<AssignmentFeedItem[]> {
+    const page: AssignmentFeedItem[] = [];
+    while (page.length < this.pageSize) {
+      // The next item can't be chosen until every live stream has a head to compare.
+      await Promise.all(
+        this.streams.filter((stream) => stream.buffer.length === 0 && !stream.exhausted).map((stream) => this.fill(stream))
+      );
+      // k is the number of 30-class chunks (almost always 1 or 2), so a linear scan of the heads beats a heap.
+      let newest: ChunkStream | null = null;
+      for (const stream of this.streams) {
+        if (stream.buffer.length > 0 && (!newest || isNewer(stream.buffer[0], newest.buffer[0]))) {
+          newest = stream;
+        }
+      }
+      if (!newest) {
+        break;
+      }
+      page.push(newest.buffer.shift() as AssignmentFeedItem);
+    }
+    return page;
+  }
+
+  private async fill(stream: ChunkStream) {
+    const constraints: QueryConstraint[] = [
+      where('classId', 'in', stream.classIds),
+      orderBy('assignedAt', 'desc'),
+      ...(stream.cursor ? [startAfter(stream.cursor)] : []),
+      limit(this.pageSize),
+    ];
+    const snapshot = await getDocs(query(collection(db, 'assignments'), ...constraints));
+    this.stats.queries += 1;
+    this.stats.documentReads += snapshot.size;
+    stream.buffer.push(...snapshot.docs.map(toFeedItem));
+    stream.cursor = snapshot.docs.length > 0 ? snapshot.docs[snapshot.docs.length - 1] : stream.cursor;
+    stream.exhausted = snapshot.size < this.pageSize;
+  }
+}
+
+export class AssignmentInboxFeed implements AssignmentPager {
+  private readonly studentUid: string;
+  private readonly pageSize: number;
+  private cursor: QueryDocumentSnapshot | null = null;
+  private exhausted = false;
+  private stats: AssignmentFeedStats = { queries: 0, documentReads: 0 };
+
+  constructor(studentUid: string, pageSize: number = DEFAULT_ASSIGNMENT_PAGE_SIZE) {
+    this.studentUid = studentUid;
+    this.pageSize = pageSize;
+  }
+
+  hasMore(): boolean {
+    return !this.exhausted;
+  }
+
+  getStats(): AssignmentFeedStats {
+    return { ...this.stats };
+  }
+
+  /** Returns the next page, newest first. One extra document is read to know whether another page exists. */
+  async loadNextPage(): Promise<AssignmentFeedItem[]> {
+    if (this.exhausted) {
+      return [];
+    }
+    const constraints: QueryConstraint[] = [
+      orderBy('assignedAt', 'desc'),
+      ...(this.cursor ? [startAfter(this.cursor)] : []),
+      limit(this.pageSize + 1),
+    ];
+    const inboxRef = collection(db, 'users', this.studentUid, ASSIGNMENT_INBOX_COLLECTION);
+    const snapshot = await getDocs(query(inboxRef, ...constraints));
+    this.stats.queries += 1;
+    this.stats.documentReads += snapshot.size;
+    const pageDocs = snapshot.docs.slice(0, this.pageSize);
+    this.exhausted = snapshot.size <= this.pageSize;
+    this.cursor = pageDocs.length > 0 ? pageDocs[pageDocs.length - 1] : this.cursor;
+    return pageDocs.map(toFeedItem);
+  }
+}
@@ -0,0 +1,68 @@
+// src/services/authClaims.ts
+// Role, class membership and the password-reset flag travel in the ID token as custom claims, set by the
+// Cloud Functions (and user_claims.py for teachers) whenever they change. Reading them costs no Firestore
+// read; the profile document is only read for accounts that don't have claims yet.
+import { User as FirebaseUser } from 'firebase/auth';
+import { doc, getDoc } from 'firebase/firestore';
+import { auth, db } from '@/config/firebase';
+
+// Tokens older than this are refreshed when the tab regains focus, so claims changed by someone else
+// (a teacher adding or removing a student) apply within minutes instead of at the hourly token refresh.
+export const CLAIMS_MAX_AGE_MS = 5 * 60 * 1000;
+
+export interface ProfileClaims {
+  role: "teacher" | "student" | null;
+  passwordNeedsReset: boolean | null;
+  classIds?: string[]; // Students only
+}
+
+const readProfileDocument = async (uid: string): Promise<Record<string, any> | null> => {
+  const userDocSnap = await getDoc(doc(db, "users", uid));
+  return userDocSnap.exists() ? userDocSnap.data() : null;
+};
+
+/** Reads role, passwordNeedsReset and classIds from the user's current ID token. */
+export const readProfileClaims = async (user: FirebaseUser): Promise<ProfileClaims> => {
+  const { claims } = await user.getIdTokenResult();
+  const claimedRole = claims.role === "teacher" || claims.role === "student" ? claims.role : null;
+
+  if (!claimedRole) {
+    // Account created before claims existed (until `python admin.py user-claims --sync` has run).
+    const userData = await readProfileDocument(user.uid);
+    const role = userData?.role || null;
+    return {
+      role,
+      passwordNeedsReset: userData ? userData.passwordNeedsReset === true : null,
+      classIds: role === "student" ? userData?.classIds || [] : undefined,
+    };
+  }
+
+  let classIds: string[] | undefined;
+  if (claimedRole === "student") {
+    // Too many classes to fit in the token: the function sets classIdsOverflow instead.
+    classIds = claims.classIdsOverflow
+      ? (await readProfileDocument(user.uid))?.classIds || []
+      : (claims.classIds as string[] | undefined) || [];
+  }
+  return { role: claimedRole, passwordNeedsReset: claims.passwordNeedsReset === true, classIds };
+};
+
+/**
+ * Forces a token refresh so changed claims apply now. AuthProvider listens with onIdTokenChanged,
+ * so the profile in the store is rebuilt from the new token automatically.
+ */
+export const refreshClaims = async (): Promise<void> => {
+  await auth.currentUser?.getIdToken(true);
+};
+
+/** Refreshes the token if it is older than CLAIMS_MAX_AGE_MS. */
+export const refreshClaimsIfStale = async (): Promise<void> => {
+  const user = auth.currentUser;
+  if (!user) {
+    return;
+  }
+  const { issuedAtTime } = await user.getIdTokenResult();
+  if (Date.now() - new Date(issuedAtTime).getTime() > CLAIMS_MAX_AGE_MS) {
+    await user.getIdToken(true);
+  }
+};
@@ -1,5 +1,5 @@
 // Firestore Service Functions
-import { db } from '@/config/firebase';
+import { auth, db } from '@/config/firebase';
 import type { NewClassData, SchoolClass, StudentUser } from '@/types'; // Import necessary types
 
 // Added by create_class_management_files.py
@@ -11,8 +11,8 @@ import {
   getDocs,
   serverTimestamp,
   Timestamp,
-  doc, // Import doc
-  getDoc, // Import getDoc
+  documentId,
+  doc,
 } from 'firebase/firestore';
 
 const classesCollection = collection(db, 'classes');
@@ -58,6 +58,145 @@ export const getClassesForTeacher = async (
     throw new Error('Failed to fetch classes.');
   }
 };
+// --- Student progress ---
+// One document per (assignment, student) so a class autosaving at once writes to separate documents.
+// migrate_student_progress.py moves older studentProgress/{assignmentId} documents to this layout.
+export const STUDENT_PROGRESS_COLLECTION = 'studentProgress';
+
+export const studentProgressDocId = (assignmentId: string, studentId: string): string =>
+  `${assignmentId}_${studentId}`;
+
+export const studentProgressDocRef = (assignmentId: string, studentId: string) =>
+  doc(db, STUDENT_PROGRESS_COLLECTION, studentProgressDocId(assignmentId, studentId));
+
+// --- Student roster loader ---
+// Students are fetched with `documentId() in [...]` queries (Firestore allows 30 values per `in`),
+// concurrent requests for the same UID share one fetch, and results are kept in a session-level
+// LRU cache (a Map in least-recently-used order) so revisiting a class costs no reads.
+const ROSTER_QUERY_CHUNK_SIZE = 30;
+const ROSTER_CACHE_MAX_ENTRIES = 1000;
+const ROSTER_CACHE_TTL_MS = 5 * 60 * 1000;
+
+interface RosterCacheEntry {
+  student: StudentUser | null; // null caches "no such user" as well
+  expiresAt: number;
+}
+
+export interface RosterCacheStats {
+  hits: number; // UIDs served from the cache
+  inFlightHits: number; // UIDs that joined a fetch already in progress
+  misses: number; // UIDs that had to be fetched
+  queries: number; // Firestore queries issued
+  documentReads: number; // Documents returned by those queries
+}
+
+// Entries are keyed by teacher and student UID: what a teacher may read depends on who is signed in, so a
+// profile cached for one teacher is never served after an account switch.
+const rosterCache = new Map<string, RosterCacheEntry>();
+const inFlightStudents = new Map<string, Promise<StudentUser | null>>();
+const rosterCacheStats: RosterCacheStats = { hits: 0, inFlightHits: 0, misses: 0, queries: 0, documentReads: 0 };
+
+const toStudentUser = (uid: string, data: Record<string, any>): StudentUser => ({
+  uid,
+  username: data.username,
+  role: data.role, // Assuming role is stored
+  classIds: data.classIds || [], // Assuming classIds are stored
+} as StudentUser);
+
+const rosterCacheKey = (teacherUid: string, studentUid: string) => `${teacherUid}:${studentUid}`;
+
+const cacheStudent = (key: string, student: StudentUser | null) => {
+  rosterCache.delete(key);
+  rosterCache.set(key, { student, expiresAt: Date.now() + ROSTER_CACHE_TTL_MS });
+  while (rosterCache.size > ROSTER_CACHE_MAX_ENTRIES) {
+    rosterCache.delete(rosterCache.keys().next().value as string);
+  }
+};
+
+// The security rules only let a teacher read profiles whose teacherIds include them, and a query is only
+// allowed if it filters on that; profiles of other teachers' students come back as missing.
+const fetchStudentChunk = async (teacherUid: string, uids: string[]): Promise<Map<string, StudentUser>> => {
+  const snapshot = await getDocs(query(
+    collection(db, 'users'),
+    where('teacherIds', 'array-contains', teacherUid),
+    where(documentId(), 'in', uids)
+  ));
+  rosterCacheStats.queries += 1;
+  rosterCacheStats.documentReads += snapshot.size;
+  const students = new Map<string, StudentUser>();
+  snapshot.forEach((docSnap) => students.set(docSnap.id, toStudentUser(docSnap.id, docSnap.data())));
+  return students;
+};
+
+/**
+ * Loads user profiles by UID, returning a map with null for UIDs that have no profile.
+ * Only UIDs that are neither cached nor already being fetched hit Firestore.
+ */
+export const loadStudentsByUid = async (
+  studentUids: string[]
+): Promise<Map<string, StudentUser | null>> => {
+  const uniqueUids = Array.from(new Set(studentUids));
+  const teacherUid = auth.currentUser?.uid ?? '';
+  const now = Date.now();
+  const pending = new Map<string, Promise<StudentUser | null>>();
+  const toFetch: string[] = [];
+
+  uniqueUids.forEach((uid) => {
+    const key = rosterCacheKey(teacherUid, uid);
+    const cached = rosterCache.get(key);
+    if (cached && cached.expiresAt > now) {
+      rosterCacheStats.hits += 1;
+      rosterCache.delete(key); // Re-insert to mark as most recently used
+      rosterCache.set(key, cached);
+      pending.set(uid, Promise.resolve(cached.student));
+      return;
+    }
+    const inFlight = inFlightStudents.get(key);
+    if (inFlight) {
+      rosterCacheStats.inFlightHits += 1;
+      pending.set(uid, inFlight);
+      return;
+    }
+    rosterCacheStats.misses += 1;
+    toFetch.push(uid);
+  });
+
+  for (let i = 0; i < toFetch.length; i += ROSTER_QUERY_CHUNK_SIZE) {
+    const chunk = toFetch.slice(i, i + ROSTER_QUERY_CHUNK_SIZE);
+    const chunkPromise = fetchStudentChunk(teacherUid, chunk);
+    chunk.forEach((uid) => {
+      const key = rosterCacheKey(teacherUid, uid);
+      const studentPromise = chunkPromise
+        .then((students) => {
+          const student = students.get(uid) ?? null;
+          cacheStudent(key, student);
+          return student;
+        })
+        .finally(() => inFlightStudents.delete(key));
+      inFlightStudents.set(key, studentPromise);
+      pending.set(uid, studentPromise);
+    });
+  }
+
+  const students = await Promise.all(uniqueUids.map((uid) => pending.get(uid) as Promise<StudentUser | null>));
+  return new Map(uniqueUids.map((uid, index) => [uid, students[index]]));
+};
+
+/** Drops cached profiles (all of them if no UIDs are given) so the next load re-reads them. */
+export const invalidateStudentCache = (studentUids?: string[]) => {
+  if (!studentUids) {
+    rosterCache.clear();
+    return;
+  }
+  const dropped = new Set(studentUids);
+  Array.from(rosterCache.keys()).forEach((key) => {
+    if (dropped.has(key.slice(key.indexOf(':') + 1))) rosterCache.delete(key);
+  });
+};
+
+/** Returns a snapshot of the roster cache counters, e.g. to compare reads saved against misses. */
+export const getRosterCacheStats = (): RosterCacheStats => ({ ...rosterCacheStats });
+
 // Added by update_class_details_for_usernames.py
 export const getStudentDetailsBatch = async (
   studentUids: string[]
@@ -66,25 +205,14 @@ export const getStudentDetailsBatch = async (
     return [];
   }
 
-  const userPromises = studentUids.map(uid => {
-    const userDocRef = doc(db, 'users', uid);
-    return getDoc(userDocRef); // Use getDoc directly
-  });
-
   try {
-    const userDocSnaps = await Promise.all(userPromises);
+    const studentsByUid = await loadStudentsByUid(studentUids);
     const studentDetails: StudentUser[] = [];
-    userDocSnaps.forEach(docSnap => {
-      if (docSnap.exists()) {
-        const data = docSnap.data();
-        studentDetails.push({
-          uid: docSnap.id,
-          username: data.username,
-          role: data.role, // Assuming role is stored
-          classIds: data.classIds || [], // Assuming classIds are stored
-        } as StudentUser); // Use type assertion if data structure is guaranteed
+    studentsByUid.forEach((student, uid) => {
+      if (student) {
+        studentDetails.push(student);
       } else {
-        console.warn(`Student document with UID ${docSnap.id} not found.`);
+        console.warn(`Student document with UID ${uid} not found.`);
       }
     });
     return studentDetails;
@@ -92,4 +220,4 @@ export const getStudentDetailsBatch = async (
     console.error("Error fetching student details batch:", error);
     throw new Error("Failed to fetch student details.");
   }
-};
\ No newline at end of file
+};
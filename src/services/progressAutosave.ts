@@ -0,0 +1,189 @@
+// src/services/progressAutosave.ts
+// Delta autosave for student progress documents: only answers that changed since the last save are
+// written (as `answers.<questionId>` field paths), and bursts of edits are coalesced into at most one
+// write per interval.
+import {
+  DocumentReference,
+  FieldPath,
+  serverTimestamp,
+  setDoc,
+  updateDoc,
+} from 'firebase/firestore';
+
+export const DEFAULT_AUTOSAVE_INTERVAL_MS = 2500;
+
+export interface AutosaveStatus {
+  isSaving: boolean;
+  hasUnsavedChanges: boolean;
+  lastSaved: Date | null;
+  error: string | null;
+}
+
+export interface AutosaveStats {
+  saves: number;
+  failedSaves: number;
+  answersWritten: number; // Question answers sent across all saves
+  bytesWritten: number; // Approximate payload size across all saves
+  lastSaveBytes: number;
+  lastLatencyMs: number;
+  maxLatencyMs: number;
+  totalLatencyMs: number;
+}
+
+interface ProgressAutosaverOptions {
+  // Fields written alongside the answers the first time the document is created.
+  baseFields: Record<string, unknown>;
+  intervalMs?: number;
+  onStatusChange?: (status: AutosaveStatus) => void;
+}
+
+const textEncoder = new TextEncoder();
+
+const estimateFieldBytes = (questionId: string, answer: string): number =>
+  textEncoder.encode(`answers.${questionId}`).length + textEncoder.encode(answer).length;
+
+export class ProgressAutosaver {
+  private readonly docRef: DocumentReference;
+  private readonly baseFields: Record<string, unknown>;
+  private readonly intervalMs: number;
+  private readonly onStatusChange?: (status: AutosaveStatus) => void;
+
+  private dirty = new Map<string, string>();
+  private timer: ReturnType<typeof setTimeout> | null = null;
+  private inFlight: Promise<boolean> | null = null; // Resolves to whether the write succeeded
+  private documentExists = false;
+  private status: AutosaveStatus = { isSaving: false, hasUnsavedChanges: false, lastSaved: null, error: null };
+  private stats: AutosaveStats = {
+    saves: 0, failedSaves: 0, answersWritten: 0, bytesWritten: 0,
+    lastSaveBytes: 0, lastLatencyMs: 0, maxLatencyMs: 0, totalLatencyMs: 0,
+  };
+
+  constructor(docRef: DocumentReference, options: ProgressAutosaverOptions) {
+    this.docRef = docRef;
+    this.baseFields = options.baseFields;
+    this.intervalMs = options.intervalMs ?? DEFAULT_AUTOSAVE_INTERVAL_MS;
+    this.onStatusChange = options.onStatusChange;
+  }
+
+  /** Call once the existing progress document has been loaded, so saves can go straight to updateDoc. */
+  setDocumentExists(exists: boolean) {
+    this.documentExists = exists;
+  }
+
+  /** Records a changed answer and schedules a save if one isn't already pending. */
+  markDirty(questionId: string, answer: string) {
+    this.dirty.set(questionId, answer);
+    this.setStatus({ hasUnsavedChanges: true });
+    if (!this.timer) {
+      this.timer = setTimeout(() => {
+        this.timer = null;
+        void this.flush();
+      }, this.intervalMs);
+    }
+  }
+
+  /**
+   * Writes every pending answer now. Resolves once nothing is pending and no write is in flight, including
+   * writes started by concurrent flushes, or as soon as a write fails (its answers stay pending for the next try).
+   */
+  async flush(): Promise<void> {
+    if (this.timer) {
+      clearTimeout(this.timer);
+      this.timer = null;
+    }
+    while (this.inFlight || this.dirty.size > 0) {
+      if (!this.inFlight) {
+        const pending = this.dirty;
+        this.dirty = new Map();
+        this.inFlight = this.write(pending).finally(() => {
+          this.inFlight = null;
+        });
+      }
+      if (!(await this.inFlight)) {
+        return;
+      }
+    }
+  }
+
+  /** Flushes when the tab is hidden or the page is being unloaded. Returns a function that removes the listeners. */
+  attachLifecycleListeners(): () => void {
+    const handleVisibilityChange = () => {
+      if (document.visibilityState === 'hidden') {
+        void this.flush();
+      }
+    };
+    const handlePageHide = () => {
+      void this.flush();
+    };
+    document.addEventListener('visibilitychange', handleVisibilityChange);
+    window.addEventListener('pagehide', handlePageHide);
+    return () => {
+      document.removeEventListener('visibilitychange', handleVisibilityChange);
+      window.removeEventListener('pagehide', handlePageHide);
+    };
+  }
+
+  getStatus(): AutosaveStatus {
+    return { ...this.status };
+  }
+
+  getStats(): AutosaveStats {
+    return { ...this.stats };
+  }
+
+  private async write(pending: Map<string, string>): Promise<boolean> {
+    this.setStatus({ isSaving: true, error: null });
+    const startedAt = performance.now();
+    let bytes = 0;
+    pending.forEach((answer, questionId) => {
+      bytes += estimateFieldBytes(questionId, answer);
+    });
+
+    try {
+      if (this.documentExists) {
+        // FieldPath keeps question ids containing dots from being read as nested paths.
+        const fieldsAndValues: unknown[] = [];
+        pending.forEach((answer, questionId) => fieldsAndValues.push(new FieldPath('answers', questionId), answer));
+        await updateDoc(this.docRef, 'lastUpdated', serverTimestamp(), ...fieldsAndValues);
+      } else {
+        // First save: create the document. merge keeps any answers saved from another tab.
+        await setDoc(
+          this.docRef,
+          { ...this.baseFields, answers: Object.fromEntries(pending), lastUpdated: serverTimestamp() },
+          { merge: true }
+        );
+        this.documentExists = true;
+      }
+
+      const latency = performance.now() - startedAt;
+      this.stats.saves += 1;
+      this.stats.answersWritten += pending.size;
+      this.stats.bytesWritten += bytes;
+      this.stats.lastSaveBytes = bytes;
+      this.stats.lastLatencyMs = latency;
+      this.stats.totalLatencyMs += latency;
+      this.stats.maxLatencyMs = Math.max(this.stats.maxLatencyMs, latency);
+      this.setStatus({ isSaving: false, lastSaved: new Date(), hasUnsavedChanges: this.dirty.size > 0 });
+      return true;
+    } catch (err: any) {
+      // Put the answers back unless they have been edited again since, and retry on the next change or flush.
+      pending.forEach((answer, questionId) => {
+        if (!this.dirty.has(questionId)) {
+          this.dirty.set(questionId, answer);
+        }
+      });
+      if (err?.code === 'not-found') {
+        this.documentExists = false;
+      }
+      this.stats.failedSaves += 1;
+      console.error("ProgressAutosaver: Error saving progress:", err);
+      this.setStatus({ isSaving: false, hasUnsavedChanges: true, error: err?.message || "Unknown error" });
+      return false;
+    }
+  }
+
+  private setStatus(update: Partial<AutosaveStatus>) {
+    this.status = { ...this.status, ...update };
+    this.onStatusChange?.({ ...this.status });
+  }
+}
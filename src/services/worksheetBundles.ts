@@ -0,0 +1,93 @@
+// src/services/worksheetBundles.ts
+// Worksheets are read-only, so static_export.py publishes each one as an immutable JSON bundle named
+// after its content hash (served with a one-year Cache-Control, see next.config.ts). Pages resolve a
+// worksheet through the small manifest and fetch its bundle from the CDN instead of reading the full
+// document, so viewing a worksheet costs no Firestore reads.
+// The manifest is authoritative for what students see: the "prebuild" script exports it from the content
+// library before every build, the same library seed_worksheets.py writes to Firestore, so each deploy
+// publishes the bundles for the content it was built from. Firestore is only read for worksheets missing
+// from the manifest (added since the last build) or whose bundle can't be fetched.
+import { doc, getDoc } from 'firebase/firestore';
+import { db } from '@/config/firebase';
+import type { Worksheet } from '@/components/worksheets/worksheetTypes';
+
+export const WORKSHEET_MANIFEST_URL = '/content/worksheet-manifest.json';
+
+// The manifest is revalidated by the browser every minute anyway; this just avoids refetching it per page.
+const MANIFEST_MAX_AGE_MS = 60 * 1000;
+
+interface WorksheetManifestEntry {
+  url: string;
+  contentHash: string;
+  bytes: number;
+}
+
+interface WorksheetManifest {
+  version: number;
+  worksheets: Record<string, WorksheetManifestEntry>;
+}
+
+export interface LoadedWorksheet {
+  worksheet: Worksheet;
+  source: 'bundle' | 'firestore';
+}
+
+let manifestRequest: { promise: Promise<WorksheetManifest | null>; fetchedAt: number } | null = null;
+// Bundles never change, so one download per URL per session is enough.
+const bundleRequests = new Map<string, Promise<Worksheet | null>>();
+
+const fetchJson = async <T>(url: string, init?: RequestInit): Promise<T | null> => {
+  try {
+    const response = await fetch(url, init);
+    return response.ok ? ((await response.json()) as T) : null;
+  } catch (error) {
+    console.warn(`worksheetBundles: Could not fetch ${url}:`, error);
+    return null;
+  }
+};
+
+const loadManifest = (): Promise<WorksheetManifest | null> => {
+  if (!manifestRequest || Date.now() - manifestRequest.fetchedAt > MANIFEST_MAX_AGE_MS) {
+    manifestRequest = {
+      promise: fetchJson<WorksheetManifest>(WORKSHEET_MANIFEST_URL, { cache: 'no-cache' }),
+      fetchedAt: Date.now(),
+    };
+  }
+  return manifestRequest.promise;
+};
+
+const loadBundle = (url: string): Promise<Worksheet | null> => {
+  let request = bundleRequests.get(url);
+  if (!request) {
+    request = fetchJson<Worksheet>(url);
+    bundleRequests.set(url, request);
+    // A failed download (e.g. a bundle pruned by a newer export) shouldn't stick for the session.
+    request.then((bundle) => {
+      if (!bundle) {
+        bundleRequests.delete(url);
+      }
+    });
+  }
+  return request;
+};
+
+/**
+ * Loads a worksheet from its static bundle, falling back to Firestore only when it isn't in the manifest
+ * or the bundle can't be fetched. Returns null if the worksheet doesn't exist.
+ */
+export const loadWorksheet = async (worksheetId: string): Promise<LoadedWorksheet | null> => {
+  const manifest = await loadManifest();
+  const entry = manifest?.worksheets?.[worksheetId];
+  if (entry) {
+    const bundle = await loadBundle(entry.url);
+    if (bundle) {
+      return { worksheet: { ...bundle, id: worksheetId }, source: 'bundle' };
+    }
+  }
+
+  const worksheetDocSnap = await getDoc(doc(db, "worksheets", worksheetId));
+  if (!worksheetDocSnap.exists()) {
+    return null;
+  }
+  return { worksheet: { ...(worksheetDocSnap.data() as Worksheet), id: worksheetDocSnap.id }, source: 'firestore' };
+};
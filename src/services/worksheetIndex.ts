@@ -0,0 +1,85 @@
+// src/services/worksheetIndex.ts
+// Worksheet lists read worksheetIndex/{worksheetId}: a summary of each worksheet (title, course, unit,
+// keywords, section counts) written by seed_worksheets.py in the same batch as the worksheet itself.
+// A page costs pageSize + 1 small document reads, however large the library or its worksheets grow.
+import {
+  collection,
+  getDocs,
+  limit,
+  orderBy,
+  query,
+  startAfter,
+  QueryConstraint,
+  QueryDocumentSnapshot,
+} from 'firebase/firestore';
+import { db } from '@/config/firebase';
+
+export const WORKSHEET_INDEX_COLLECTION = 'worksheetIndex';
+export const DEFAULT_LIBRARY_PAGE_SIZE = 24;
+
+export interface WorksheetIndexEntry {
+  id: string; // Worksheet document ID
+  title: string;
+  course?: string;
+  unit?: string;
+  courseSlug?: string;
+  unitSlug?: string;
+  unitNumber?: string; // Specification unit, e.g. "1.2"
+  specReference?: string;
+  learningObjectives: string[];
+  keywords: string[];
+  sectionCount: number;
+  sectionTypeCounts: Record<string, number>;
+  contentHash?: string;
+}
+
+const toIndexEntry = (docSnap: QueryDocumentSnapshot): WorksheetIndexEntry => {
+  const data = docSnap.data();
+  return {
+    id: docSnap.id,
+    title: data.title || "Untitled Worksheet",
+    course: data.course || undefined,
+    unit: data.unit || undefined,
+    courseSlug: data.courseSlug || undefined,
+    unitSlug: data.unitSlug || undefined,
+    unitNumber: data.unitNumber || undefined,
+    specReference: data.specReference || undefined,
+    learningObjectives: data.learningObjectives || [],
+    keywords: data.keywords || [],
+    sectionCount: data.sectionCount || 0,
+    sectionTypeCounts: data.sectionTypeCounts || {},
+    contentHash: data.contentHash,
+  };
+};
+
+/** Pages through the whole library by title with a startAfter cursor. */
+export class WorksheetIndexPager {
+  private readonly pageSize: number;
+  private cursor: QueryDocumentSnapshot | null = null;
+  private exhausted = false;
+
+  constructor(pageSize: number = DEFAULT_LIBRARY_PAGE_SIZE) {
+    this.pageSize = pageSize;
+  }
+
+  hasMore(): boolean {
+    return !this.exhausted;
+  }
+
+  /** Returns the next page in title order. One extra document is read to know whether another page exists. */
+  async loadNextPage(): Promise<WorksheetIndexEntry[]> {
+    if (this.exhausted) {
+      return [];
+    }
+    const constraints: QueryConstraint[] = [
+      orderBy('title'),
+      ...(this.cursor ? [startAfter(this.cursor)] : []),
+      limit(this.pageSize + 1),
+    ];
+    const snapshot = await getDocs(query(collection(db, WORKSHEET_INDEX_COLLECTION), ...constraints));
+    const pageDocs = snapshot.docs.slice(0, this.pageSize);
+    this.exhausted = snapshot.size <= this.pageSize;
+    this.cursor = pageDocs.length > 0 ? pageDocs[pageDocs.length - 1] : this.cursor;
+    return pageDocs.map(toIndexEntry);
+  }
+}
@@ -0,0 +1,27 @@
+// src/store/answerStore.ts
+import { create } from "zustand";
+
+// Student answers for the worksheet currently open, keyed by question id.
+// Components subscribe to a single answer with useAnswer(), so typing in one question only
+// re-renders that question instead of every section of the worksheet.
+interface AnswerState {
+  answers: Record<string, string>;
+  setAnswer: (questionId: string, answer: string) => void;
+  replaceAnswers: (answers: Record<string, string>) => void; // e.g. when saved progress is loaded
+  clearAnswers: () => void;
+}
+
+export const useAnswerStore = create<AnswerState>((set) => ({
+  answers: {},
+  setAnswer: (questionId, answer) =>
+    set((state) => (state.answers[questionId] === answer ? state : { answers: { ...state.answers, [questionId]: answer } })),
+  replaceAnswers: (answers) => set({ answers }),
+  clearAnswers: () => set({ answers: {} }),
+}));
+
+// Per-question selector: re-renders the caller only when this question's answer changes.
+export const useAnswer = (questionId: string): string =>
+  useAnswerStore((state) => state.answers[questionId] ?? "");
+
+export const useHasAnswers = (): boolean =>
+  useAnswerStore((state) => Object.keys(state.answers).length > 0);
@@ -0,0 +1,51 @@
+// src/utils/renderProfiler.tsx
+'use client';
+
+import React, { Profiler, type ProfilerOnRenderCallback } from 'react';
+
+// Counts commits (and time spent rendering) per wrapped subtree. Enabled in development, or in a
+// production build with NEXT_PUBLIC_RENDER_PROFILER=1 (React only reports timings in profiling builds).
+// In the browser console: __worksheetRenderStats.print() / __worksheetRenderStats.reset()
+export const RENDER_PROFILER_ENABLED =
+  process.env.NODE_ENV === 'development' || process.env.NEXT_PUBLIC_RENDER_PROFILER === '1';
+
+export interface RenderStats {
+  renders: number;
+  totalMs: number;
+  lastMs: number;
+}
+
+const renderStats = new Map<string, RenderStats>();
+
+const recordRender: ProfilerOnRenderCallback = (id, _phase, actualDuration) => {
+  const stats = renderStats.get(id) ?? { renders: 0, totalMs: 0, lastMs: 0 };
+  stats.renders += 1;
+  stats.totalMs += actualDuration;
+  stats.lastMs = actualDuration;
+  renderStats.set(id, stats);
+};
+
+export const getRenderStats = (): Record<string, RenderStats> =>
+  Object.fromEntries(Array.from(renderStats.entries()).map(([id, stats]) => [id, { ...stats }]));
+
+export const resetRenderStats = () => renderStats.clear();
+
+export const printRenderStats = () => console.table(getRenderStats());
+
+if (RENDER_PROFILER_ENABLED && typeof window !== 'undefined') {
+  (window as any).__worksheetRenderStats = { get: getRenderStats, reset: resetRenderStats, print: printRenderStats };
+}
+
+interface RenderProfilerProps {
+  id: string;
+  children: React.ReactNode;
+}
+
+export const RenderProfiler: React.FC<RenderProfilerProps> = ({ id, children }) =>
+  RENDER_PROFILER_ENABLED ? (
+    <Profiler id={id} onRender={recordRender}>
+      {children}
+    </Profiler>
+  ) : (
+    <>{children}</>
+  );
@@ -0,0 +1,220 @@
+import argparse
+import json
+import os
+import sys
+import time
+import admin_session
+import course_tree
+from content_hash import VOLATILE_FIELDS, stamp_hashes
+from seed_worksheets import WORKSHEETS_COLLECTION, prepare_definitions
+from worksheet_content import CONTENT_DIR, load_worksheet_library
+
+# --- Configuration ---
+# The content library (content/worksheets plus content/section_updates, see worksheet_content.py) is the
+# source of truth. seed_worksheets.py writes it to Firestore and this script exports it, through the same
+# prepare_definitions(), so a worksheet's bundle and document carry the same contentHash. The bundles are
+# what students see (src/services/worksheetBundles.ts reads no Firestore document for an exported
+# worksheet), so package.json's "prebuild" runs this before every build; --check reports whether the
+# manifest on disk is behind the library.
+# Bundles are named after their content hash and never change once written, so next.config.ts serves
+# everything under BUNDLE_DIR as immutable. Only the manifest is revalidated.
+BUNDLE_DIR = "public/content/worksheets"
+MANIFEST_PATH = "public/content/worksheet-manifest.json"
+# Where Next.js serves BUNDLE_DIR from. Matches the paths in next.config.ts and src/services/worksheetBundles.ts.
+BUNDLE_URL_PREFIX = "/content/worksheets"
+
+# Bump whenever the bundle format changes; it is part of every file name, so old bundles are never reused.
+EXPORT_VERSION = 1
+
+# Characters of the content hash kept in file names: 64 bits is plenty for one library.
+HASH_PREFIX_LENGTH = 16
+
+
+def bundle_data(worksheet_data):
+    """The exported worksheet: every content field plus contentHash, without write timestamps."""
+    stamped = stamp_hashes(worksheet_data)
+    bundle = {key: value for key, value in stamped.items() if key not in VOLATILE_FIELDS}
+    bundle["contentHash"] = stamped["contentHash"]
+    return bundle
+
+
+def bundle_file_name(doc_id, content_hash):
+    """'{doc_id}.v{EXPORT_VERSION}.{hash prefix}.json'"""
+    return f"{doc_id}.v{EXPORT_VERSION}.{content_hash[:HASH_PREFIX_LENGTH]}.json"
+
+
+def serialise_bundle(bundle):
+    """Compact, stable JSON (bundles are fetched by every student, so no indentation)."""
+    return json.dumps(bundle, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def library_definitions(content_dir=CONTENT_DIR):
+    """
+    Compiles the content library exactly as seed_worksheets.py seeds it (see prepare_definitions), so a
+    bundle's contentHash matches the Firestore document. Returns ([(doc_id, worksheet_data)], skipped_doc_ids).
+    """
+    library = load_worksheet_library(content_dir)
+    loaded = [(e["doc_id"], e["data"]) for e in library if not e["errors"]]
+    definitions, invalid_ids = prepare_definitions(loaded, skip_invalid=True, verbose=False)
+    return definitions, sorted(set(invalid_ids) | {e["doc_id"] for e in library if e["errors"]})
+
+
+def firestore_definitions(db_client, collection_name=WORKSHEETS_COLLECTION):
+    """Returns [(doc_id, worksheet_data)] for every worksheet in Firestore, however it was written."""
+    return [(snapshot.id, snapshot.to_dict() or {}) for snapshot in db_client.collection(collection_name).stream()]
+
+
+def write_file_atomic(path, text):
+    """Writes text to path via a temporary file, so a half-written file is never served."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(temp_path, path)
+
+
+def export_bundles(definitions, bundle_dir=BUNDLE_DIR, manifest_path=MANIFEST_PATH, prune=True):
+    """
+    Writes a content-addressed bundle per worksheet (skipping bundles that already exist) and then the
+    manifest mapping each worksheet id to its current bundle. Returns a JSON-serialisable report.
+    """
+    start = time.perf_counter()
+    worksheets = {}
+    written = 0
+    total_bytes = 0
+    for doc_id, worksheet_data in sorted(definitions, key=lambda d: d[0]):
+        bundle = bundle_data(worksheet_data)
+        file_name = bundle_file_name(doc_id, bundle["contentHash"])
+        path = os.path.join(bundle_dir, file_name)
+        text = serialise_bundle(bundle)
+        if not os.path.isfile(path):
+            write_file_atomic(path, text)
+            written += 1
+        size = len(text.encode("utf-8"))
+        total_bytes += size
+        worksheets[doc_id] = {
+            "url": f"{BUNDLE_URL_PREFIX}/{file_name}",
+            "contentHash": bundle["contentHash"],
+            "bytes": size,
+        }
+
+    # The manifest goes last: until it is replaced, clients keep resolving to bundles that still exist.
+    write_file_atomic(manifest_path, json.dumps({"version": EXPORT_VERSION, "worksheets": worksheets},
+                                                indent=2, sort_keys=True) + "\n")
+
+    removed = 0
+    if prune:
+        keep = {os.path.basename(entry["url"]) for entry in worksheets.values()}
+        for file_name in os.listdir(bundle_dir) if os.path.isdir(bundle_dir) else []:
+            if file_name.endswith(".json") and file_name not in keep:
+                os.remove(os.path.join(bundle_dir, file_name))
+                removed += 1
+
+    return {
+        "worksheets": len(worksheets),
+        "written": written,
+        "unchanged": len(worksheets) - written,
+        "removedFiles": removed,
+        "bytes": total_bytes,
+        "elapsedSeconds": round(time.perf_counter() - start, 4),
+    }
+
+
+def stale_manifest_entries(definitions, manifest_path=MANIFEST_PATH):
+    """
+    Compares a published manifest with the definitions it should describe.
+    Returns {doc_id: reason} for worksheets whose bundle is missing, out of date or no longer in the library.
+    """
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            published = json.load(f).get("worksheets") or {}
+    except (OSError, ValueError):
+        published = {}
+    stale = {}
+    for doc_id, worksheet_data in definitions:
+        entry = published.get(doc_id)
+        if entry is None:
+            stale[doc_id] = "not exported"
+        elif entry.get("contentHash") != bundle_data(worksheet_data)["contentHash"]:
+            stale[doc_id] = "bundle out of date"
+    for doc_id in set(published) - {doc_id for doc_id, _ in definitions}:
+        stale[doc_id] = "no longer in the library"
+    return stale
+
+
+def print_report(report, skipped=()):
+    """Prints a human-readable export summary."""
+    print("\n--- Static export ---")
+    print(f"Worksheets: {report['worksheets']} ({report['written']} written, {report['unchanged']} unchanged)")
+    print(f"Bundle bytes: {report['bytes'] / 1024:.1f} KiB")
+    print(f"Stale bundles removed: {report['removedFiles']}")
+    if "courses" in report:
+        print(f"Course tree: {report['courses']} course(s)")
+    print(f"Elapsed: {report['elapsedSeconds']:.3f}s")
+    if skipped:
+        print(f"Skipped invalid worksheets ({len(skipped)}): {', '.join(skipped)}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Export every worksheet as an immutable, content-addressed JSON bundle under public/, "
+                    "plus the course tree the GCSE pages are generated from.")
+    parser.add_argument("content_dir", nargs="?", default=CONTENT_DIR,
+                        help=f"Directory of worksheet JSON/YAML files (default: {CONTENT_DIR})")
+    parser.add_argument("--from-firestore", action="store_true",
+                        help="Export the worksheets collection instead of compiling the content library")
+    parser.add_argument("--collection", default=WORKSHEETS_COLLECTION)
+    parser.add_argument("--output", default=BUNDLE_DIR, help=f"Directory for bundles (default: {BUNDLE_DIR})")
+    parser.add_argument("--manifest", default=MANIFEST_PATH, help=f"Manifest path (default: {MANIFEST_PATH})")
+    parser.add_argument("--tree", default=course_tree.TREE_PATH,
+                        help=f"Course tree for the GCSE pages (default: {course_tree.TREE_PATH})")
+    parser.add_argument("--keep-stale", action="store_true", help="Don't delete bundles the manifest no longer uses")
+    parser.add_argument("--emulator", metavar="HOST:PORT", help="With --from-firestore: use the Firestore emulator")
+    parser.add_argument("--project", help="Project ID to use with the emulator")
+    parser.add_argument("--check", action="store_true",
+                        help="Write nothing; exit 1 if the published manifest doesn't match the worksheets")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON instead of text")
+    args = parser.parse_args(argv)
+
+    skipped = []
+    if args.from_firestore:
+        if args.emulator:
+            admin_session.use_emulator(args.emulator, args.project)
+        try:
+            db = admin_session.get_firestore()
+        except Exception as e:
+            print(f"Error initializing Firebase Admin SDK: {e}")
+            return 1
+        definitions = firestore_definitions(db, args.collection)
+    else:
+        if not os.path.isdir(args.content_dir):
+            print(f"Error: content directory '{args.content_dir}' does not exist.")
+            return 1
+        definitions, skipped = library_definitions(args.content_dir)
+
+    if not definitions:
+        print("No worksheets to export.")
+        return 1
+    if args.check:
+        stale = stale_manifest_entries(definitions, args.manifest)
+        for doc_id, reason in sorted(stale.items()):
+            print(f"{doc_id}: {reason}")
+        if stale:
+            print(f"{len(stale)} worksheet(s) differ from {args.manifest}; run 'python admin.py export'.")
+            return 1
+        print(f"{args.manifest} matches all {len(definitions)} worksheet(s).")
+        return 0
+    report = export_bundles(definitions, args.output, args.manifest, prune=not args.keep_stale)
+    tree = course_tree.build_course_tree(course_tree.load_course_catalogues(), definitions)
+    course_tree.write_course_tree(tree, args.tree)
+    report["courses"] = len(tree["courses"])
+    if args.json:
+        json.dump(dict(report, skipped=skipped), sys.stdout, indent=2)
+        print()
+    else:
+        print_report(report, skipped)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,101 @@
+import json
+import os
+import re
+import shutil
+import subprocess
+
+import pytest
+
+import auto_marking
+from auto_marking import marking_points, mark_cohort, normalise_text, same_score
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+# Shared with marking.ts: both implementations must give these scores.
+CASES_PATH = os.path.join(TESTS_DIR, "fixtures", "marking_cases.json")
+MARKING_TS_PATH = os.path.join(os.path.dirname(TESTS_DIR), "functions", "src", "marking.ts")
+TYPESCRIPT_PATH = os.path.join(os.path.dirname(TESTS_DIR), "functions", "node_modules", "typescript")
+
+# Transpiles marking.ts with the functions/ TypeScript compiler and prints its score for every case.
+NODE_MARKING_SCRIPT = """
+const fs = require("fs");
+const ts = require(process.argv[1]);
+const source = fs.readFileSync(process.argv[2], "utf8");
+const compiled = ts.transpileModule(source, {compilerOptions: {module: ts.ModuleKind.CommonJS}}).outputText;
+const module_ = {exports: {}};
+new Function("module", "exports", "require", compiled)(module_, module_.exports, require);
+const marking = module_.exports;
+const cases = JSON.parse(fs.readFileSync(process.argv[3], "utf8"));
+const points = marking.markingPoints(cases.worksheet);
+console.log(JSON.stringify(cases.students.map((student) => marking.markAnswers(points, student.answers))));
+"""
+
+
+def load_cases():
+    with open(CASES_PATH, encoding="utf-8") as f:
+        return json.load(f)
+
+
+@pytest.fixture(params=["python", "numpy"])
+def marking_backend(request, monkeypatch):
+    """Runs a test against both mark_cohort paths (the NumPy one only where NumPy is installed)."""
+    if request.param == "numpy":
+        if auto_marking.np is None:
+            pytest.skip("numpy is not installed")
+    else:
+        monkeypatch.setattr(auto_marking, "np", None)
+    return request.param
+
+
+def test_normalise_text_ignores_case_and_spacing():
+    assert normalise_text("  Control \n  UNIT\t") == "control unit"
+
+
+def test_marking_points_cover_only_keyed_questions():
+    points = marking_points(load_cases()["worksheet"])
+    assert [(p["sectionId"], p["kind"], p["part"]) for p in points] == [
+        ("s-quiz", "choice", None), ("s-quiz", "choice", None),
+        ("s-blanks", "blank", "b1"), ("s-blanks", "blank", "b2"),
+        ("s-order", "order", 0), ("s-order", "order", 1), ("s-order", "order", 2),
+        ("s-match", "match", "alu"), ("s-match", "match", "cu"),
+        ("s-match-map", "match", "ram"), ("s-match-map", "match", "rom"),
+    ]
+    assert points[2]["accepted"] == ["control unit", "cu"]
+
+
+def test_mark_cohort_matches_the_shared_cases(marking_backend):
+    cases = load_cases()
+    scores = mark_cohort(marking_points(cases["worksheet"]), [student["answers"] for student in cases["students"]])
+    for student, score in zip(cases["students"], scores):
+        assert score == student["score"], student["name"]
+
+
+def test_mark_cohort_with_no_points_scores_zero(marking_backend):
+    assert mark_cohort([], [{"q1": "a"}]) == [{"marks": 0, "available": 0, "sections": {}}]
+
+
+def test_same_score_ignores_marked_at():
+    score = load_cases()["students"][1]["score"]
+    assert same_score(dict(score, markedAt="yesterday"), score)
+    assert not same_score(dict(score, marks=5), score)
+    assert not same_score(None, score)
+
+
+def test_rule_tables_match_marking_ts():
+    """Both files document the same per-type rules; a rule changed in one must be changed in the other."""
+    rule_line = re.compile(r"^\s*(?:#|//)\s+(\w+(?: / \w+)?)\s{2,}(one point per .+)$", re.MULTILINE)
+    with open(auto_marking.__file__, encoding="utf-8") as f:
+        python_rules = rule_line.findall(f.read())
+    with open(MARKING_TS_PATH, encoding="utf-8") as f:
+        ts_rules = rule_line.findall(f.read())
+    assert len(python_rules) == 4
+    assert python_rules == ts_rules
+
+
+@pytest.mark.skipif(not shutil.which("node") or not os.path.isdir(TYPESCRIPT_PATH),
+                    reason="needs node and functions/ dependencies (npm ci in functions/)")
+def test_marking_ts_matches_the_shared_cases():
+    output = subprocess.run(["node", "-e", NODE_MARKING_SCRIPT, TYPESCRIPT_PATH, MARKING_TS_PATH, CASES_PATH],
+                            check=True, capture_output=True, text=True).stdout
+    cases = load_cases()
+    for student, score in zip(cases["students"], json.loads(output)):
+        assert score == student["score"], student["name"]
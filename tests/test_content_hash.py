@@ -0,0 +1,49 @@
+from content_hash import canonical_json, hash_content, stamp_hashes, worksheet_hashes
+
+WORKSHEET = {
+    "title": "CPU",
+    "sections": [
+        {"id": "intro", "type": "StaticContent", "htmlContent": "<p>Fetch</p>"},
+        {"id": "quiz", "type": "Quiz", "questions": []},
+    ],
+}
+
+
+def test_canonical_json_is_independent_of_key_order():
+    assert canonical_json({"b": 1, "a": [1, {"d": 2, "c": 3}]}) == canonical_json({"a": [1, {"c": 3, "d": 2}], "b": 1})
+    assert canonical_json({"a": "é"}) == '{"a":"é"}'
+
+
+def test_canonical_json_stringifies_unserialisable_values():
+    class Sentinel:
+        def __str__(self):
+            return "SERVER_TIMESTAMP"
+
+    assert canonical_json({"createdAt": Sentinel()}) == '{"createdAt":"SERVER_TIMESTAMP"}'
+
+
+def test_volatile_fields_do_not_affect_the_hash():
+    content_hash, _ = worksheet_hashes(WORKSHEET)
+    noisy = dict(WORKSHEET, createdAt="now", lastScriptUpdate="later", contentHash="x", sectionHashes={})
+    assert worksheet_hashes(noisy)[0] == content_hash
+
+
+def test_section_hashes_are_keyed_by_section_id():
+    content_hash, section_hashes = worksheet_hashes(WORKSHEET)
+    assert set(section_hashes) == {"intro", "quiz"}
+    assert section_hashes["intro"] == hash_content(WORKSHEET["sections"][0])
+
+    edited = dict(WORKSHEET, sections=[dict(WORKSHEET["sections"][0], htmlContent="<p>Decode</p>"),
+                                       WORKSHEET["sections"][1]])
+    edited_hash, edited_sections = worksheet_hashes(edited)
+    assert edited_hash != content_hash
+    assert edited_sections["intro"] != section_hashes["intro"]
+    assert edited_sections["quiz"] == section_hashes["quiz"]
+
+
+def test_stamp_hashes_returns_a_stamped_copy():
+    stamped = stamp_hashes(WORKSHEET)
+    assert "contentHash" not in WORKSHEET
+    assert (stamped["contentHash"], stamped["sectionHashes"]) == worksheet_hashes(WORKSHEET)
+    # Re-stamping a stamped worksheet gives the same hash.
+    assert stamp_hashes(stamped)["contentHash"] == stamped["contentHash"]
@@ -0,0 +1,34 @@
+from index_planner import extract_admin_queries, plan_indexes
+
+REASSIGNED_QUERY = '''
+def load(db_client, worksheet_id, assignment_id):
+    field_filter = admin_session.firestore_module().FieldFilter
+    query = db_client.collection("studentProgress")
+    if worksheet_id:
+        query = query.where(filter=field_filter("worksheetId", "==", worksheet_id))
+    if assignment_id:
+        query = query.where(filter=field_filter("assignmentId", "==", assignment_id))
+    query = query.order_by("lastUpdated", direction="DESCENDING")
+    return query.stream()
+'''
+
+
+def test_field_filter_aliases_and_reassigned_queries_are_followed():
+    queries = extract_admin_queries("load.py", REASSIGNED_QUERY, {})
+    assert [(q["location"], q["filters"], q["orderBy"]) for q in queries] == [
+        ("load.py:6", [["worksheetId", "=="]], []),
+        ("load.py:8", [["worksheetId", "=="], ["assignmentId", "=="]], []),
+        ("load.py:9", [["worksheetId", "=="], ["assignmentId", "=="]], [["lastUpdated", "desc"]]),
+    ]
+    assert all(q["collection"] == "studentProgress" for q in queries)
+    indexes, _ = plan_indexes(queries)
+    assert [[f["fieldPath"] for f in index["fields"]] for index in indexes] == [
+        ["assignmentId", "worksheetId", "lastUpdated"]]
+
+
+def test_unparsed_filters_are_reported_not_dropped():
+    text = 'db.collection("events").where(filter=Or([FieldFilter("a", "==", 1)])).order_by("at").stream()\n'
+    (query,) = extract_admin_queries("q.py", text, {})
+    assert query["filters"] == [[None, None]]
+    _, rows = plan_indexes([query])
+    assert rows[0]["index"] is None and "could not be resolved" in rows[0]["reason"]
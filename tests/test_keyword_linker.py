@@ -0,0 +1,62 @@
+from keyword_linker import KeywordAutomaton, build_glossary, link_html, link_worksheet
+
+TERMS = ["memory", "main memory", "cpu", "bus", "address bus"]
+
+
+def test_find_prefers_leftmost_longest_whole_word_matches():
+    automaton = KeywordAutomaton(TERMS)
+    text = "The CPU reads main memory over the address bus, not a busy cpus."
+    assert [term for _, _, term in automaton.find(text)] == ["cpu", "main memory", "address bus"]
+    start, end, _ = automaton.find(text)[1]
+    assert text[start:end] == "main memory"
+
+
+def test_find_keeps_offsets_aligned_when_lower_casing_changes_length():
+    automaton = KeywordAutomaton(["cpu"])
+    text = "İ CPU"
+    (start, end, term), = automaton.find(text)
+    assert text[start:end] == "CPU" and term == "cpu"
+
+
+def test_link_html_skips_markup_and_links_each_term_once():
+    automaton = KeywordAutomaton(TERMS)
+    html = ('<p title="cpu">The CPU <a href="#">memory</a> and <code>bus</code>. '
+            'Memory &amp; the bus; memory again.</p>')
+    new_html, linked = link_html(html, automaton, set(TERMS), set())
+    assert linked == ["cpu", "memory", "bus"]
+    assert new_html == ('<p title="cpu">The <keyword data-term=\'cpu\'>CPU</keyword> <a href="#">memory</a> and '
+                        '<code>bus</code>. <keyword data-term=\'memory\'>Memory</keyword> &amp; the '
+                        '<keyword data-term=\'bus\'>bus</keyword>; memory again.</p>')
+
+
+def test_link_html_every_occurrence_and_already_linked():
+    automaton = KeywordAutomaton(TERMS)
+    _, linked = link_html("<p>bus bus cpu</p>", automaton, set(TERMS), {"cpu"}, every_occurrence=True)
+    assert linked == ["bus", "bus", "cpu"]
+    _, linked = link_html("<p>bus bus cpu</p>", automaton, set(TERMS), {"cpu"})
+    assert linked == ["bus"]
+
+
+def test_link_worksheet_borrows_only_long_terms_from_other_worksheets():
+    glossary = build_glossary([
+        ("other", {"keywordsData": {"Main Memory": "RAM", "ALU": "Arithmetic logic unit"}}),
+    ])
+    worksheet = {
+        "keywordsData": {"cpu": "Central processing unit"},
+        "sections": [{"id": "s1", "type": "StaticContentWithKeywords", "htmlContent": "<p>The CPU, ALU and main memory.</p>"}],
+    }
+    automaton = KeywordAutomaton(glossary.keys() | {"cpu"})
+    report = link_worksheet("ws", worksheet, automaton, glossary)
+    assert report["linkedTerms"] == ["cpu", "main memory"]
+    assert report["borrowedTerms"] == ["main memory"]
+    assert worksheet["keywordsData"]["main memory"] == "RAM"
+    assert "data-term='alu'" not in worksheet["sections"][0]["htmlContent"]
+
+
+def test_terms_that_are_not_allowed_do_not_hide_allowed_ones():
+    automaton = KeywordAutomaton(TERMS)
+    text = "Data sits in main memory."
+    assert [term for _, _, term in automaton.find(text, {"memory"})] == ["memory"]
+    new_html, linked = link_html(f"<p>{text}</p>", automaton, {"memory"}, set())
+    assert linked == ["memory"]
+    assert new_html == "<p>Data sits in main <keyword data-term='memory'>memory</keyword>.</p>"
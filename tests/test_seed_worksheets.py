@@ -0,0 +1,29 @@
+from seed_worksheets import chunk_definitions, estimate_document_bytes
+
+
+def definitions(count, body="x"):
+    return [(f"ws-{i}", {"title": f"Worksheet {i}", "body": body}) for i in range(count)]
+
+
+def test_chunks_respect_the_document_limit():
+    chunks = chunk_definitions(definitions(7), max_docs=3)
+    assert [len(chunk) for chunk in chunks] == [3, 3, 1]
+    assert [doc_id for chunk in chunks for doc_id, _, _ in chunk] == [f"ws-{i}" for i in range(7)]
+
+
+def test_chunks_respect_the_byte_limit():
+    defs = definitions(4, body="x" * 100)
+    size = estimate_document_bytes(defs[0][1])
+    chunks = chunk_definitions(defs, max_docs=100, max_bytes=size * 2)
+    assert [len(chunk) for chunk in chunks] == [2, 2]
+    assert all(chunk_size == size for chunk in chunks for _, _, chunk_size in chunk)
+
+
+def test_oversized_document_gets_its_own_chunk():
+    defs = definitions(1) + [("big", {"body": "x" * 1000})] + definitions(1)
+    chunks = chunk_definitions(defs, max_docs=100, max_bytes=500)
+    assert [[doc_id for doc_id, _, _ in chunk] for chunk in chunks] == [["ws-0"], ["big"], ["ws-0"]]
+
+
+def test_no_definitions_no_chunks():
+    assert chunk_definitions([]) == []
@@ -0,0 +1,30 @@
+from worksheet_content import merge_sections
+
+CURRENT = [
+    {"id": "intro", "type": "StaticContent", "htmlContent": "<p>Old</p>"},
+    {"id": "quiz", "type": "Quiz", "questions": []},
+]
+
+
+def test_merge_replaces_in_place_and_appends_new_sections():
+    updates = {
+        "new": {"id": "new", "type": "StaticContent", "htmlContent": "<p>New</p>"},
+        "intro": {"id": "intro", "type": "StaticContent", "htmlContent": "<p>Updated</p>"},
+    }
+    sections, changed = merge_sections(CURRENT, updates)
+    assert [section["id"] for section in sections] == ["intro", "quiz", "new"]
+    assert sections[0]["htmlContent"] == "<p>Updated</p>"
+    assert sections[1] is CURRENT[1]
+    assert changed == ["intro", "new"]
+
+
+def test_identical_update_is_not_reported_as_changed():
+    sections, changed = merge_sections(CURRENT, {"quiz": {"type": "Quiz", "questions": [], "id": "quiz"}})
+    assert sections == CURRENT
+    assert changed == []
+
+
+def test_merge_leaves_the_current_sections_untouched():
+    before = [dict(section) for section in CURRENT]
+    merge_sections(CURRENT, {"intro": {"id": "intro", "type": "StaticContent", "htmlContent": ""}})
+    assert CURRENT == before
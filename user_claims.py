@@ -0,0 +1,175 @@
+import argparse
+import secrets
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import admin_session
+
+# --- Configuration ---
+USERS_COLLECTION = "users"
+
+# Custom claims must stay under 1000 bytes. Mirrors MAX_CLAIM_CLASS_IDS in functions/src/index.ts.
+MAX_CLAIM_CLASS_IDS = 25
+
+# Auth get_users() accepts at most 100 identifiers per call.
+AUTH_LOOKUP_CHUNK_SIZE = 100
+
+# Parallel setCustomUserClaims calls, well inside Auth's per-project rate limit.
+MAX_PARALLEL_CLAIM_UPDATES = 8
+
+
+def claims_from_profile(profile):
+    """The custom claims for a users/{uid} profile (claimsFromProfile() in functions/src/index.ts)."""
+    profile = profile or {}
+    claims = {
+        "role": profile.get("role"),
+        "passwordNeedsReset": profile.get("passwordNeedsReset") is True,
+    }
+    if profile.get("role") == "student":
+        class_ids = profile.get("classIds") or []
+        if len(class_ids) > MAX_CLAIM_CLASS_IDS:
+            claims["classIdsOverflow"] = True
+        else:
+            claims["classIds"] = class_ids
+    return claims
+
+
+def fetch_profiles(db_client):
+    """Returns {uid: profile} reading only the fields that feed the claims."""
+    query = db_client.collection(USERS_COLLECTION).select(["role", "passwordNeedsReset", "classIds"])
+    return {snapshot.id: snapshot.to_dict() or {} for snapshot in query.stream()}
+
+
+def fetch_current_claims(auth, uids):
+    """Returns {uid: custom_claims} for the Auth accounts that exist."""
+    current = {}
+    for start in range(0, len(uids), AUTH_LOOKUP_CHUNK_SIZE):
+        identifiers = [auth.UidIdentifier(uid) for uid in uids[start:start + AUTH_LOOKUP_CHUNK_SIZE]]
+        for user in auth.get_users(identifiers).users:
+            current[user.uid] = user.custom_claims or {}
+    return current
+
+
+def sync_all_claims(db_client, auth, dry_run=False, max_workers=MAX_PARALLEL_CLAIM_UPDATES):
+    """
+    Sets every user's claims from their profile, skipping users whose claims already match.
+    Run once after deploying claims-based rules, and whenever profiles were edited outside the functions.
+    Returns a report dict.
+    """
+    start = time.perf_counter()
+    profiles = fetch_profiles(db_client)
+    current = fetch_current_claims(auth, sorted(profiles))
+    updates = {
+        uid: claims_from_profile(profile)
+        for uid, profile in profiles.items()
+        if uid in current and current[uid] != claims_from_profile(profile)
+    }
+    report = {
+        "profiles": len(profiles),
+        "withoutAccount": sorted(set(profiles) - set(current)),
+        "outOfDate": len(updates),
+        "updated": 0,
+        "failed": [],
+    }
+    if not dry_run:
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            futures = {executor.submit(auth.set_custom_user_claims, uid, claims): uid for uid, claims in updates.items()}
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                    report["updated"] += 1
+                except Exception as e:
+                    print(f"Error setting claims for {futures[future]}: {e}")
+                    report["failed"].append(futures[future])
+    report["elapsed_seconds"] = time.perf_counter() - start
+    return report
+
+
+def provision_teacher(db_client, auth, email, display_name=None, create=False):
+    """
+    Makes the account with this email a teacher: profile role and custom claims. With create=True a
+    missing account is created with a random password and a password-reset link is returned for it.
+    Returns (uid, reset_link_or_None).
+    """
+    firestore = admin_session.firestore_module()
+    reset_link = None
+    try:
+        user = auth.get_user_by_email(email)
+    except auth.UserNotFoundError:
+        if not create:
+            raise
+        user = auth.create_user(email=email, display_name=display_name, password=secrets.token_urlsafe(24))
+        reset_link = auth.generate_password_reset_link(email)
+
+    profile_ref = db_client.collection(USERS_COLLECTION).document(user.uid)
+    profile = {"role": "teacher", "email": email, "passwordNeedsReset": False}
+    if display_name:
+        profile["displayName"] = display_name
+    if not profile_ref.get().exists:
+        profile["createdAt"] = firestore.SERVER_TIMESTAMP
+    profile_ref.set(profile, merge=True)
+    auth.set_custom_user_claims(user.uid, claims_from_profile(profile))
+    return user.uid, reset_link
+
+
+def print_sync_report(report, dry_run=False):
+    """Prints a human-readable claims sync summary."""
+    print("\n--- Custom claims sync ---")
+    print(f"Profiles: {report['profiles']}")
+    print(f"Out of date: {report['outOfDate']}")
+    if dry_run:
+        print("Dry run: no claims were changed.")
+    else:
+        print(f"Updated: {report['updated']}")
+    print(f"Elapsed: {report['elapsed_seconds']:.3f}s")
+    if report["withoutAccount"]:
+        print(f"Profiles with no Auth account ({len(report['withoutAccount'])}): {', '.join(report['withoutAccount'])}")
+    if report["failed"]:
+        print(f"Failed ({len(report['failed'])}): {', '.join(report['failed'])}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Maintain Auth custom claims (role, classIds, passwordNeedsReset) and provision teachers.")
+    parser.add_argument("--sync", action="store_true", help="Set every user's claims from their Firestore profile")
+    parser.add_argument("--teacher", metavar="EMAIL", action="append", default=[],
+                        help="Make this account a teacher (repeatable)")
+    parser.add_argument("--name", help="Display name for a teacher account created with --create")
+    parser.add_argument("--create", action="store_true", help="Create teacher accounts that don't exist yet")
+    parser.add_argument("--workers", type=int, default=MAX_PARALLEL_CLAIM_UPDATES)
+    parser.add_argument("--dry-run", action="store_true", help="With --sync: report only; change nothing")
+    parser.add_argument("--emulator", metavar="HOST:PORT", help="Use the Firestore emulator")
+    parser.add_argument("--project", help="Project ID to use with the emulator")
+    args = parser.parse_args(argv)
+
+    if not args.sync and not args.teacher:
+        parser.error("nothing to do: pass --sync and/or --teacher EMAIL")
+    if args.emulator:
+        admin_session.use_emulator(args.emulator, args.project)
+    try:
+        db = admin_session.get_firestore()
+        auth = admin_session.get_auth()
+    except Exception as e:
+        print(f"Error initializing Firebase Admin SDK: {e}")
+        return 1
+
+    exit_code = 0
+    for email in args.teacher:
+        try:
+            uid, reset_link = provision_teacher(db, auth, email, display_name=args.name, create=args.create)
+            print(f"{email} ({uid}) is now a teacher. They must sign in again (or wait up to an hour) for it to apply.")
+            if reset_link:
+                print(f"  New account: send them this link to choose a password: {reset_link}")
+        except Exception as e:
+            print(f"Error provisioning teacher {email}: {e}")
+            exit_code = 1
+
+    if args.sync:
+        report = sync_all_claims(db, auth, dry_run=args.dry_run, max_workers=args.workers)
+        print_sync_report(report, dry_run=args.dry_run)
+        if report["failed"]:
+            exit_code = 1
+    return exit_code
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
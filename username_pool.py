@@ -0,0 +1,209 @@
+import argparse
+import json
+import random
+import re
+import time
+import admin_session
+from seed_worksheets import MAX_BATCH_DOCS
+
+# --- Configuration ---
+# The word lists live in the Cloud Function; read them from there so the two never drift apart.
+FUNCTIONS_SOURCE_PATH = "functions/src/index.ts"
+
+USERS_COLLECTION = "users"
+USERNAMES_COLLECTION = "usernames"
+USERNAME_POOL_COLLECTION = "usernamePool"
+
+# Matches generateUsername(): `${adj}-${noun}${num}` with num in 10..99.
+USERNAME_NUMBERS = range(10, 100)
+
+# Names published to the pool, and names per shard document (~15 bytes each, far below the 1 MiB limit).
+DEFAULT_POOL_SIZE = 50000
+DEFAULT_SHARD_SIZE = 2000
+
+# Warn once this share of the name space is reserved.
+WARN_UTILISATION = 0.8
+
+
+# --- Name space ---
+def load_word_lists(source_path=FUNCTIONS_SOURCE_PATH):
+    """Returns (adjectives, nouns) parsed from the ADJECTIVES/NOUNS arrays in the functions source."""
+    with open(source_path, "r", encoding="utf-8") as f:
+        source = f.read()
+    word_lists = []
+    for name in ("ADJECTIVES", "NOUNS"):
+        match = re.search(rf"const {name} = \[(.*?)\];", source, re.DOTALL)
+        if not match:
+            raise ValueError(f"Could not find the {name} array in {source_path}.")
+        word_lists.append(re.findall(r'"([^"]+)"', match.group(1)))
+    return word_lists[0], word_lists[1]
+
+
+def full_name_space(adjectives, nouns):
+    """Returns the set of every username generateUsername() can produce."""
+    return {
+        f"{adjective.lower()}-{noun.lower()}{number}"
+        for adjective in adjectives
+        for noun in nouns
+        for number in USERNAME_NUMBERS
+    }
+
+
+# --- Reservations ---
+def fetch_reserved_usernames(db_client):
+    """Returns every reserved username (the document ids of the usernames collection)."""
+    return {snapshot.id for snapshot in db_client.collection(USERNAMES_COLLECTION).select([]).stream()}
+
+
+def fetch_user_usernames(db_client):
+    """Returns {username: uid} for every user profile that has a username."""
+    usernames = {}
+    for snapshot in db_client.collection(USERS_COLLECTION).select(["username"]).stream():
+        username = (snapshot.to_dict() or {}).get("username")
+        if username:
+            usernames[username.lower()] = snapshot.id
+    return usernames
+
+
+def commit_in_batches(db_client, operations):
+    """Applies (doc_ref, data_or_None) operations in WriteBatches of MAX_BATCH_DOCS; None deletes the doc."""
+    for start in range(0, len(operations), MAX_BATCH_DOCS):
+        batch = db_client.batch()
+        for doc_ref, data in operations[start:start + MAX_BATCH_DOCS]:
+            if data is None:
+                batch.delete(doc_ref)
+            else:
+                batch.set(doc_ref, data)
+        batch.commit()
+
+
+def backfill_reservations(db_client, user_usernames, reserved):
+    """Creates reservations for existing users that predate the usernames collection. Returns the count."""
+    firestore = admin_session.firestore_module()
+    collection_ref = db_client.collection(USERNAMES_COLLECTION)
+    missing = sorted(set(user_usernames) - reserved)
+    commit_in_batches(db_client, [
+        (collection_ref.document(username),
+         {"uid": user_usernames[username], "reservedAt": firestore.SERVER_TIMESTAMP})
+        for username in missing
+    ])
+    reserved.update(missing)
+    return len(missing)
+
+
+# --- Pool ---
+def build_pool(free_names, pool_size=DEFAULT_POOL_SIZE, shard_size=DEFAULT_SHARD_SIZE, seed=None):
+    """Samples up to pool_size free names in random order and splits them into shards of shard_size."""
+    rng = random.Random(seed)
+    names = rng.sample(sorted(free_names), min(pool_size, len(free_names)))
+    return [names[start:start + shard_size] for start in range(0, len(names), shard_size)]
+
+
+def publish_pool(db_client, shards):
+    """Replaces the usernamePool collection with the given shards (shard-000, shard-001, ...)."""
+    firestore = admin_session.firestore_module()
+    collection_ref = db_client.collection(USERNAME_POOL_COLLECTION)
+    shard_ids = [f"shard-{index:03d}" for index in range(len(shards))]
+    operations = [
+        (collection_ref.document(shard_id),
+         {"names": names, "remaining": len(names), "generatedAt": firestore.SERVER_TIMESTAMP})
+        for shard_id, names in zip(shard_ids, shards)
+    ]
+    stale_ids = {snapshot.id for snapshot in collection_ref.select([]).stream()} - set(shard_ids)
+    operations.extend((collection_ref.document(shard_id), None) for shard_id in sorted(stale_ids))
+    commit_in_batches(db_client, operations)
+
+
+# --- Reporting ---
+def name_space_report(total, reserved, pool_names, expected_new_per_year=None):
+    """Summarises how much of the name space is used and how long the rest will last."""
+    free = total - reserved
+    utilisation = reserved / total if total else 1.0
+    report = {
+        "nameSpace": total,
+        "reserved": reserved,
+        "free": free,
+        "utilisation": utilisation,
+        # Expected create() attempts per name when a candidate is picked uniformly at random.
+        "expectedAttemptsPerName": (1 / (1 - utilisation)) if utilisation < 1 else None,
+        "pooled": pool_names,
+        "yearsRemaining": (free / expected_new_per_year) if expected_new_per_year else None,
+    }
+    report["exhausted"] = free == 0
+    report["nearlyExhausted"] = utilisation >= WARN_UTILISATION
+    return report
+
+
+def print_report(report):
+    """Prints a human-readable name-space summary."""
+    print("\n--- Username name space ---")
+    print(f"Possible names: {report['nameSpace']}")
+    print(f"Reserved: {report['reserved']} ({report['utilisation']:.2%})")
+    print(f"Free: {report['free']}")
+    print(f"Published to pool: {report['pooled']}")
+    if report["expectedAttemptsPerName"] is not None:
+        print(f"Expected attempts per random name: {report['expectedAttemptsPerName']:.2f}")
+    if report["yearsRemaining"] is not None:
+        print(f"Years until exhaustion at the expected intake: {report['yearsRemaining']:.1f}")
+    if report["exhausted"]:
+        print("Error: the username name space is exhausted. Add words to ADJECTIVES/NOUNS in functions/src/index.ts.")
+    elif report["nearlyExhausted"]:
+        print(f"Warning: over {WARN_UTILISATION:.0%} of the username name space is reserved. "
+              "Consider adding words to ADJECTIVES/NOUNS in functions/src/index.ts.")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Backfill username reservations and publish a sharded pool of free student usernames.")
+    parser.add_argument("--pool-size", type=int, default=DEFAULT_POOL_SIZE, help="Free names to publish")
+    parser.add_argument("--shard-size", type=int, default=DEFAULT_SHARD_SIZE, help="Names per pool shard document")
+    parser.add_argument("--seed", type=int, help="Random seed for reproducible pools")
+    parser.add_argument("--expected-new", type=int, metavar="N",
+                        help="Expected new students per year, used to project when names run out")
+    parser.add_argument("--dry-run", action="store_true", help="Report only; write nothing to Firestore")
+    parser.add_argument("--emulator", metavar="HOST:PORT", help="Use the Firestore emulator")
+    parser.add_argument("--project", help="Project ID to use with the emulator")
+    parser.add_argument("--json", metavar="PATH", help="Also write the report to a JSON file")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    adjectives, nouns = load_word_lists()
+    name_space = full_name_space(adjectives, nouns)
+
+    if args.emulator:
+        admin_session.use_emulator(args.emulator, args.project)
+    try:
+        db = admin_session.get_firestore()
+    except Exception as e:
+        print(f"Error initializing Firebase Admin SDK: {e}")
+        return 1
+
+    reserved = fetch_reserved_usernames(db)
+    user_usernames = fetch_user_usernames(db)
+    unreserved_users = set(user_usernames) - reserved
+    if args.dry_run:
+        reserved |= unreserved_users
+        print(f"{len(unreserved_users)} existing user(s) have no reservation (not backfilled: dry run).")
+    else:
+        print(f"Backfilled {backfill_reservations(db, user_usernames, reserved)} reservation(s) for existing users.")
+
+    free_names = name_space - reserved
+    shards = build_pool(free_names, args.pool_size, args.shard_size, args.seed)
+    pooled = sum(len(shard) for shard in shards)
+    if not args.dry_run:
+        publish_pool(db, shards)
+        print(f"Published {pooled} free username(s) in {len(shards)} shard(s) to '{USERNAME_POOL_COLLECTION}'.")
+
+    # Legacy names outside the current word lists don't use up the name space.
+    report = name_space_report(len(name_space), len(reserved & name_space), pooled, args.expected_new)
+    report["elapsedSeconds"] = time.perf_counter() - start
+    print_report(report)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.json}")
+    return 1 if report["exhausted"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
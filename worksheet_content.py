@@ -0,0 +1,318 @@
+import argparse
+import hashlib
+import json
+import os
+import pickle
+import time
+from content_hash import section_hash
+from keyword_compiler import compile_worksheet_keywords
+
+try:
+    import yaml  # Optional: only needed for .yaml/.yml worksheet files
+except ImportError:
+    yaml = None
+
+# --- Configuration ---
+CONTENT_DIR = "content/worksheets"
+# Section update files ({"worksheetIds": [...], "sections": [...]}) are part of the library: they are
+# merged into their target worksheets on load, so seeding, 1.py, validation and the static export all
+# produce the same document. content/ is the source of truth; Firestore and the bundles are built from it.
+SECTION_UPDATES_DIR = "content/section_updates"
+CACHE_PATH = ".content_cache/worksheets.pickle"
+
+# Bump whenever parsing, validation or compilation changes so stale cache entries are discarded.
+CACHE_VERSION = 2
+
+CONTENT_EXTENSIONS = (".json", ".yaml", ".yml")
+
+# Section types understood by src/components/worksheets/worksheetTypes.ts (Section["type"]).
+SECTION_TYPES = {
+    "Questionnaire",
+    "StaticContent",
+    "StaticContentWithKeywords",
+    "KeywordGlossary",
+    "DiagramLabelInteractive",
+    "FillInTheBlanksInteractive",
+    "Quiz",
+    "OrderSequenceInteractive",
+    "MatchingPairsInteractive",
+}
+
+
+# --- Parsing ---
+def parse_content_bytes(file_path, raw_bytes):
+    """Parses the raw bytes of a JSON or YAML content file into a dict."""
+    if file_path.endswith(".json"):
+        return json.loads(raw_bytes.decode("utf-8"))
+    if yaml is None:
+        raise ValueError(f"{file_path} is YAML but PyYAML is not installed (pip install pyyaml).")
+    return yaml.safe_load(raw_bytes.decode("utf-8"))
+
+
+def find_content_files(content_dir):
+    """Returns every worksheet file under content_dir (recursively), sorted for stable output."""
+    found = []
+    for root, _, file_names in os.walk(content_dir):
+        for file_name in file_names:
+            if file_name.endswith(CONTENT_EXTENSIONS):
+                found.append(os.path.join(root, file_name))
+    return sorted(found)
+
+
+# --- Validation ---
+def validate_section(section, context):
+    """
+    Structural checks for one section against worksheetTypes.ts.
+    Returns (errors, warnings) as lists of strings.
+    """
+    errors = []
+    warnings = []
+    if not isinstance(section, dict):
+        return [f"{context}: section must be an object"], warnings
+    section_id = section.get("id")
+    if not section_id or not isinstance(section_id, str):
+        errors.append(f"{context}: section is missing a string 'id'")
+    if not isinstance(section.get("title"), str):
+        errors.append(f"{context} ({section_id}): section is missing a string 'title'")
+    section_type = section.get("type")
+    if not isinstance(section_type, str):
+        errors.append(f"{context} ({section_id}): section is missing a string 'type'")
+    elif section_type not in SECTION_TYPES:
+        warnings.append(f"{context} ({section_id}): section type '{section_type}' is not rendered by Section.tsx")
+    return errors, warnings
+
+
+def validate_worksheet(doc_id, worksheet_data):
+    """
+    Structural checks for a whole worksheet: required top-level fields and unique, well-formed sections.
+    Returns (errors, warnings) as lists of strings.
+    """
+    errors = []
+    warnings = []
+    if not isinstance(worksheet_data, dict):
+        return [f"{doc_id}: worksheet file must contain an object"], warnings
+    if not isinstance(worksheet_data.get("title"), str) or not worksheet_data["title"].strip():
+        errors.append(f"{doc_id}: missing a non-empty 'title'")
+    sections = worksheet_data.get("sections")
+    if not isinstance(sections, list):
+        errors.append(f"{doc_id}: 'sections' must be a list")
+        return errors, warnings
+
+    seen_ids = set()
+    for index, section in enumerate(sections):
+        section_errors, section_warnings = validate_section(section, f"{doc_id} sections[{index}]")
+        errors.extend(section_errors)
+        warnings.extend(section_warnings)
+        section_id = section.get("id") if isinstance(section, dict) else None
+        if section_id in seen_ids:
+            errors.append(f"{doc_id}: duplicate section id '{section_id}'")
+        seen_ids.add(section_id)
+    return errors, warnings
+
+
+def compile_content_file(file_path, raw_bytes):
+    """
+    Parses, validates and compiles one worksheet file: keyword sections get a pre-tokenised
+    `compiledHtml` tree (see keyword_compiler.py). Returns a cache entry dict (without stat fields).
+    """
+    default_id = os.path.splitext(os.path.basename(file_path))[0]
+    try:
+        worksheet_data = parse_content_bytes(file_path, raw_bytes)
+    except Exception as e:
+        return {"doc_id": default_id, "data": None, "errors": [f"{file_path}: could not parse ({e})"], "warnings": []}
+
+    doc_id = default_id
+    if isinstance(worksheet_data, dict):
+        doc_id = worksheet_data.pop("id", None) or default_id
+    errors, warnings = validate_worksheet(doc_id, worksheet_data)
+    if not errors:
+        compile_worksheet_keywords(worksheet_data)
+    return {"doc_id": doc_id, "data": worksheet_data, "errors": errors, "warnings": warnings}
+
+
+# --- Compiled cache ---
+def load_cache(cache_path):
+    """Returns the cached {file_path: entry} map, or an empty map if missing, stale or unreadable."""
+    try:
+        with open(cache_path, "rb") as f:
+            cache = pickle.load(f)
+        if cache.get("version") == CACHE_VERSION:
+            return cache["entries"]
+    except Exception:
+        pass
+    return {}
+
+
+def save_cache(cache_path, entries):
+    """Writes the compiled cache atomically so an interrupted run can't leave a corrupt file."""
+    os.makedirs(os.path.dirname(cache_path) or ".", exist_ok=True)
+    temp_path = f"{cache_path}.tmp"
+    with open(temp_path, "wb") as f:
+        pickle.dump({"version": CACHE_VERSION, "entries": entries}, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temp_path, cache_path)
+
+
+def load_worksheet_library(content_dir=CONTENT_DIR, cache_path=CACHE_PATH, use_cache=True,
+                           updates_dir=SECTION_UPDATES_DIR):
+    """
+    Loads, validates and caches every worksheet file under content_dir, then merges in the section
+    update files under updates_dir (None skips them).
+    A file is re-parsed only when its mtime/size changed and its SHA-256 no longer matches the cache.
+    Returns a list of entries: {"path", "doc_id", "data", "errors", "warnings"}.
+    """
+    cached_entries = load_cache(cache_path) if use_cache else {}
+    entries = {}
+    cache_dirty = False
+
+    for file_path in find_content_files(content_dir):
+        stat = os.stat(file_path)
+        entry = cached_entries.get(file_path)
+        if entry and entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+            entries[file_path] = entry
+            continue
+
+        with open(file_path, "rb") as f:
+            raw_bytes = f.read()
+        sha256 = hashlib.sha256(raw_bytes).hexdigest()
+        if entry and entry["sha256"] == sha256:
+            # Touched but not edited: keep the compiled result and just refresh the stat key.
+            entry = dict(entry, mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+        else:
+            entry = compile_content_file(file_path, raw_bytes)
+            entry.update(sha256=sha256, mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+        entries[file_path] = entry
+        cache_dirty = True
+
+    if use_cache and (cache_dirty or len(entries) != len(cached_entries)):
+        save_cache(cache_path, entries)
+
+    library = [dict(entry, path=file_path) for file_path, entry in entries.items()]
+    seen_doc_ids = {}
+    for entry in library:
+        other_path = seen_doc_ids.setdefault(entry["doc_id"], entry["path"])
+        if other_path != entry["path"]:
+            entry["errors"] = entry["errors"] + [f"{entry['doc_id']}: document id also used by {other_path}"]
+    if updates_dir and os.path.isdir(updates_dir):
+        apply_section_update_files(library, find_content_files(updates_dir))
+    return library
+
+
+def load_worksheet_definitions(content_dir=CONTENT_DIR, use_cache=True):
+    """
+    Returns [(doc_id, worksheet_data)] for every valid worksheet, printing any validation problems.
+    Worksheets with errors are left out so they never reach Firestore.
+    """
+    definitions = []
+    for entry in load_worksheet_library(content_dir, use_cache=use_cache):
+        for warning in entry["warnings"]:
+            print(f"Warning: {warning}")
+        if entry["errors"]:
+            for error in entry["errors"]:
+                print(f"Error: {error}")
+            continue
+        definitions.append((entry["doc_id"], entry["data"]))
+    return definitions
+
+
+def load_section_updates(file_path):
+    """
+    Loads a section update file: {"worksheetIds": [...], "sections": [...]}.
+    Returns (worksheet_ids, sections_map) where sections_map is keyed by section id.
+    """
+    with open(file_path, "rb") as f:
+        update_data = parse_content_bytes(file_path, f.read())
+    errors = []
+    for index, section in enumerate(update_data.get("sections", [])):
+        section_errors, _ = validate_section(section, f"{file_path} sections[{index}]")
+        errors.extend(section_errors)
+    if errors:
+        raise ValueError("Invalid section update file:\n  " + "\n  ".join(errors))
+    sections_map = {section["id"]: section for section in update_data.get("sections", [])}
+    return update_data.get("worksheetIds", []), sections_map
+
+
+def merge_sections(current_sections, sections_map):
+    """
+    Splices sections_map into current_sections, keeping existing order and appending new sections.
+    Returns (updated_sections_list, changed_section_ids).
+    """
+    updated_sections_list = []
+    processed_new_section_ids = set()
+    changed_section_ids = []
+
+    for existing_section in current_sections:
+        section_id = existing_section["id"]
+        if section_id in sections_map:
+            new_section = sections_map[section_id]
+            if section_hash(existing_section) != section_hash(new_section):
+                changed_section_ids.append(section_id)
+            updated_sections_list.append(new_section)
+            processed_new_section_ids.add(section_id)
+        else:
+            updated_sections_list.append(existing_section)
+
+    for section_id, section_data in sections_map.items():
+        if section_id not in processed_new_section_ids:
+            updated_sections_list.append(section_data)
+            changed_section_ids.append(section_id)
+
+    return updated_sections_list, changed_section_ids
+
+
+def apply_section_update_files(library, update_paths):
+    """
+    Merges each section update file into the library entries it targets, compiling the new sections'
+    keywords like the rest of the worksheet. Entries are replaced, never mutated, so cached data stays
+    untouched. A file that doesn't load marks its targets (or, if unreadable, the library) with an error.
+    Returns {update_path: [doc_ids it was applied to]}.
+    """
+    entries = {entry["doc_id"]: entry for entry in library}
+    applied = {}
+    for update_path in update_paths:
+        try:
+            worksheet_ids, sections_map = load_section_updates(update_path)
+        except Exception as e:
+            library.append({"path": update_path, "doc_id": os.path.splitext(os.path.basename(update_path))[0],
+                            "data": None, "errors": [f"{update_path}: could not load section updates ({e})"],
+                            "warnings": []})
+            continue
+        applied[update_path] = []
+        for doc_id in worksheet_ids:
+            entry = entries.get(doc_id)
+            if entry is None or entry["errors"] or not isinstance(entry["data"], dict):
+                continue
+            update_sections = {section_id: dict(section) for section_id, section in sections_map.items()}
+            compile_worksheet_keywords({"keywordsData": entry["data"].get("keywordsData"),
+                                        "sections": list(update_sections.values())})
+            sections, _ = merge_sections(entry["data"].get("sections") or [], update_sections)
+            entry["data"] = dict(entry["data"], sections=sections)
+            applied[update_path].append(doc_id)
+    return applied
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Validate and compile the worksheet content library.")
+    parser.add_argument("content_dir", nargs="?", default=CONTENT_DIR)
+    parser.add_argument("--no-cache", action="store_true", help="Ignore and don't update the compiled cache")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    library = load_worksheet_library(args.content_dir, use_cache=not args.no_cache)
+    elapsed = time.perf_counter() - start
+
+    error_count = 0
+    for entry in library:
+        for warning in entry["warnings"]:
+            print(f"Warning: {warning}")
+        for error in entry["errors"]:
+            print(f"Error: {error}")
+            error_count += 1
+    print(f"\nLoaded {len(library)} worksheet(s) from '{args.content_dir}' in {elapsed * 1000:.1f} ms "
+          f"with {error_count} error(s).")
+    if error_count:
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,72 @@
+import re
+from collections import Counter
+from content_hash import worksheet_hashes
+
+# --- Configuration ---
+# worksheetIndex/{worksheetId}: a small summary of each worksheet, so lists never download section content.
+# seed_worksheets.py writes each entry in the same batch as its worksheet.
+# Matches WORKSHEET_INDEX_COLLECTION in src/services/worksheetIndex.ts.
+INDEX_COLLECTION = "worksheetIndex"
+
+# "J277 OCR GCSE CS" -> "j277"; the specification code is what the /gcse/{course} routes use.
+SPEC_CODE_PATTERN = re.compile(r"\b([A-Za-z]\d{3})\b")
+# "1.2 Data Representation" (or spec reference "1.2.4 Images") -> "unit-1-2".
+UNIT_NUMBER_PATTERN = re.compile(r"^\s*(\d+)\.(\d+)")
+
+
+def slugify(text):
+    """Lowercase, hyphen-separated ASCII slug."""
+    return re.sub(r"[^a-z0-9]+", "-", (text or "").lower()).strip("-")
+
+
+def course_slug(worksheet_data):
+    """The course's URL slug: an explicit courseSlug, else the spec code in the course name, else its slug."""
+    if worksheet_data.get("courseSlug"):
+        return worksheet_data["courseSlug"]
+    course = worksheet_data.get("course") or ""
+    match = SPEC_CODE_PATTERN.search(course)
+    return match.group(1).lower() if match else slugify(course) or None
+
+
+def unit_number(worksheet_data):
+    """The specification unit number ('1.2') from the unit name or spec reference, or None."""
+    for field in ("unit", "unitDisplayName", "specReference"):
+        match = UNIT_NUMBER_PATTERN.match(worksheet_data.get(field) or "")
+        if match:
+            return f"{match.group(1)}.{match.group(2)}"
+    return None
+
+
+def unit_number_slug(number):
+    """'1.2' -> 'unit-1-2', the /gcse/{course}/{unit} route segment."""
+    return "unit-" + number.replace(".", "-")
+
+
+def unit_slug(worksheet_data):
+    """The unit's URL slug: an explicit unitSlug, else 'unit-<n>-<m>' from the unit or spec reference number."""
+    if worksheet_data.get("unitSlug"):
+        return worksheet_data["unitSlug"]
+    number = unit_number(worksheet_data)
+    if number:
+        return unit_number_slug(number)
+    return slugify(worksheet_data.get("unit") or worksheet_data.get("unitDisplayName")) or None
+
+
+def index_entry(worksheet_data):
+    """The worksheetIndex document for a worksheet (WorksheetIndexEntry in src/services/worksheetIndex.ts)."""
+    sections = [s for s in worksheet_data.get("sections") or [] if isinstance(s, dict)]
+    content_hash = worksheet_data.get("contentHash") or worksheet_hashes(worksheet_data)[0]
+    return {
+        "title": worksheet_data.get("title") or "Untitled Worksheet",
+        "course": worksheet_data.get("course") or worksheet_data.get("courseDisplayName"),
+        "unit": worksheet_data.get("unit") or worksheet_data.get("unitDisplayName"),
+        "courseSlug": course_slug(worksheet_data),
+        "unitSlug": unit_slug(worksheet_data),
+        "unitNumber": unit_number(worksheet_data),
+        "specReference": worksheet_data.get("specReference"),
+        "learningObjectives": worksheet_data.get("learningObjectives") or [],
+        "keywords": worksheet_data.get("keywords") or sorted(worksheet_data.get("keywordsData") or {}),
+        "sectionCount": len(sections),
+        "sectionTypeCounts": dict(Counter(s.get("type") or "Unknown" for s in sections)),
+        "contentHash": content_hash,
+    }
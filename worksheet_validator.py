@@ -0,0 +1,407 @@
+import argparse
+import json
+import math
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from worksheet_content import CONTENT_DIR, load_worksheet_library
+
+# --- Configuration ---
+PUBLIC_DIR = "public"
+
+# Below this many worksheets, spawning worker processes costs more than it saves.
+PARALLEL_THRESHOLD = 64
+DEFAULT_WORKERS = os.cpu_count() or 1
+
+# Feedback keys that are not option ids (see Question["feedback"] in worksheetTypes.ts).
+GENERAL_FEEDBACK_KEYS = {"correct", "incorrect"}
+
+# Section types whose answers are stored under the section id.
+INTERACTIVE_SECTION_TYPES = {
+    "DiagramLabelInteractive",
+    "FillInTheBlanksInteractive",
+    "OrderSequenceInteractive",
+    "MatchingPairsInteractive",
+}
+
+KEYWORD_TERM_PATTERN = re.compile(r"""data-term\s*=\s*(['"])(.*?)\1""", re.IGNORECASE)
+
+
+class IssueCollector:
+    """Accumulates machine-readable errors and warnings for one worksheet."""
+
+    def __init__(self):
+        self.errors = []
+        self.warnings = []
+
+    def error(self, code, location, message):
+        self.errors.append({"code": code, "location": location, "message": message})
+
+    def warning(self, code, location, message):
+        self.warnings.append({"code": code, "location": location, "message": message})
+
+
+# --- Shared checks ---
+def check_unique_ids(items, location, issues, label="item"):
+    """Checks every item is an object with a unique string id. Returns the list of ids."""
+    ids = []
+    if not isinstance(items, list) or not items:
+        issues.error("missing-items", location, f"expected a non-empty list of {label}s")
+        return ids
+    for index, item in enumerate(items):
+        item_id = item.get("id") if isinstance(item, dict) else None
+        if not isinstance(item_id, str) or not item_id:
+            issues.error("missing-id", f"{location}[{index}]", f"{label} is missing a string 'id'")
+            continue
+        if item_id in ids:
+            issues.error("duplicate-id", f"{location}[{index}]", f"duplicate {label} id '{item_id}'")
+        ids.append(item_id)
+    return ids
+
+
+def check_image_url(url, location, issues):
+    """Requires an image URL and warns when a site-relative URL has no matching file under public/."""
+    if not isinstance(url, str) or not url:
+        issues.error("missing-image", location, "diagram section has no image URL")
+        return
+    if url.startswith("/") and not os.path.isfile(os.path.join(PUBLIC_DIR, url.lstrip("/"))):
+        issues.warning("image-not-found", location, f"image '{url}' does not exist under {PUBLIC_DIR}/")
+
+
+def check_keyword_terms(html, keywords_data, location, issues):
+    """Warns about <keyword data-term> references that have no definition in keywordsData."""
+    if keywords_data is None or not isinstance(html, str):
+        return
+    for match in KEYWORD_TERM_PATTERN.finditer(html):
+        term = match.group(2)
+        if term.lower() not in keywords_data:
+            issues.warning("unknown-keyword", location, f"keyword '{term}' is not defined in keywordsData")
+
+
+def check_order(item_ids, correct_order_ids, location, issues):
+    """correctOrderIds must be a permutation of the orderable item ids."""
+    if correct_order_ids is None:
+        return
+    if not isinstance(correct_order_ids, list) or sorted(correct_order_ids) != sorted(item_ids):
+        issues.error("bad-correct-order", location, "correctOrderIds must list every item id exactly once")
+
+
+def check_pairs(pairs, left_ids, right_ids, location, issues):
+    """correctPairs may be a {leftId: rightId} map or a list of {itemAId, itemBId} objects."""
+    if pairs is None:
+        return
+    if isinstance(pairs, dict):
+        pair_list = list(pairs.items())
+    elif isinstance(pairs, list):
+        pair_list = [(p.get("itemAId"), p.get("itemBId")) for p in pairs if isinstance(p, dict)]
+    else:
+        issues.error("bad-correct-pairs", location, "correctPairs must be an object or a list")
+        return
+    for left_id, right_id in pair_list:
+        if left_id not in left_ids:
+            issues.error("unknown-pair-item", location, f"correctPairs references unknown item '{left_id}'")
+        if right_id not in right_ids:
+            issues.error("unknown-pair-item", location, f"correctPairs references unknown match '{right_id}'")
+    missing = set(left_ids) - {left_id for left_id, _ in pair_list}
+    if missing:
+        issues.error("unpaired-item", location, f"no correct pair for: {', '.join(sorted(missing))}")
+
+
+def check_blank_answers(blank, location, issues):
+    """A blank's answer key (used by auto_marking.py) is an optional correctAnswer string plus acceptedAnswers strings."""
+    if "correctAnswer" in blank and not isinstance(blank["correctAnswer"], str):
+        issues.error("bad-blank-answer", location, "correctAnswer must be a string")
+    accepted = blank.get("acceptedAnswers")
+    if accepted is not None and (not isinstance(accepted, list) or not all(isinstance(a, str) for a in accepted)):
+        issues.error("bad-blank-answer", location, "acceptedAnswers must be a list of strings")
+
+
+# --- Question validators ---
+def validate_multiple_choice(question, location, issues, keywords_data):
+    option_ids = check_unique_ids(question.get("options"), f"{location}.options", issues, "option")
+    correct_answer_id = question.get("correctAnswerId")
+    if correct_answer_id not in option_ids:
+        issues.error("bad-correct-answer", location, f"correctAnswerId '{correct_answer_id}' is not one of the options")
+    for key in (question.get("feedback") or {}):
+        if key not in option_ids and key not in GENERAL_FEEDBACK_KEYS:
+            issues.error("bad-feedback-key", f"{location}.feedback", f"feedback key '{key}' is not an option id")
+
+
+def validate_free_text(question, location, issues, keywords_data):
+    if not isinstance(question.get("prompt"), str):
+        issues.error("missing-prompt", location, "question is missing a 'prompt'")
+
+
+def validate_static_question(question, location, issues, keywords_data):
+    if not isinstance(question.get("htmlContent"), str):
+        issues.error("missing-html", location, "static content is missing 'htmlContent'")
+    check_keyword_terms(question.get("htmlContent"), keywords_data, location, issues)
+
+
+def validate_order_question(question, location, issues, keywords_data):
+    item_ids = check_unique_ids(question.get("itemsToOrder"), f"{location}.itemsToOrder", issues)
+    check_order(item_ids, question.get("correctOrderIds"), location, issues)
+
+
+def validate_matching_question(question, location, issues, keywords_data):
+    stem_ids = check_unique_ids(question.get("stems"), f"{location}.stems", issues, "stem")
+    option_ids = check_unique_ids(question.get("options"), f"{location}.options", issues, "option")
+    check_pairs(question.get("correctPairs"), stem_ids, option_ids, location, issues)
+
+
+QUESTION_VALIDATORS = {
+    "MultipleChoiceQuestion": validate_multiple_choice,
+    "ShortAnswer": validate_free_text,
+    "TextArea": validate_free_text,
+    "StaticContent": validate_static_question,
+    "OrderSequenceInteractive": validate_order_question,
+    "MatchingPairsInteractive": validate_matching_question,
+}
+
+# Question types each section renderer in Section.tsx actually supports.
+RENDERED_QUESTION_TYPES = {
+    "Quiz": {"MultipleChoiceQuestion", "StaticContent"},
+    "Questionnaire": {"ShortAnswer", "StaticContent"},
+}
+
+
+# --- Section validators ---
+def validate_question_list(section, location, issues, keywords_data):
+    questions = section.get("questions")
+    if not isinstance(questions, list) or not questions:
+        issues.error("missing-questions", location, "section has no questions")
+        return
+    rendered_types = RENDERED_QUESTION_TYPES.get(section.get("type"), set())
+    for index, question in enumerate(questions):
+        question_location = f"{location}.questions[{index}]"
+        if not isinstance(question, dict):
+            issues.error("bad-question", question_location, "question must be an object")
+            continue
+        question_type = question.get("type")
+        validator = QUESTION_VALIDATORS.get(question_type)
+        if validator is None:
+            issues.error("unknown-question-type", question_location, f"unknown question type '{question_type}'")
+            continue
+        if question_type not in rendered_types:
+            issues.warning("unrendered-question-type", question_location,
+                           f"{section.get('type')} sections don't render '{question_type}' questions")
+        validator(question, question_location, issues, keywords_data)
+
+
+def validate_static_section(section, location, issues, keywords_data):
+    if not isinstance(section.get("htmlContent"), str):
+        issues.error("missing-html", location, "section is missing 'htmlContent'")
+    check_keyword_terms(section.get("htmlContent"), keywords_data, location, issues)
+
+
+def validate_keyword_glossary(section, location, issues, keywords_data):
+    term_keys = section.get("termKeys", section.get("displayTermKeys"))
+    if not isinstance(term_keys, list) or not term_keys:
+        issues.error("missing-terms", location, "glossary has no termKeys")
+        return
+    if keywords_data is not None:
+        for term in term_keys:
+            if str(term).lower() not in keywords_data:
+                issues.error("unknown-keyword", location, f"glossary term '{term}' is not defined in keywordsData")
+
+
+def validate_diagram(section, location, issues, keywords_data):
+    check_image_url(section.get("diagramImageUrl", section.get("backgroundImageUrl")), location, issues)
+    if "hotspots" in section:
+        check_unique_ids(section["hotspots"], f"{location}.hotspots", issues, "hotspot")
+        for index, hotspot in enumerate(section["hotspots"] or []):
+            if not isinstance(hotspot, dict):
+                continue
+            hotspot_location = f"{location}.hotspots[{index}]"
+            for axis in ("x", "y"):
+                value = hotspot.get(axis)
+                if not isinstance(value, (int, float)) or not 0 <= value <= 100:
+                    issues.error("bad-hotspot-position", hotspot_location, f"'{axis}' must be a percentage (0-100)")
+            term_key = hotspot.get("termKey")
+            if term_key and keywords_data is not None and str(term_key).lower() not in keywords_data:
+                issues.warning("unknown-keyword", hotspot_location, f"termKey '{term_key}' is not defined in keywordsData")
+    elif "dropTargets" in section:
+        label_ids = check_unique_ids(section.get("draggableLabels"), f"{location}.draggableLabels", issues, "label")
+        check_unique_ids(section["dropTargets"], f"{location}.dropTargets", issues, "drop target")
+        for index, target in enumerate(section["dropTargets"] or []):
+            if isinstance(target, dict) and target.get("accepts") not in label_ids:
+                issues.error("unknown-label", f"{location}.dropTargets[{index}]",
+                             f"drop target accepts unknown label '{target.get('accepts')}'")
+    else:
+        issues.error("missing-hotspots", location, "diagram section has neither hotspots nor dropTargets")
+
+
+def validate_fill_in_blanks(section, location, issues, keywords_data):
+    segments = section.get("segments")
+    if not isinstance(segments, list) or not segments:
+        issues.error("missing-segments", location, "section has no segments")
+        return
+    blank_ids = set()
+    for index, segment in enumerate(segments):
+        segment_location = f"{location}.segments[{index}]"
+        if isinstance(segment, str):
+            check_keyword_terms(segment, keywords_data, segment_location, issues)
+            continue
+        if not isinstance(segment, dict):
+            issues.error("bad-segment", segment_location, "segment must be a string or an object")
+            continue
+        if segment.get("type") == "text":
+            check_keyword_terms(segment.get("content"), keywords_data, segment_location, issues)
+            continue
+        blank_id = segment.get("id")
+        if not isinstance(blank_id, str) or not blank_id:
+            issues.error("missing-id", segment_location, "blank is missing a string 'id'")
+        elif blank_id in blank_ids:
+            issues.error("duplicate-id", segment_location, f"duplicate blank id '{blank_id}'")
+        blank_ids.add(blank_id)
+        check_blank_answers(segment, segment_location, issues)
+    if not blank_ids:
+        issues.error("missing-blanks", location, "section has no blanks")
+
+
+def validate_order_section(section, location, issues, keywords_data):
+    item_ids = check_unique_ids(section.get("orderItems"), f"{location}.orderItems", issues)
+    check_order(item_ids, section.get("correctOrderIds"), location, issues)
+
+
+def validate_matching_section(section, location, issues, keywords_data):
+    set_a_ids = check_unique_ids(section.get("matchSetA"), f"{location}.matchSetA", issues)
+    set_b_ids = check_unique_ids(section.get("matchSetB"), f"{location}.matchSetB", issues)
+    check_pairs(section.get("correctPairs"), set_a_ids, set_b_ids, location, issues)
+
+
+SECTION_VALIDATORS = {
+    "Quiz": validate_question_list,
+    "Questionnaire": validate_question_list,
+    "StaticContent": validate_static_section,
+    "StaticContentWithKeywords": validate_static_section,
+    "KeywordGlossary": validate_keyword_glossary,
+    "DiagramLabelInteractive": validate_diagram,
+    "FillInTheBlanksInteractive": validate_fill_in_blanks,
+    "OrderSequenceInteractive": validate_order_section,
+    "MatchingPairsInteractive": validate_matching_section,
+}
+
+
+# --- Worksheet / library validation ---
+def collect_answer_ids(section):
+    """Ids that the worksheet page uses as keys in the answers map for this section."""
+    if section.get("type") in ("Quiz", "Questionnaire"):
+        return [q.get("id") for q in section.get("questions") or [] if isinstance(q, dict) and q.get("type") != "StaticContent"]
+    if section.get("type") in INTERACTIVE_SECTION_TYPES:
+        return [section.get("id")]
+    return []
+
+
+def validate_sections(sections, keywords_data=None, location_prefix="sections"):
+    """Validates a list of section dicts. keywords_data=None skips keyword cross-references."""
+    issues = IssueCollector()
+    if keywords_data is not None:
+        keywords_data = {key.lower(): value for key, value in keywords_data.items()}
+    answer_ids = set()
+    for index, section in enumerate(sections):
+        location = f"{location_prefix}[{index}]"
+        if not isinstance(section, dict):
+            issues.error("bad-section", location, "section must be an object")
+            continue
+        validator = SECTION_VALIDATORS.get(section.get("type"))
+        if validator is None:
+            issues.warning("unrendered-section-type", location, f"section type '{section.get('type')}' has no validator or renderer")
+            continue
+        validator(section, location, issues, keywords_data)
+        for answer_id in collect_answer_ids(section):
+            if answer_id in answer_ids:
+                issues.error("duplicate-answer-id", location, f"answer id '{answer_id}' is used more than once in this worksheet")
+            answer_ids.add(answer_id)
+    return issues
+
+
+def validate_worksheet_entry(entry):
+    """
+    Validates one loaded library entry (see worksheet_content.load_worksheet_library).
+    Module-level so it can be sent to worker processes.
+    """
+    doc_id, worksheet_data, path, load_errors = entry
+    issues = IssueCollector()
+    for message in load_errors:
+        issues.error("load-error", path, message)
+    if isinstance(worksheet_data, dict) and isinstance(worksheet_data.get("sections"), list):
+        keywords_data = worksheet_data.get("keywordsData")
+        section_issues = validate_sections(worksheet_data["sections"], keywords_data if isinstance(keywords_data, dict) else None)
+        issues.errors.extend(section_issues.errors)
+        issues.warnings.extend(section_issues.warnings)
+    return {"docId": doc_id, "path": path, "errors": issues.errors, "warnings": issues.warnings}
+
+
+def validate_library(library, workers=DEFAULT_WORKERS):
+    """
+    Validates every entry of a loaded library, fanning out across worker processes for large libraries.
+    Each worksheet is checked independently, so runtime grows linearly with library size.
+    Returns a JSON-serialisable report.
+    """
+    payloads = [(e["doc_id"], e["data"], e["path"], e["errors"]) for e in library]
+    start = time.perf_counter()
+    if workers > 1 and len(payloads) >= PARALLEL_THRESHOLD:
+        chunk_size = max(1, math.ceil(len(payloads) / (workers * 4)))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(validate_worksheet_entry, payloads, chunksize=chunk_size))
+    else:
+        results = [validate_worksheet_entry(payload) for payload in payloads]
+    elapsed = time.perf_counter() - start
+
+    return {
+        "summary": {
+            "worksheets": len(results),
+            "invalidWorksheets": sum(1 for r in results if r["errors"]),
+            "errors": sum(len(r["errors"]) for r in results),
+            "warnings": sum(len(r["warnings"]) for r in results),
+            "elapsedSeconds": round(elapsed, 4),
+        },
+        "worksheets": results,
+    }
+
+
+def invalid_doc_ids(report):
+    """Returns the set of document ids that have at least one validation error."""
+    return {result["docId"] for result in report["worksheets"] if result["errors"]}
+
+
+def print_report(report):
+    """Prints errors and warnings in a human-readable form."""
+    for result in report["worksheets"]:
+        for issue in result["errors"]:
+            print(f"Error: {result['docId']} {issue['location']}: {issue['message']} [{issue['code']}]")
+        for issue in result["warnings"]:
+            print(f"Warning: {result['docId']} {issue['location']}: {issue['message']} [{issue['code']}]")
+    summary = report["summary"]
+    print(f"\nValidated {summary['worksheets']} worksheet(s) in {summary['elapsedSeconds'] * 1000:.1f} ms: "
+          f"{summary['errors']} error(s), {summary['warnings']} warning(s).")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Validate every worksheet in the content library.")
+    parser.add_argument("content_dir", nargs="?", default=CONTENT_DIR)
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON instead of text")
+    parser.add_argument("--output", metavar="PATH", help="Also write the JSON report to a file")
+    args = parser.parse_args(argv)
+
+    report = validate_library(load_worksheet_library(args.content_dir), workers=args.workers)
+    if args.json:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    else:
+        print_report(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if report["summary"]["errors"]:
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())